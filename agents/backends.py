@@ -0,0 +1,309 @@
+"""Registry of chat model backends and multi-endpoint load balancing.
+
+A backend turns a ``ModelTier`` into a chat model. Provider SDKs are
+imported only when their backend is used. A tier can list several
+``endpoints`` (or ``api_keys``) to spread calls over, e.g.::
+
+    {"model": "gpt-4o-mini", "backend": "openai",
+     "endpoints": [{"base_url": "http://127.0.0.1:8400/v1"},
+                   {"api_key_env": "OPENAI_KEY_2"}]}
+"""
+
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+from pydantic import Field, PrivateAttr
+
+from agents.routing import ModelTier
+
+BackendFactory = Callable[..., BaseChatModel]
+
+# The CLI checks configs against ``agents.routing.BUILTIN_BACKENDS``
+_BACKENDS: dict[str, BackendFactory] = {}
+
+# One HTTP connection pool per process, shared by every OpenAI-style model
+_HTTP_CLIENT = None
+_HTTP_LOCK = threading.Lock()
+HTTP_MAX_CONNECTIONS = 64
+# Seconds before a model request is given up, unless a tier sets
+# ``timeout``. Calls a phase deadline abandons still hold a worker thread
+# until then.
+REQUEST_TIMEOUT = 60.0
+
+
+def register_backend(name: str) -> Callable[[BackendFactory], BackendFactory]:
+    """Register ``factory(tier, **endpoint_options)`` under ``name``."""
+
+    def decorator(factory: BackendFactory) -> BackendFactory:
+        _BACKENDS[name] = factory
+        return factory
+
+    return decorator
+
+
+def available_backends() -> list[str]:
+    return sorted(_BACKENDS)
+
+
+def shared_http_client():
+    """Return the process-wide ``httpx.Client`` with a bounded pool."""
+    global _HTTP_CLIENT
+    with _HTTP_LOCK:
+        if _HTTP_CLIENT is None:
+            import httpx
+
+            _HTTP_CLIENT = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            )
+        return _HTTP_CLIENT
+
+
+def _resolve_key(options: dict[str, Any]) -> dict[str, Any]:
+    """Replace ``api_key_env`` with the key read from the environment."""
+    options = dict(options)
+    env = options.pop("api_key_env", None)
+    if env:
+        try:
+            options["api_key"] = os.environ[env]
+        except KeyError as e:
+            raise ValueError(f"Environment variable {env} is not set") from e
+    return options
+
+
+def build_chat_model(tier: ModelTier) -> BaseChatModel:
+    """Build the chat model for ``tier`` from the backend registry.
+
+    Raises:
+        ValueError: If the backend is unknown or misconfigured
+    """
+    factory = _BACKENDS.get(tier.backend)
+    if factory is None:
+        raise ValueError(
+            f"Unknown backend {tier.backend!r}, expected one of: "
+            f"{', '.join(available_backends())}"
+        )
+    options = dict(tier.options)
+    record = options.pop("record", None)
+    endpoints = options.pop("endpoints", None)
+    keys = options.pop("api_keys", None)
+    if endpoints is None and keys:
+        endpoints = [{"api_key": key} for key in keys]
+
+    if endpoints and len(endpoints) > 1:
+        model: BaseChatModel = BalancedChatModel(
+            models=[
+                factory(tier, **_resolve_key({**options, **endpoint}))
+                for endpoint in endpoints
+            ]
+        )
+    else:
+        endpoint = endpoints[0] if endpoints else {}
+        model = factory(tier, **_resolve_key({**options, **endpoint}))
+    if record:
+        model.callbacks = [ResponseRecorder(record)]
+    return model
+
+
+@register_backend("gemini")
+def _gemini(tier: ModelTier, **options: Any) -> BaseChatModel:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    if "api_key" in options:
+        options["google_api_key"] = options.pop("api_key")
+    return ChatGoogleGenerativeAI(
+        model=tier.model,
+        temperature=tier.temperature,
+        max_tokens=tier.max_tokens,
+        timeout=options.pop("timeout", REQUEST_TIMEOUT),
+        max_retries=2,
+        **options,
+    )
+
+
+@register_backend("openai")
+def _openai(tier: ModelTier, **options: Any) -> BaseChatModel:
+    """Any OpenAI-compatible endpoint, local stand-ins included."""
+    from langchain_openai import ChatOpenAI
+
+    if options.get("base_url") and "api_key" not in options:
+        # Local servers usually don't check the key but the SDK wants one
+        options["api_key"] = os.environ.get("OPENAI_API_KEY", "local")
+    return ChatOpenAI(
+        model=tier.model,
+        temperature=tier.temperature,
+        max_completion_tokens=tier.max_tokens,
+        timeout=options.pop("timeout", REQUEST_TIMEOUT),
+        max_retries=2,
+        http_client=shared_http_client(),
+        **options,
+    )
+
+
+@register_backend("fake")
+def _fake(tier: ModelTier, **options: Any) -> BaseChatModel:
+    from agents.fake_llm import FakeChatModel
+
+    return FakeChatModel(**options)
+
+
+@register_backend("replay")
+def _replay(tier: ModelTier, **options: Any) -> BaseChatModel:
+    return ReplayChatModel(**options)
+
+
+class BalancedChatModel(BaseChatModel):
+    """Spreads calls over several equivalent models.
+
+    Each call goes to the model with the fewest requests in flight, ties
+    broken round-robin. Copies made by ``bind_tools`` share the counters,
+    so every agent built on this model balances against the same load.
+    """
+
+    models: list[BaseChatModel]
+    bound: list[Any] = Field(default_factory=list)
+
+    _outstanding: list[int] = PrivateAttr()
+    _next: list[int] = PrivateAttr(default_factory=lambda: [0])
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context: Any) -> None:
+        if not self.models:
+            raise ValueError("BalancedChatModel needs at least one model")
+        self._outstanding = [0] * len(self.models)
+
+    @property
+    def _llm_type(self) -> str:
+        return "balanced"
+
+    @property
+    def outstanding(self) -> list[int]:
+        return list(self._outstanding)
+
+    def bind_tools(self, tools, **kwargs) -> "BalancedChatModel":
+        bound = self.model_copy(
+            update={
+                "bound": [m.bind_tools(tools, **kwargs) for m in self.models]
+            }
+        )
+        bound._outstanding, bound._next, bound._lock = (
+            self._outstanding,
+            self._next,
+            self._lock,
+        )
+        return bound
+
+    def _acquire(self) -> int:
+        with self._lock:
+            n = len(self._outstanding)
+            start = self._next[0]
+            index = min(
+                ((start + i) % n for i in range(n)),
+                key=lambda i: self._outstanding[i],
+            )
+            self._outstanding[index] += 1
+            self._next[0] = (index + 1) % n
+            return index
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._outstanding[index] -= 1
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        index = self._acquire()
+        try:
+            target = self.bound[index] if self.bound else self.models[index]
+            message = target.invoke(messages, stop=stop, **kwargs)
+        finally:
+            self._release(index)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class ResponseRecorder(BaseCallbackHandler):
+    """Appends every model reply to a JSONL file for ``ReplayChatModel``."""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        generation = response.generations[0][0]
+        if not isinstance(generation, ChatGeneration):
+            return
+        message = generation.message
+        record = {
+            "content": message.content,
+            "tool_calls": getattr(message, "tool_calls", []),
+        }
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class ReplayChatModel(BaseChatModel):
+    """Replays replies recorded by ``ResponseRecorder`` in order.
+
+    Replies are handed out in call order, so a replayed game only matches
+    the recording when calls happen in the same order (sequential
+    discussion, no breakouts or simultaneous openings).
+    """
+
+    path: str
+    loop: bool = False
+
+    _replies: list[dict[str, Any]] = PrivateAttr()
+    _cursor: list[int] = PrivateAttr(default_factory=lambda: [0])
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context: Any) -> None:
+        lines = Path(self.path).read_text(encoding="utf-8").splitlines()
+        self._replies = [json.loads(line) for line in lines if line.strip()]
+        if not self._replies:
+            raise ValueError(f"No recorded replies in {self.path}")
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs) -> "ReplayChatModel":
+        # Recorded tool calls are replayed as-is
+        return self
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        with self._lock:
+            cursor = self._cursor[0]
+            if cursor >= len(self._replies):
+                if not self.loop:
+                    raise RuntimeError(f"Replay {self.path} is exhausted")
+                cursor = 0
+            self._cursor[0] = cursor + 1
+        reply = self._replies[cursor]
+        message = AIMessage(
+            content=reply.get("content", ""),
+            tool_calls=reply.get("tool_calls", []),
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
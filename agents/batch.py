@@ -0,0 +1,179 @@
+"""Decisions of several players in one model request.
+
+Votes and simultaneous opening statements don't depend on each other, yet
+each player's call re-sends the whole transcript. ``decide`` sends the
+context the players share once, followed by a short persona section per
+player, and asks for one tool call per player.
+
+Only players with the same role are batched together, and the shared
+context is the part of the transcript every one of them has in memory.
+What only some of them know, such as a role's night talk, never reaches
+a request for players outside it. A player missing from the reply can
+simply be asked on their own.
+"""
+
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from agents.routing import CallKind
+from agents.tools import speak_as_player, vote_as_player
+from game.deadlines import Deadline
+from game.types import Role
+
+if TYPE_CHECKING:
+    from agents.player import PlayerAgent
+
+BATCH_TOOLS = {t.name: t for t in (vote_as_player, speak_as_player)}
+
+SYSTEM_PROMPT = (
+    "You play several players of a game of mafia at once. Decide for "
+    "each listed player on their own, in their voice and from their "
+    "point of view, using only the discussion shown and their persona."
+)
+
+
+@dataclass(slots=True)
+class BatchStats:
+    requests: int = 0
+    players: int = 0
+    decided: int = 0
+    errors: int = 0
+
+    @property
+    def coverage(self) -> float:
+        """Share of batched players the reply decided for."""
+        return self.decided / self.players if self.players else 0.0
+
+
+def shared_memory(players: Sequence["PlayerAgent"]) -> list[str]:
+    """Messages in every player's memory, in the first player's order."""
+    first, *others = players
+    remaining = [Counter(p.memory) for p in others]
+    shared = []
+    for message in first.memory:
+        if all(counts[message] > 0 for counts in remaining):
+            for counts in remaining:
+                counts[message] -= 1
+            shared.append(message)
+    return shared
+
+
+def batch_prompt(
+    players: Sequence["PlayerAgent"], instruction: str, tool: str
+) -> str:
+    role = players[0].role
+    # Special roles discuss at night and know each other; villagers don't
+    known = "" if role in (None, Role.VILLAGER) else f" (all {role.value})"
+    personas = "\n".join(
+        f"### {p.name}\n{p.system_prompt.strip()}" for p in players
+    )
+    return (
+        "Here is the discussion so far: "
+        f"{'\n'.join(shared_memory(players))}\n\n"
+        f"Players to decide for{known}:\n{personas}\n\n"
+        f"{instruction}\n"
+        f"Answer only with the {tool} tool instead of any tool named "
+        f"above, calling it once for each of: "
+        f"{', '.join(p.name for p in players)}."
+    )
+
+
+def decide(
+    players: Sequence["PlayerAgent"],
+    instruction: str,
+    kind: CallKind,
+    tool: str,
+    stats: BatchStats | None = None,
+    deadline: Deadline | None = None,
+) -> dict[str, str]:
+    """Ask one request for every player's answer to ``instruction``.
+
+    Answers are added to the players' memories as ``speak`` would.
+
+    Args:
+        players: Players of the same role, sharing one router
+        instruction: The prompt each of them would have been sent
+        kind: Call kind, selects the model tier
+        tool: Name of a tool in ``BATCH_TOOLS``
+        stats: Counters to update
+        deadline: Phase deadline; a reply after it is discarded
+
+    Returns:
+        Answer per player name, for the players the reply covered. A
+        failed request covers nobody.
+
+    Raises:
+        ValueError: If the players don't all have the same role
+        PhaseTimeout: If the deadline passed before the answers were
+            stored
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    roles = {p.role for p in players}
+    if len(roles) != 1:
+        raise ValueError(f"Batched players must share a role, got {roles}")
+    stats = stats if stats is not None else BatchStats()
+    if deadline is not None:
+        deadline.check()
+    stats.requests += 1
+    stats.players += len(players)
+    router = players[0].router
+    llm = router.llm_for(kind).bind_tools([BATCH_TOOLS[tool]])
+    messages = [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=batch_prompt(players, instruction, tool)),
+    ]
+    try:
+        with router.track(kind) as config:
+            reply = llm.invoke(messages, config)
+    except Exception as e:
+        stats.errors += 1
+        print(f"Warning: Batched {kind.value} request failed: {e}")
+        return {}
+
+    names = {p.name for p in players}
+    answers: dict[str, str] = {}
+    for call in getattr(reply, "tool_calls", None) or []:
+        args = call.get("args") or {}
+        player = args.get("player")
+        if call.get("name") != tool or player not in names:
+            continue
+        if player in answers:
+            continue
+        try:
+            answer = str(BATCH_TOOLS[tool].invoke(args)).strip()
+        except Exception:
+            # Arguments that don't fit the schema; ask them on their own
+            continue
+        if answer:
+            answers[player] = answer
+    # A reply after the deadline belongs to an abandoned call; the game
+    # has already moved on without these players
+    if deadline is not None:
+        deadline.check()
+    stats.decided += len(answers)
+    for p in players:
+        if p.name in answers:
+            p.memory.append(f"[{p.name}]: {answers[p.name]}")
+    return answers
+
+
+def by_role(
+    players: Sequence["PlayerAgent"], size: int
+) -> list[list["PlayerAgent"]]:
+    """Split players into same-role batches of at most ``size``.
+
+    Players who would be alone in a batch are left out; a request of
+    their own gains nothing.
+    """
+    groups: dict[Role | None, list[PlayerAgent]] = {}
+    for p in players:
+        groups.setdefault(p.role, []).append(p)
+    return [
+        group[i : i + size]
+        for group in groups.values()
+        for i in range(0, len(group), size)
+        if len(group[i : i + size]) > 1
+    ]
@@ -0,0 +1,254 @@
+"""Response cache for the god's announcements and round summaries.
+
+Batch games send the god near-identical prompts every round, e.g. the
+elimination announcement with only the player's name swapped. Prompts
+are normalized before lookup: whitespace is collapsed and player names
+become placeholders (``<P0>``, ``<P1>``, ... in order of appearance), so
+those prompts share one entry. Names in a cached response are stored as
+the same placeholders and filled in with the names of the new prompt,
+which keeps an announcement about Alice from being replayed about Bob.
+
+An entry matches a prompt with the same normalized text, or failing
+that, the most recent entry whose text is at least ``threshold``
+similar (``difflib`` ratio) and that names as many players. Callers
+whose response describes the prompt's details, like round summaries,
+turn the fuzzy match off: a similar round is still another round.
+Entries are evicted least recently used first and expire after ``ttl``
+seconds. Texts are compared outside the lock, so games sharing a cache
+don't wait on each other's lookups.
+
+Player speech is never cached: only calls that go through
+``ResponseCache.get_or_call`` are, and only the god and the summaries
+use it.
+"""
+
+import difflib
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    fuzzy_hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass(slots=True)
+class _Entry:
+    text: str
+    placeholders: int
+    response: str
+    # Latency of the call that produced the response
+    seconds: float
+    expires: float
+
+
+def normalize(text: str, names: Iterable[str]) -> tuple[str, list[str]]:
+    """Replace player names with placeholders and collapse whitespace.
+
+    Returns:
+        The normalized text and the names in placeholder order
+    """
+    found = sorted({n for n in names if n and n in text}, key=len)
+    order: list[str] = []
+    if found:
+        # Longest first, so "Tony Stark" isn't matched as "Tony"
+        pattern = re.compile("|".join(map(re.escape, reversed(found))))
+
+        def placeholder(match: re.Match) -> str:
+            if match.group(0) not in order:
+                order.append(match.group(0))
+            return f"<P{order.index(match.group(0))}>"
+
+        text = pattern.sub(placeholder, text)
+    return " ".join(text.split()), order
+
+
+def _templated(response: str, names: list[str]) -> str:
+    for i, name in sorted(enumerate(names), key=lambda item: -len(item[1])):
+        response = response.replace(name, f"<P{i}>")
+    return response
+
+
+def _filled(response: str, names: list[str]) -> str:
+    return re.sub(
+        r"<P(\d+)>",
+        lambda m: (
+            names[int(m.group(1))]
+            if int(m.group(1)) < len(names)
+            else m.group(0)
+        ),
+        response,
+    )
+
+
+class ResponseCache:
+    """LRU cache with expiry and fuzzy matching, shared across games."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        threshold: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used go
+            ttl: Seconds an entry stays valid
+            threshold: Lowest similarity in [0, 1] of a fuzzy match; 1.0
+                only allows exact matches of the normalized prompt
+            clock: Time source, in seconds
+
+        Raises:
+            ValueError: If ``threshold`` is outside [0, 1]
+        """
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"threshold must be in [0, 1], got {threshold}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.clock = clock
+        self.stats: dict[str, CacheStats] = {}
+        self._entries: OrderedDict[tuple[str, str, str], _Entry] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_call(
+        self,
+        kind: str,
+        scope: str,
+        prompt: str,
+        names: Iterable[str],
+        call: Callable[[], str],
+        cacheable: Callable[[str], bool] = bool,
+        fuzzy: bool = True,
+    ) -> str:
+        """The cached response to ``prompt``, or ``call()``'s.
+
+        Args:
+            kind: Kind of call, keeps statistics and entries apart
+            scope: Everything else the response depends on, e.g. the
+                personality fingerprint and the model tier
+            prompt: The prompt sent to the model
+            names: Player names that may appear in the prompt
+            call: Makes the model call
+            cacheable: Whether a response may be cached; keeps fallbacks
+                for failed calls out. Empty responses aren't by default.
+            fuzzy: Whether a similar prompt's response may be reused, or
+                only an exact match's
+
+        Returns:
+            The response, with the names of this prompt
+        """
+        text, order = normalize(prompt, names)
+        entry, similar = self._find(kind, scope, text, len(order), fuzzy)
+        with self._lock:
+            stats = self.stats.setdefault(kind, CacheStats())
+            if entry is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+                stats.fuzzy_hits += similar
+                stats.saved_seconds += entry.seconds
+        if entry is not None:
+            return _filled(entry.response, order)
+
+        start = time.perf_counter()
+        response = call()
+        seconds = time.perf_counter() - start
+        if not cacheable(response):
+            return response
+        with self._lock:
+            self._entries[kind, scope, text] = _Entry(
+                text=text,
+                placeholders=len(order),
+                response=_templated(response, order),
+                seconds=seconds,
+                expires=self.clock() + self.ttl,
+            )
+            self._entries.move_to_end((kind, scope, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+    def _find(
+        self,
+        kind: str,
+        scope: str,
+        text: str,
+        placeholders: int,
+        fuzzy: bool,
+    ) -> tuple[_Entry | None, bool]:
+        """The entry matching ``text`` and whether it only is similar."""
+        with self._lock:
+            now = self.clock()
+            key = (kind, scope, text)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                self._entries.move_to_end(key)
+                return entry, False
+            if not fuzzy or self.threshold >= 1.0:
+                return None, False
+            expired = [k for k, e in self._entries.items() if e.expires <= now]
+            for other in expired:
+                del self._entries[other]
+            # Most recent first. Texts whose lengths alone rule out the
+            # threshold (the bound real_quick_ratio gives) are skipped.
+            candidates = [
+                (other, candidate.text)
+                for other, candidate in reversed(self._entries.items())
+                if other[:2] == (kind, scope)
+                and candidate.placeholders == placeholders
+                and 2 * min(len(candidate.text), len(text))
+                >= self.threshold * (len(candidate.text) + len(text))
+            ]
+
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(text)
+
+        def similar(candidate: str) -> bool:
+            matcher.set_seq1(candidate)
+            return (
+                matcher.quick_ratio() >= self.threshold
+                and matcher.ratio() >= self.threshold
+            )
+
+        found = next((k for k, t in candidates if similar(t)), None)
+        if found is None:
+            return None, False
+        with self._lock:
+            # It may have been evicted while comparing
+            entry = self._entries.get(found)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(found)
+            return entry, True
+
+    def report(self) -> str:
+        lines = [
+            f"{'cached':<14}{'lookups':>8}{'hit %':>8}{'fuzzy':>7}"
+            f"{'saved s':>9}"
+        ]
+        for kind, s in self.stats.items():
+            lines.append(
+                f"{kind:<14}{s.hits + s.misses:>8}{s.hit_rate * 100:>8.1f}"
+                f"{s.fuzzy_hits:>7}{s.saved_seconds:>9.2f}"
+            )
+        return "\n".join(lines)
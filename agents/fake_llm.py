@@ -0,0 +1,163 @@
+"""Offline chat model that plays the game with random but legal moves.
+
+Used by benchmarks and dry runs so the game loop can be exercised without
+an API key. It recognises the game's prompts, picks a random valid target
+and answers with the tool call the prompt asks for.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field, PrivateAttr
+
+# Tool to call for each prompt keyword, in priority order
+_TOOL_FOR_KEYWORD = (
+    ("vote_for_player", "vote_for_player"),
+    ("propose_kill", "propose_kill"),
+    ("propose_heal", "propose_heal"),
+    ("suspect_player", "suspect_player"),
+    ("accuse_player", "accuse_player"),
+)
+
+# Batched tools, answered once per listed player
+_BATCH_TOOLS = ("vote_as_player", "speak_as_player")
+_BATCH_PLAYER = re.compile(r"^### (.+)$", re.MULTILINE)
+
+_TARGET_LISTS = (
+    re.compile(r"Amongst: (.*?)\.\n", re.DOTALL),
+    re.compile(r"Available targets: ([^\n]*)"),
+    re.compile(r"These players are still alive: ([^\n]*)"),
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel(BaseChatModel):
+    """Stand-in chat model with configurable latency.
+
+    A seeded model's choices only depend on the seed and the messages, so
+    a game replays the same way however its concurrent calls interleave.
+    """
+
+    latency: float = 0.0
+    seed: int | None = None
+    tool_names: list[str] = Field(default_factory=list)
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-mafia"
+
+    def bind_tools(self, tools, **kwargs) -> "FakeChatModel":
+        bound = self.model_copy(update={"tool_names": [t.name for t in tools]})
+        # Share the random stream and lock with the unbound model
+        bound._rng, bound._lock = self._rng, self._lock
+        return bound
+
+    def _choice(self, options: list[str], context: str) -> str:
+        if self.seed is not None:
+            return random.Random(f"{self.seed}:{context}").choice(options)
+        with self._lock:
+            return self._rng.choice(options)
+
+    def _targets(self, text: str) -> list[str]:
+        for pattern in _TARGET_LISTS:
+            found = pattern.findall(text)
+            if found:
+                names = re.split(r"[,\n]", found[-1])
+                return [n.strip() for n in names if n.strip()]
+        return []
+
+    def _reply(self, messages: list[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=str(last.content))
+        text = str(last.content)
+        context = "\n".join(str(m.content) for m in messages)
+        targets = self._targets(text)
+        batched = [t for t in _BATCH_TOOLS if t in self.tool_names]
+        if batched and targets:
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": batched[0],
+                        "args": self._batch_args(
+                            batched[0], player, targets, context
+                        ),
+                        "id": uuid.uuid4().hex,
+                    }
+                    for player in _BATCH_PLAYER.findall(text)
+                ],
+            )
+        for keyword, tool in _TOOL_FOR_KEYWORD:
+            if keyword in text and tool in self.tool_names and targets:
+                target = self._choice(targets, context)
+                args: dict[str, str] = (
+                    {"player_name": target}
+                    if tool == "vote_for_player"
+                    else {"target": target}
+                )
+                if tool == "accuse_player":
+                    args["reason"] = "they have been acting suspiciously"
+                return AIMessage(
+                    content="",
+                    tool_calls=[
+                        {"name": tool, "args": args, "id": uuid.uuid4().hex}
+                    ],
+                )
+        if targets:
+            return AIMessage(
+                content=f"I have my eye on {self._choice(targets, context)}."
+            )
+        return AIMessage(content="Nothing unusual happened this round.")
+
+    def _batch_args(
+        self, tool: str, player: str, targets: list[str], context: str
+    ) -> dict[str, str]:
+        target = self._choice(targets, f"{player}:{context}")
+        if tool == "vote_as_player":
+            return {"player": player, "player_name": target}
+        return {
+            "player": player,
+            "statement": f"I accuse {target} because they have been "
+            "acting suspiciously",
+        }
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        message = self._reply(messages)
+        input_tokens = sum(_estimate_tokens(str(m.content)) for m in messages)
+        # Tool call arguments are generated text too
+        output_tokens = _estimate_tokens(
+            str(message.content)
+            + "".join(json.dumps(call["args"]) for call in message.tool_calls)
+        )
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -1,39 +1,78 @@
 import time
+from collections.abc import Iterable
 
 from langchain.agents import create_agent
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, ToolMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph.state import CompiledStateGraph
 
-from agents.tools import GOD_TOOLS
+from agents.routing import CallKind, ModelRouter
+from agents.tools import (
+    GOD_TOOLS,
+    UNATTENDED_GOD_TOOLS,
+    read_special_instruction,
+)
+from utils.personalities import prompt_fingerprint
+
+# Responses used when the model gives none; never cached
+EMPTY_FALLBACK = "No announcement at this time."
+ERROR_FALLBACK = "An error occurred while making the decision."
 
 
 class GodAgent:
     def __init__(
-        self, llm: ChatGoogleGenerativeAI, name: str, system_prompt: str
+        self,
+        llm: BaseChatModel | None,
+        name: str,
+        system_prompt: str,
+        router: ModelRouter | None = None,
+        interactive: bool = False,
     ):
-        self.llm = llm
+        """Create the god.
+
+        Args:
+            llm: Model for every call; ignored when ``router`` is given
+            name: God name
+            system_prompt: Personality prompt
+            router: Picks the model tier per call kind
+            interactive: A user at the terminal gives special instructions
+                for elimination announcements and may have the god end
+                the game. Only the console game turns this on; batch
+                runs, tournaments and queue workers have nobody to ask.
+        """
+        if router is None:
+            if llm is None:
+                raise ValueError(f"{name} needs either an llm or a router")
+            router = ModelRouter.single(llm)
+        self.router = router
+        self.llm = router.llm_for(CallKind.ANNOUNCEMENT)
         self.name = name
         self.system_prompt = system_prompt
+        self.interactive = interactive
+        self.fingerprint = prompt_fingerprint(system_prompt)
         self.agent: CompiledStateGraph
         self._initialize_agent()
 
     def _initialize_agent(self):
         """Initialize the agent with god tools."""
+        system_prompt = (
+            f"{self.system_prompt}\n"
+            "An elimination related announcement may come with a special "
+            "instruction from the user about how it should be like; "
+            "follow it."
+        )
+        if self.interactive:
+            system_prompt += (
+                " IMPORTANT: The exit_game tool should ONLY be used when "
+                "explicitly instructed by the user via the special "
+                "instruction. Do NOT use exit_game under any other "
+                "circumstances."
+            )
         try:
             self.agent = create_agent(
                 model=self.llm,
-                tools=GOD_TOOLS,
-                system_prompt=(
-                    f"{self.system_prompt}\n"
-                    "Before making elimination related announcement, "
-                    "Use the get_special_instruction tool to get instruction "
-                    "from the user about how announcement should be like. "
-                    "IMPORTANT: The exit_game tool should ONLY be used when "
-                    "explicitly instructed by the user via "
-                    "special_instruction. Do NOT use exit_game under any "
-                    "other circumstances."
-                ),
+                tools=GOD_TOOLS if self.interactive else UNATTENDED_GOD_TOOLS,
+                system_prompt=system_prompt,
             )
         except Exception as e:
             # Fallback if agent creation fails (e.g., unsupported model)
@@ -43,32 +82,60 @@ class GodAgent:
     def __str__(self) -> str:
         return self.name
 
-    def decide(self, prompt: str) -> str:
+    def special_instruction(self) -> str:
+        """Ask the user how to make the next elimination announcement.
+
+        Blocks on stdin. Returns an empty string for no instruction, and
+        always for a god that isn't interactive.
+        """
+        return read_special_instruction() if self.interactive else ""
+
+    def decide(self, prompt: str, names: Iterable[str] = ()) -> str:
         """Make a decision as god.
 
         Args:
             prompt: The prompt to respond to
+            names: Player names the prompt may mention. With a response
+                cache on the router, a response to the same prompt about
+                other players is reused with these names.
 
         Returns:
             God's response
         """
+        cache = self.router.cache
+        if cache is None:
+            return self._ask(prompt)
+        tier = self.router.tier_for(CallKind.ANNOUNCEMENT)
+        return cache.get_or_call(
+            CallKind.ANNOUNCEMENT.value,
+            f"{self.fingerprint}:{tier}",
+            prompt,
+            names,
+            lambda: self._ask(prompt),
+            cacheable=lambda r: r not in (EMPTY_FALLBACK, ERROR_FALLBACK),
+        )
+
+    def _ask(self, prompt: str) -> str:
+        """Ask the god agent, retrying empty responses and errors."""
         # Retry logic for empty responses
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 # Invoke agent with messages in new format
-                result = self.agent.invoke(
-                    {
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                                + "\n"
-                                + f"Only respond with your answer without any self name declaration or any other text. Or use required tool for the task",
-                            }
-                        ]
-                    }
-                )
+                with self.router.track(CallKind.ANNOUNCEMENT) as config:
+                    result = self.agent.invoke(
+                        {
+                            "messages": [
+                                {
+                                    "role": "user",
+                                    "content": prompt
+                                    + "\n"
+                                    + f"Only respond with your answer without any self name declaration or any other text. Or use required tool for the task",
+                                }
+                            ]
+                        },
+                        config,
+                    )
                 response = self._extract_response(result)
 
                 # Check if response is empty
@@ -86,7 +153,7 @@ class GodAgent:
                         print(
                             f"Warning: {self.name} produced an empty response after {max_retries} attempts. Using fallback."
                         )
-                        response = "No announcement at this time."
+                        response = EMPTY_FALLBACK
                 else:
                     # Success - break out of retry loop
                     break
@@ -101,7 +168,7 @@ class GodAgent:
                     print(
                         f"Error: {self.name} failed after {max_retries} attempts: {e}"
                     )
-                    response = "An error occurred while making the decision."
+                    response = ERROR_FALLBACK
                     break
 
         return response
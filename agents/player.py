@@ -1,36 +1,86 @@
 import time
 
 from langchain.agents import create_agent
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, ToolMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph.state import CompiledStateGraph
-from pydantic import BaseModel, ConfigDict
 
+from agents.routing import CallKind, ModelRouter
 from agents.tools import (
     DETECTIVE_TOOLS,
     HEALER_TOOLS,
     MAFIA_TOOLS,
     PLAYER_TOOLS,
 )
+from game.deadlines import Deadline, PhaseTimeout
 from game.types import Role
+from utils.personalities import prompt_fingerprint
 
 
-class PlayerAgent(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+class PlayerAgent:
+    __slots__ = (
+        "name",
+        "role",
+        "system_prompt",
+        "fingerprint",
+        "llm",
+        "router",
+        "memory",
+        "agent",
+        "_agents",
+    )
 
-    name: str
-    role: Role | None = None
-    system_prompt: str
-    llm: ChatGoogleGenerativeAI
-    memory: list[str] = []
-    agent: CompiledStateGraph | None = None
+    def __init__(
+        self,
+        *,
+        name: str,
+        system_prompt: str,
+        llm: BaseChatModel | None = None,
+        role: Role | None = None,
+        router: ModelRouter | None = None,
+    ):
+        """Create a player.
 
-    def __init__(self, **data):
-        super().__init__(**data)
+        Args:
+            name: Player name, unique within a game
+            system_prompt: Personality prompt
+            llm: Model for every call; ignored when ``router`` is given
+            role: Initial role, normally dealt by the game
+            router: Picks the model tier per call kind
+        """
+        if router is None:
+            if llm is None:
+                raise ValueError(f"{name} needs either an llm or a router")
+            router = ModelRouter.single(llm)
+        self.name = name
+        self.role = role
+        self.system_prompt = system_prompt
+        # Cache key for anything derived from the personality prompt
+        self.fingerprint = prompt_fingerprint(system_prompt)
+        self.router = router
+        self.llm = router.llm_for(CallKind.SPEECH)
+        self.memory: list[str] = []
+        self.agent: CompiledStateGraph | None = None
+        # Compiled agent per model tier, built on first use
+        self._agents: dict[str, CompiledStateGraph] = {}
         self._initialize_agent()
 
+    def __repr__(self) -> str:
+        return f"PlayerAgent(name={self.name!r}, role={self.role!r})"
+
     def _initialize_agent(self):
         """Initialize the agent with appropriate tools."""
+        # Tools depend on the role, so agents of every tier are rebuilt
+        self._agents = {}
+        self.agent = self._agent_for(CallKind.SPEECH)
+
+    def _agent_for(self, kind: CallKind) -> CompiledStateGraph:
+        """Return the agent on the model tier routed for ``kind``."""
+        tier = self.router.tier_for(kind)
+        agent = self._agents.get(tier)
+        if agent is not None:
+            return agent
+
         # Select tools based on role
         if self.role == Role.MAFIA:
             tools = MAFIA_TOOLS
@@ -43,8 +93,8 @@ class PlayerAgent(BaseModel):
 
         try:
             # Create agent using new LangChain API
-            self.agent = create_agent(
-                model=self.llm,
+            agent = create_agent(
+                model=self.router.models[tier],
                 tools=tools,
                 system_prompt=self.system_prompt,
             )
@@ -52,18 +102,32 @@ class PlayerAgent(BaseModel):
             # Fallback if agent creation fails (e.g., unsupported model)
             print(f"Warning: Agent creation failed for {self.name}: {e}")
             raise e
+        self._agents[tier] = agent
+        return agent
 
-    def speak(self, prompt: str) -> str:
+    def speak(
+        self,
+        prompt: str,
+        kind: CallKind = CallKind.SPEECH,
+        deadline: Deadline | None = None,
+    ) -> str:
         """Speak as the player agent.
 
         Args:
             prompt: The prompt to respond to
+            kind: What the call is for; selects the model tier
+            deadline: Phase deadline. Retries stop once it can't be met
+                and a reply arriving after it is discarded.
 
         Returns:
             The agent's response
+
+        Raises:
+            PhaseTimeout: If the deadline passed before a reply was stored
         """
         if self.agent is None:
             raise RuntimeError(f"Agent not initialized for {self.name}")
+        agent = self._agent_for(kind)
 
         # Build messages list in the format expected by new API
         messages = [
@@ -85,9 +149,12 @@ class PlayerAgent(BaseModel):
         # Retry logic for empty responses
         max_retries = 3
         for attempt in range(max_retries):
+            if deadline is not None:
+                deadline.check()
             try:
                 # Invoke agent
-                result = self.agent.invoke({"messages": messages})
+                with self.router.track(kind) as config:
+                    result = agent.invoke({"messages": messages}, config)
                 response = self._extract_response(result)
 
                 # Check if response is empty
@@ -96,10 +163,11 @@ class PlayerAgent(BaseModel):
                         wait_time = (
                             2**attempt
                         )  # Exponential backoff: 1s, 2s, 4s
-                        print(
-                            f"Warning: {self.name} produced an empty response. Retrying in {wait_time}s..."
+                        self._backoff(
+                            wait_time,
+                            deadline,
+                            f"Warning: {self.name} produced an empty response. Retrying in {wait_time}s...",
                         )
-                        time.sleep(wait_time)
                         continue
                     else:
                         print(
@@ -109,13 +177,16 @@ class PlayerAgent(BaseModel):
                 else:
                     # Success - break out of retry loop
                     break
+            except PhaseTimeout:
+                raise
             except Exception as e:
                 if attempt < max_retries - 1:
                     wait_time = 2**attempt
-                    print(
-                        f"Warning: Error for {self.name}: {e}. Retrying in {wait_time}s..."
+                    self._backoff(
+                        wait_time,
+                        deadline,
+                        f"Warning: Error for {self.name}: {e}. Retrying in {wait_time}s...",
                     )
-                    time.sleep(wait_time)
                 else:
                     print(
                         f"Error: {self.name} failed after {max_retries} attempts: {e}"
@@ -125,10 +196,25 @@ class PlayerAgent(BaseModel):
                     )
                     break
 
+        # A reply after the deadline belongs to an abandoned call
+        if deadline is not None:
+            deadline.check()
         # Store response in memory
         self.memory.append(f"[{self.name}]: {response}")
         return response
 
+    @staticmethod
+    def _backoff(
+        wait_time: float, deadline: Deadline | None, warning: str
+    ) -> None:
+        """Warn and sleep before a retry unless that overruns ``deadline``."""
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining is not None and remaining <= wait_time:
+                raise PhaseTimeout
+        print(warning)
+        time.sleep(wait_time)
+
     def _extract_response(self, result) -> str:
         """Extract response from agent result, handling tool calls properly.
 
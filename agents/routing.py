@@ -0,0 +1,280 @@
+"""Per-call-kind model routing.
+
+Mechanical calls (votes, lone night actions, summaries, god
+announcements) don't need the model used for persuasive day speeches. A
+``ModelRouter`` maps each ``CallKind`` to a named tier and keeps latency
+and token usage per tier.
+
+langchain is only imported once a router is created, so the CLI can
+validate a config without paying for it.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from game import trace
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+    from agents.cache import ResponseCache
+
+# Backends ``agents.backends`` registers, named here so a config can be
+# checked without importing it
+BUILTIN_BACKENDS = ("fake", "gemini", "openai", "replay")
+
+
+class CallKind(str, Enum):
+    SPEECH = "speech"
+    NIGHT_DISCUSSION = "night_discussion"
+    NIGHT_ACTION = "night_action"
+    VOTE = "vote"
+    SUMMARY = "summary"
+    ANNOUNCEMENT = "announcement"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """Settings of one model tier.
+
+    ``backend`` names an entry of the backend registry in
+    ``agents.backends``; ``options`` holds backend-specific keyword
+    arguments.
+    """
+
+    name: str
+    model: str
+    backend: str = "gemini"
+    temperature: float = 1.0
+    max_tokens: int | None = None
+    options: tuple[tuple[str, Any], ...] = ()
+
+
+@dataclass(slots=True)
+class TierStats:
+    calls: int = 0
+    seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+@cache
+def _usage_counter() -> type:
+    """Callback class adding up ``usage_metadata`` of every call it sees."""
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, LLMResult
+
+    class UsageCounter(BaseCallbackHandler):
+        def __init__(self, stats: TierStats, lock: threading.Lock) -> None:
+            super().__init__()
+            self.stats = stats
+            self.lock = lock
+
+        def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+            for generations in response.generations:
+                for generation in generations:
+                    if not isinstance(generation, ChatGeneration):
+                        continue
+                    message = generation.message
+                    usage = (
+                        message.usage_metadata
+                        if isinstance(message, AIMessage)
+                        else None
+                    )
+                    if usage:
+                        with self.lock:
+                            self.stats.input_tokens += usage["input_tokens"]
+                            self.stats.output_tokens += usage["output_tokens"]
+
+    return UsageCounter
+
+
+def parse_config(
+    config: dict[str, Any],
+) -> tuple[dict[str, ModelTier], dict[CallKind, str], str | None]:
+    """Read tiers, routes and default tier from a JSON-style config.
+
+    See ``ModelRouter.from_config`` for the format. Nothing is built, so
+    this is cheap enough to validate a config up front.
+
+    Returns:
+        Tiers by name, tier name per call kind and the default tier
+
+    Raises:
+        ValueError: If the config is malformed or names an unknown tier or
+            call kind
+    """
+    try:
+        tiers = {}
+        for name, spec in config["tiers"].items():
+            spec = dict(spec)
+            tiers[name] = ModelTier(
+                name=name,
+                model=spec.pop("model"),
+                backend=spec.pop("backend", config.get("backend", "gemini")),
+                temperature=spec.pop("temperature", 1.0),
+                max_tokens=spec.pop("max_tokens", None),
+                options=tuple(sorted(spec.items())),
+            )
+    except (KeyError, AttributeError, TypeError) as e:
+        raise ValueError(f"Malformed model tier config: {e!r}") from e
+    routes = {
+        CallKind(kind): tier for kind, tier in config.get("routes", {}).items()
+    }
+    default = config.get("default")
+    unknown = {default or next(iter(tiers), None), *routes.values()}
+    unknown -= set(tiers)
+    if unknown:
+        raise ValueError(
+            f"Unknown model tiers: {', '.join(map(str, unknown))}"
+        )
+    return tiers, routes, default
+
+
+class ModelRouter:
+    """Routes each call kind to a chat model tier and records usage."""
+
+    def __init__(
+        self,
+        models: dict[str, "BaseChatModel"],
+        routes: dict[CallKind, str] | None = None,
+        default: str | None = None,
+        cache: "ResponseCache | None" = None,
+    ) -> None:
+        """Create a router.
+
+        Args:
+            models: Chat model per tier name
+            routes: Tier name per call kind; unlisted kinds use ``default``
+            default: Fallback tier, the first tier when omitted
+            cache: Response cache for the god's announcements and round
+                summaries, may be shared by several routers
+
+        Raises:
+            ValueError: If a route or the default names an unknown tier
+        """
+        if not models:
+            raise ValueError("At least one model tier is required")
+        self.models = models
+        self.default = default or next(iter(models))
+        self.routes = dict(routes or {})
+        self.cache = cache
+        unknown = {self.default, *self.routes.values()} - set(models)
+        if unknown:
+            raise ValueError(f"Unknown model tiers: {', '.join(unknown)}")
+        self._lock = threading.Lock()
+        self.stats = {name: TierStats() for name in models}
+        counter = _usage_counter()
+        self._callbacks = {
+            name: counter(stats, self._lock)
+            for name, stats in self.stats.items()
+        }
+
+    @classmethod
+    def single(cls, llm: "BaseChatModel") -> "ModelRouter":
+        """Router sending every call kind to ``llm``."""
+        return cls({"default": llm})
+
+    @classmethod
+    def from_config(
+        cls,
+        config: dict[str, Any],
+        build: Callable[[ModelTier], "BaseChatModel"] | None = None,
+        cache: "ResponseCache | None" = None,
+    ) -> "ModelRouter":
+        """Build a router from a JSON-style config.
+
+        Example::
+
+            {
+                "backend": "gemini",
+                "tiers": {
+                    "main": {"model": "gemini-2.0-flash"},
+                    "fast": {"model": "gemini-2.0-flash-lite",
+                             "temperature": 0.2, "max_tokens": 256}
+                },
+                "routes": {"vote": "fast", "summary": "fast"},
+                "default": "main"
+            }
+
+        A tier may set its own ``backend``; the top-level one is the
+        default for the others.
+
+        Args:
+            config: Tier definitions, routes and default tier
+            build: Creates the chat model for a tier. Defaults to the
+                backend registry.
+            cache: See ``__init__``
+
+        Returns:
+            The configured router
+        """
+        tiers, routes, default = parse_config(config)
+        if build is None:
+            from agents.backends import build_chat_model as build
+
+        return cls(
+            {name: build(tier) for name, tier in tiers.items()},
+            routes=routes,
+            default=default,
+            cache=cache,
+        )
+
+    def tier_for(self, kind: CallKind) -> str:
+        return self.routes.get(kind, self.default)
+
+    def llm_for(self, kind: CallKind) -> "BaseChatModel":
+        return self.models[self.tier_for(kind)]
+
+    @contextmanager
+    def track(self, kind: CallKind) -> Iterator[dict[str, Any]]:
+        """Time a call of ``kind`` and count its tokens.
+
+        Yields:
+            Runnable config to pass to ``invoke`` so token usage is seen
+        """
+        tier = self.tier_for(kind)
+        callbacks = [self._callbacks[tier]]
+        traced = trace.current()
+        if traced is not None:
+            # Tokens of this request alone, for its span
+            usage = TierStats()
+            callbacks.append(_usage_counter()(usage, self._lock))
+            tracer, parent = traced
+            span = tracer.begin(
+                kind.value, "request", parent, call_kind=kind.value, tier=tier
+            )
+        start = time.perf_counter()
+        try:
+            yield {"callbacks": callbacks}
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stats[tier].calls += 1
+                self.stats[tier].seconds += elapsed
+            if traced is not None:
+                tracer.end(
+                    span,
+                    input_tokens=usage.input_tokens,
+                    output_tokens=usage.output_tokens,
+                )
+
+    def report(self) -> str:
+        lines = [
+            f"{'tier':<12}{'calls':>8}{'mean ms':>10}{'in tok':>10}"
+            f"{'out tok':>10}"
+        ]
+        for name, s in self.stats.items():
+            mean = s.seconds / s.calls * 1000 if s.calls else 0.0
+            lines.append(
+                f"{name:<12}{s.calls:>8}{mean:>10.1f}{s.input_tokens:>10}"
+                f"{s.output_tokens:>10}"
+            )
+        return "\n".join(lines)
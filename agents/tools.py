@@ -140,6 +140,53 @@ def defend_self(statement: str) -> str:
     return f"Let me defend myself: {statement}"
 
 
+# Batched tools: one request decides for several players, each call
+# names the player it is for
+class BatchVoteInput(VoteInput):
+    """Input for one player's vote in a batched request."""
+
+    player: str = Field(description="Name of the player casting the vote")
+
+
+class BatchStatementInput(BaseModel):
+    """Input for one player's statement in a batched request."""
+
+    player: str = Field(description="Name of the player speaking")
+    statement: str = Field(description="What the player says")
+
+
+@tool("vote_as_player", args_schema=BatchVoteInput)
+def vote_as_player(player: str, player_name: str) -> str:
+    """Cast the vote of one of the listed players.
+
+    IMPORTANT: Call this tool exactly once for EVERY listed player.
+
+    Args:
+        player: Name of the listed player who votes
+        player_name: Name of the player they vote for (must be an exact match from available players)
+
+    Returns:
+        Vote message
+    """
+    return f"I vote for {player_name}"
+
+
+@tool("speak_as_player", args_schema=BatchStatementInput)
+def speak_as_player(player: str, statement: str) -> str:
+    """Say the statement of one of the listed players.
+
+    IMPORTANT: Call this tool exactly once for EVERY listed player.
+
+    Args:
+        player: Name of the listed player who speaks
+        statement: Their statement, e.g. an accusation with its reason
+
+    Returns:
+        The statement
+    """
+    return statement
+
+
 # God tools
 class PrivateRevealInput(BaseModel):
     """Input for private detective reveal."""
@@ -163,13 +210,12 @@ def private_reveal(player_name: str, is_mafia: bool) -> str:
     return f"{player_name} {status} a mafia"
 
 
-@tool("get_special_instruction")
-def get_special_instruction() -> str:
+def read_special_instruction() -> str:
     """Get special instruction from user via stdin.
 
-    Use this tool when you need special instructions from the user
-    to make an announcement or decision.
-    The tool will block waiting for user input.
+    The game asks before each elimination announcement, on its own
+    thread, and hands the answer to the god. Blocks waiting for user
+    input.
     """
     print("\n[GOD]: Do you have any special instructions for this round?")
     print("(Press Enter for none, or type your instruction):")
@@ -185,7 +231,7 @@ def exit_game() -> None:
     """Exit the game immediately.
 
     WARNING: This tool should ONLY be used when explicitly instructed
-    by the user via special_instruction. Do NOT use this tool under
+    by the user via a special instruction. Do NOT use this tool under
     any other circumstances. Using this tool will terminate the entire
     game program.
     """
@@ -205,5 +251,7 @@ DETECTIVE_TOOLS = PLAYER_TOOLS
 GOD_TOOLS = [
     private_reveal,
     exit_game,
-    get_special_instruction,
 ]
+
+# Nobody at the terminal can tell an unattended god to end the game
+UNATTENDED_GOD_TOOLS = [private_reveal]
@@ -0,0 +1,104 @@
+"""Time transcript queries against a large game archive.
+
+Plays a few games against the offline fake model, copies them into a
+fresh archive until it holds ``--games`` games, and times typical
+queries with and without fetching the event texts.
+
+    python -m benchmarks.archive_queries --games 5000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from agents.fake_llm import FakeChatModel
+from agents.god import GodAgent
+from agents.player import PlayerAgent
+from game.archive import ArchiveRecorder, GameArchive
+from game.events import EventBus, EventKind
+from game.mafia_game import MafiaGame
+from game.types import Role
+
+QUERIES = {
+    "day votes, detective killed night 1": dict(
+        kind=EventKind.VOTE, phase="day", died=(Role.DETECTIVE, 1, "night")
+    ),
+    "votes cast by mafia on round 2": dict(
+        kind=EventKind.VOTE, speaker_role=Role.MAFIA, round_no=2
+    ),
+    "one player's speeches in mafia wins": dict(
+        kind=EventKind.SPEECH, speaker="Player 3", winner="mafia"
+    ),
+    "detective reveals": dict(kind=EventKind.REVEAL),
+}
+
+
+def play(archive: GameArchive, game_id: str, size: int, seed: int) -> None:
+    llm = FakeChatModel(seed=seed)
+    players = [
+        PlayerAgent(
+            name=f"Player {i}",
+            system_prompt="You are playing mafia.",
+            llm=llm,
+        )
+        for i in range(1, size + 1)
+    ]
+    god = GodAgent(llm=llm, name="God", system_prompt="You narrate mafia.")
+    events = EventBus()
+    events.subscribe("archive", ArchiveRecorder(archive, game_id), block=True)
+    MafiaGame(god, players, events=events, quiet=True).match_start()
+    events.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument(
+        "--played", type=int, default=8, help="Distinct games to copy"
+    )
+    parser.add_argument("--size", type=int, default=10)
+    args = parser.parse_args()
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = GameArchive(Path(tmp, "source.sqlite"))
+        for n in range(args.played):
+            play(source, f"played/{n}", args.size, seed=n)
+        played = [
+            [event.to_dict() for event in source.transcript(game_id)]
+            for game_id in source.games()
+        ]
+
+        archive = GameArchive(Path(tmp, "archive.sqlite"))
+        start = time.perf_counter()
+        for n in range(args.games):
+            archive.add(f"game/{n}", played[n % len(played)])
+        elapsed = time.perf_counter() - start
+        # Reopen as a later query session would
+        archive.close()
+        archive = GameArchive(Path(tmp, "archive.sqlite"))
+        stats = archive.stats()
+        print(
+            f"Archived {stats['games']} games ({stats['events']} events) in "
+            f"{elapsed:.1f}s, {stats['raw_bytes'] / 2**20:.1f} MiB of text "
+            f"in {stats['compressed_bytes'] / 2**20:.1f} MiB"
+        )
+        print(f"{'query':<40}{'events':>8}{'index ms':>10}{'text ms':>10}")
+        for label, filters in QUERIES.items():
+            timings = []
+            for text in (False, True):
+                start = time.perf_counter()
+                found = archive.events(text=text, **filters)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{label:<40}{len(found):>8}{timings[0]:>10.1f}"
+                f"{timings[1]:>10.1f}"
+            )
+        source.close()
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Compare batched decisions with per-player calls on the same questions.
+
+Plays games with simultaneous openings. Whenever the game would batch a
+vote or an opening statement, every same-role group is asked twice from
+identical memories: once per player, and once in a single batched
+request (``agents.batch``). The game continues with the per-player
+answers, so both paths keep seeing the same transcripts. Prints, per
+question type:
+
+- how often a batched player picked the same target as their own call
+  (the vote, or the first player named in an opening)
+- how often the batched votes elect the same player as the per-player
+  votes of the same group
+- requests and input/output tokens of both paths, and the tokens saved
+- coverage: the share of players the batched reply decided for
+
+With the offline fake model targets are random, so only the token and
+request columns mean anything; pass a real config to measure fidelity:
+
+    python -m benchmarks.batched_calls --games 5 --size 10 --batch-size 8
+    python -m benchmarks.batched_calls --config tiers.json --games 3
+"""
+
+import argparse
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from agents import batch
+from agents.god import GodAgent
+from agents.player import PlayerAgent
+from agents.routing import CallKind, ModelRouter, TierStats
+from game.discussion import DiscussionConfig
+from game.mafia_game import MafiaGame
+from game.rules import tally
+from game.setup import model_config
+from utils.personalities import PersonalityRegistry
+
+QUESTIONS = {"vote_as_player": "votes", "speak_as_player": "openings"}
+
+
+@dataclass(slots=True)
+class Comparison:
+    """Both paths' answers to one type of question."""
+
+    decisions: int = 0
+    agreed: int = 0
+    elections: int = 0
+    same_elected: int = 0
+    solo: TierStats = field(default_factory=TierStats)
+    batched: TierStats = field(default_factory=TierStats)
+    stats: batch.BatchStats = field(default_factory=batch.BatchStats)
+
+
+def named(text: str, names: list[str]) -> str | None:
+    """The player ``text`` names first, longest name on a tie."""
+    found = [
+        (m.start(), -len(n), n)
+        for n in names
+        for m in [re.search(rf"\b{re.escape(n)}\b", text)]
+        if m
+    ]
+    return min(found)[2] if found else None
+
+
+def usage(router: ModelRouter) -> TierStats:
+    total = TierStats()
+    for stats in router.stats.values():
+        total.calls += stats.calls
+        total.input_tokens += stats.input_tokens
+        total.output_tokens += stats.output_tokens
+    return total
+
+
+class ShadowGame(MafiaGame):
+    """Game that asks every batchable question both ways.
+
+    Copies of the group are asked on routers of their own, over the
+    game's models, so each path's requests and tokens are counted apart.
+    """
+
+    def __init__(
+        self, *args, results: dict[str, Comparison], **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.results = results
+
+    def _copies(
+        self, group: list[PlayerAgent], router: ModelRouter
+    ) -> list[PlayerAgent]:
+        copies = []
+        for p in group:
+            copy = PlayerAgent(
+                name=p.name,
+                system_prompt=p.system_prompt,
+                role=p.role,
+                router=router,
+            )
+            copy.memory = list(p.memory)
+            copies.append(copy)
+        return copies
+
+    def _batched(
+        self,
+        players: list[PlayerAgent],
+        instruction: str,
+        kind: CallKind,
+        tool: str,
+    ) -> dict[str, str]:
+        result = self.results[QUESTIONS[tool]]
+        names = self.state.snapshot().alive
+        answers: dict[str, str] = {}
+        for group in batch.by_role(players, self.discussion.batch_size):
+            source = group[0].router
+            solo_router, batch_router = (
+                ModelRouter(source.models, source.routes, source.default)
+                for _ in range(2)
+            )
+            solo = {
+                p.name: p.speak(instruction, kind)
+                for p in self._copies(group, solo_router)
+            }
+            batched = batch.decide(
+                self._copies(group, batch_router),
+                instruction,
+                kind,
+                tool,
+                result.stats,
+            )
+            for stats, router in (
+                (result.solo, solo_router),
+                (result.batched, batch_router),
+            ):
+                spent = usage(router)
+                stats.calls += spent.calls
+                stats.input_tokens += spent.input_tokens
+                stats.output_tokens += spent.output_tokens
+
+            picks = {
+                path: {n: named(a, names) for n, a in answers_.items()}
+                for path, answers_ in (("solo", solo), ("batched", batched))
+            }
+            for name, target in picks["batched"].items():
+                result.decisions += 1
+                result.agreed += target == picks["solo"].get(name)
+            if tool == "vote_as_player" and picks["batched"]:
+                elected = {
+                    path: tally(
+                        Counter(
+                            picks[path].get(p.name) or picks["solo"][p.name]
+                            for p in group
+                        )
+                    )
+                    for path in picks
+                }
+                result.elections += 1
+                result.same_elected += elected["solo"] == elected["batched"]
+
+            # Play on with the per-player answers, as ``speak`` would
+            for p in group:
+                p.memory.append(f"[{p.name}]: {solo[p.name]}")
+            answers.update(solo)
+        return answers
+
+
+def play(
+    config: dict,
+    size: int,
+    rounds: int,
+    discussion: DiscussionConfig,
+    results: dict[str, Comparison],
+) -> None:
+    registry = PersonalityRegistry.load()
+    router = ModelRouter.from_config(config)
+    *lobby, narrator = list(registry)[: size + 1]
+    players = [
+        PlayerAgent(name=p.name, system_prompt=p.prompt, router=router)
+        for p in lobby
+    ]
+    god = GodAgent(
+        llm=None,
+        name=narrator.name,
+        system_prompt=narrator.prompt,
+        router=router,
+    )
+    game = ShadowGame(
+        god, players, quiet=True, discussion=discussion, results=results
+    )
+    game.match_start(max_rounds=rounds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--backend", default="fake", help="Backend for every tier"
+    )
+    parser.add_argument(
+        "--config", default=None, help="JSON file with model tiers"
+    )
+    args = parser.parse_args()
+
+    discussion = DiscussionConfig(
+        simultaneous_openings=True, batch_size=args.batch_size
+    )
+    results = {question: Comparison() for question in QUESTIONS.values()}
+    for game in range(args.games):
+        args_for_game = argparse.Namespace(**vars(args))
+        args_for_game.seed = args.seed + game
+        play(
+            model_config(args_for_game),
+            args.size,
+            args.rounds,
+            discussion,
+            results,
+        )
+
+    print(
+        f"{'':<10}{'decided':>8}{'agree %':>9}{'elect %':>9}"
+        f"{'requests':>14}{'input tokens':>22}{'output tokens':>18}"
+        f"{'saved %':>9}{'coverage':>10}"
+    )
+    for question, r in results.items():
+        agree = 100 * r.agreed / r.decisions if r.decisions else 0.0
+        elect = (
+            f"{100 * r.same_elected / r.elections:>9.1f}"
+            if r.elections
+            else f"{'-':>9}"
+        )
+        solo_tokens = r.solo.input_tokens + r.solo.output_tokens
+        batched_tokens = r.batched.input_tokens + r.batched.output_tokens
+        saved = (
+            100 * (1 - batched_tokens / solo_tokens) if solo_tokens else 0.0
+        )
+        print(
+            f"{question:<10}{r.decisions:>8}{agree:>9.1f}{elect}"
+            f"{f'{r.solo.calls} -> {r.batched.calls}':>14}"
+            f"{f'{r.solo.input_tokens:,} -> {r.batched.input_tokens:,}':>22}"
+            f"{f'{r.solo.output_tokens:,} -> {r.batched.output_tokens:,}':>18}"
+            f"{saved:>9.1f}{r.stats.coverage:>10.0%}"
+        )
+    if args.config is None and args.backend == "fake":
+        print("Fake model targets are random: agreement is chance level.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""Ramp up concurrent games in one process against the stand-in model API.
+
+Every model call goes over HTTP to a local ``standin_server`` with the
+injected latency and error rate. For 1, 2, 4, ... up to ``--max-games``
+games played at once, records:
+
+- games/s over the level's wall time
+- scheduling delay: how long calls waited for a worker thread, p50/p99
+- call overhead: mean call latency above the latency injected into its
+  requests (client, agent graph and retries)
+- RSS growth per game, and the text held in player ``memory`` lists
+- p50/p95/p99 round time
+
+The curve is written as JSON so releases can be compared:
+
+    python -m benchmarks.loadtest --max-games 32 --latency 0.2 \\
+        --error-rate 0.01 --out results/loadtest.json
+    python -m benchmarks.loadtest --max-games 32 --latency 0.2 \\
+        --compare results/loadtest.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import threading
+import time
+import tomllib
+from pathlib import Path
+from typing import Any
+
+from agents.god import GodAgent
+from agents.player import PlayerAgent
+from agents.routing import ModelRouter
+from benchmarks.standin_server import serve_in_background
+from game.events import EventBus, GameEvent
+from game.mafia_game import MafiaGame
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def rss_bytes() -> int:
+    """Current resident set size; the peak so far where /proc is missing."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * resource.getpagesize()
+    except OSError:
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if platform.system() == "Darwin" else peak * 1024
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class RoundClock:
+    """Event sink timing each round from its first to its last event."""
+
+    def __init__(self) -> None:
+        self.spans: dict[int, list[float]] = {}
+
+    def __call__(self, event: GameEvent) -> None:
+        span = self.spans.setdefault(event.round_no, [event.ts, event.ts])
+        span[0], span[1] = min(span[0], event.ts), max(span[1], event.ts)
+
+    def durations(self) -> list[float]:
+        return [end - start for start, end in self.spans.values()]
+
+
+class PeakRss:
+    """Samples RSS on a thread and keeps the highest value."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.peak = rss_bytes()
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        return max(self.peak, rss_bytes())
+
+
+def play(
+    config: dict[str, Any], size: int, rounds: int, start: threading.Barrier
+) -> tuple[MafiaGame, list[PlayerAgent], RoundClock]:
+    router = ModelRouter.from_config(config)
+    players = [
+        PlayerAgent(
+            name=f"Player {i}",
+            system_prompt="You are playing mafia.",
+            router=router,
+        )
+        for i in range(1, size + 1)
+    ]
+    god = GodAgent(
+        llm=None, name="God", system_prompt="You narrate mafia.", router=router
+    )
+    clock = RoundClock()
+    events = EventBus()
+    events.subscribe("rounds", clock)
+    game = MafiaGame(god, players, events=events, quiet=True)
+    start.wait()
+    try:
+        game.match_start(max_rounds=rounds)
+    finally:
+        events.close()
+    return game, players, clock
+
+
+def run_level(
+    games: int, config: dict[str, Any], args: argparse.Namespace, server
+) -> dict[str, float]:
+    """Play ``games`` games at once and measure them."""
+    results: list[tuple[MafiaGame, list[PlayerAgent], RoundClock]] = []
+    failures: list[BaseException] = []
+    lock = threading.Lock()
+    start = threading.Barrier(games + 1)
+
+    def worker() -> None:
+        try:
+            result = play(config, args.size, args.rounds, start)
+        except BaseException as e:
+            with lock:
+                failures.append(e)
+            return
+        with lock:
+            results.append(result)
+
+    requests_before, errors_before = server.requests, server.errors
+    baseline = rss_bytes()
+    sampler = PeakRss()
+    threads = [threading.Thread(target=worker) for _ in range(games)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - began
+    peak = sampler.stop()
+    if failures:
+        raise RuntimeError(f"{len(failures)} games failed") from failures[0]
+
+    delays = [d for game, _, _ in results for d in game.metrics.queue_delays]
+    rounds = [d for _, _, clock in results for d in clock.durations()]
+    calls = sum(
+        s.calls for game, _, _ in results for s in game.metrics.phases.values()
+    )
+    call_seconds = sum(
+        s.seconds
+        for game, _, _ in results
+        for s in game.metrics.phases.values()
+    )
+    memory = sum(
+        len(line)
+        for _, players, _ in results
+        for p in players
+        for line in p.memory
+    )
+    requests = server.requests - requests_before
+    # A call is one or more requests (tool calls take a second one)
+    injected = (args.latency + args.jitter / 2) * requests
+    return {
+        "games": games,
+        "seconds": wall,
+        "games_per_s": games / wall,
+        "calls": calls,
+        "requests": requests,
+        "errors": server.errors - errors_before,
+        "queue_p50_ms": percentile(delays, 50) * 1000,
+        "queue_p99_ms": percentile(delays, 99) * 1000,
+        "overhead_ms": (call_seconds - injected) / calls * 1000
+        if calls
+        else 0.0,
+        "rss_mib_per_game": (peak - baseline) / games / 2**20,
+        "memory_kib_per_game": memory / games / 1024,
+        "round_p50_s": percentile(rounds, 50),
+        "round_p95_s": percentile(rounds, 95),
+        "round_p99_s": percentile(rounds, 99),
+    }
+
+
+# Key, header and decimals of each column of the table
+COLUMNS = (
+    ("games", "games", 0),
+    ("games_per_s", "games/s", 2),
+    ("requests", "requests", 0),
+    ("errors", "errors", 0),
+    ("queue_p50_ms", "queue p50 ms", 2),
+    ("queue_p99_ms", "queue p99 ms", 2),
+    ("overhead_ms", "overhead ms", 1),
+    ("rss_mib_per_game", "RSS MiB/game", 1),
+    ("memory_kib_per_game", "memory KiB/game", 1),
+    ("round_p50_s", "round p50 s", 2),
+    ("round_p95_s", "round p95 s", 2),
+    ("round_p99_s", "round p99 s", 2),
+)
+
+
+def table_row(row: dict[str, float]) -> str:
+    return "".join(
+        f"{row[key]:>{len(label) + 2}.{decimals}f}"
+        for key, label, decimals in COLUMNS
+    )
+
+
+def describe_build() -> dict[str, str]:
+    version = tomllib.loads((ROOT / "pyproject.toml").read_text())["project"][
+        "version"
+    ]
+    try:
+        commit = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "version": version,
+        "commit": commit,
+        "python": platform.python_version(),
+    }
+
+
+def compare(rows: list[dict[str, float]], path: str) -> None:
+    """Print this run against an earlier curve, level by level."""
+    old = json.loads(Path(path).read_text())
+    before = {row["games"]: row for row in old["levels"]}
+    build = old["build"]
+    print(f"\nAgainst {build['version']} ({build['commit']}):")
+    print(
+        f"{'games':>6}{'games/s':>16}{'round p95 s':>18}{'RSS MiB/game':>18}"
+    )
+    for row in rows:
+        prev = before.get(row["games"])
+        if prev is None:
+            continue
+        cells = []
+        for key in ("games_per_s", "round_p95_s", "rss_mib_per_game"):
+            change = (
+                (row[key] / prev[key] - 1) * 100 if prev[key] else float("nan")
+            )
+            cells.append(f"{row[key]:>9.2f} {change:>+6.1f}%")
+        print(f"{row['games']:>6}" + "".join(f"{c:>18}" for c in cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--max-games", type=int, default=16)
+    parser.add_argument(
+        "--levels",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Concurrent games per level; powers of two by default",
+    )
+    parser.add_argument("--size", type=int, default=8, help="Players")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write the curve here")
+    parser.add_argument(
+        "--compare", default=None, help="Earlier curve to compare with"
+    )
+    args = parser.parse_args()
+    levels = args.levels or [
+        2**i
+        for i in range(args.max_games.bit_length())
+        if 2**i <= args.max_games
+    ]
+
+    random.seed(args.seed)
+    server = serve_in_background(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    config = {
+        "backend": "openai",
+        "tiers": {"main": {"model": "stand-in", "base_url": server.base_url}},
+    }
+
+    print("".join(f"{label:>{len(label) + 2}}" for _, label, _ in COLUMNS))
+    # Imports, HTTP pool and first-call costs shouldn't count as level 1's
+    run_level(1, config, args, server)
+    rows = []
+    for games in levels:
+        row = run_level(games, config, args, server)
+        rows.append(row)
+        print(table_row(row))
+    server.shutdown()
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        params = {
+            k: v for k, v in vars(args).items() if k not in ("out", "compare")
+        }
+        out.write_text(
+            json.dumps(
+                {"build": describe_build(), "params": params, "levels": rows},
+                indent=2,
+            )
+        )
+        print(f"Wrote {out}")
+    if args.compare:
+        compare(rows, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Measure how LLM call count and latency grow with lobby size.
+
+Runs the first round(s) of a game per lobby size against the offline
+fake model and prints per-phase call counts and timings, after the cold
+start times of the CLI and of the game modules.
+
+    python -m benchmarks.scaling --sizes 10 25 50 100 --latency 0.01
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import time
+
+from agents.fake_llm import FakeChatModel
+from agents.god import GodAgent
+from agents.player import PlayerAgent
+from game.discussion import DiscussionConfig
+from game.mafia_game import MafiaGame
+from game.roles import RoleDistribution
+
+PHASES = ("mafia", "healer", "detective", "day", "round_end")
+
+# Each is timed in a fresh interpreter so nothing is cached yet
+STARTUP_PROBES = {
+    "python main.py --dry-run": ["main.py", "--dry-run"],
+    "import game.mafia_game": ["-c", "import game.mafia_game"],
+    "import agents.backends": ["-c", "import agents.backends"],
+}
+
+
+def startup_times() -> dict[str, float]:
+    times = {}
+    for label, argv in STARTUP_PROBES.items():
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *argv], check=True, capture_output=True
+        )
+        times[label] = time.perf_counter() - start
+    return times
+
+
+def run(
+    size: int,
+    rounds: int,
+    latency: float,
+    roles: RoleDistribution,
+    discussion: DiscussionConfig,
+) -> tuple[MafiaGame, float]:
+    llm = FakeChatModel(latency=latency, seed=size)
+    players = [
+        PlayerAgent(
+            name=f"Player {i}",
+            system_prompt="You are playing mafia.",
+            llm=llm,
+        )
+        for i in range(1, size + 1)
+    ]
+    god = GodAgent(llm=llm, name="God", system_prompt="You narrate mafia.")
+    game = MafiaGame(
+        god, players, quiet=True, roles=roles, discussion=discussion
+    )
+    start = time.perf_counter()
+    game.match_start(max_rounds=rounds)
+    return game, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 20, 40, 70, 100]
+    )
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds per fake call"
+    )
+    parser.add_argument(
+        "--roles", default="", help='e.g. "mafia=0.25,detective=0.1"'
+    )
+    parser.add_argument(
+        "--schedule-above",
+        type=int,
+        default=DiscussionConfig.schedule_threshold,
+        help="Schedule day speakers above this many alive players",
+    )
+    parser.add_argument(
+        "--slots", type=int, default=DiscussionConfig.speaking_slots
+    )
+    parser.add_argument("--breakouts", type=int, default=0)
+    parser.add_argument(
+        "--simultaneous",
+        action="store_true",
+        help="Generate opening statements concurrently",
+    )
+    args = parser.parse_args()
+    discussion = DiscussionConfig(
+        schedule_threshold=args.schedule_above,
+        speaking_slots=args.slots,
+        breakout_groups=args.breakouts,
+        simultaneous_openings=args.simultaneous,
+    )
+    random.seed(0)
+    roles = (
+        RoleDistribution.from_spec(args.roles)
+        if args.roles
+        else RoleDistribution.default()
+    )
+
+    for label, seconds in startup_times().items():
+        print(f"{label:<28}{seconds:>8.3f}s")
+    print()
+
+    header = f"{'players':>8}{'total s':>10}{'calls':>8}" + "".join(
+        f"{p + ' calls':>17}{p + ' s':>14}" for p in PHASES
+    )
+    print(header)
+    for size in args.sizes:
+        game, elapsed = run(size, args.rounds, args.latency, roles, discussion)
+        phases = game.metrics.phases
+        total_calls = sum(s.calls for s in phases.values())
+        row = f"{size:>8}{elapsed:>10.2f}{total_calls:>8}"
+        for name in PHASES:
+            stats = phases.get(name)
+            calls = stats.calls if stats else 0
+            wall = stats.wall_seconds if stats else 0.0
+            row += f"{calls:>17}{wall:>14.2f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
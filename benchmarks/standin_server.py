@@ -0,0 +1,186 @@
+"""Local OpenAI-compatible stand-in for the model API.
+
+Answers ``POST /v1/chat/completions`` with the fake model's moves, with
+optional injected latency and error rate, so the openai backend and the
+HTTP path can be exercised without an API key.
+
+    python -m benchmarks.standin_server --port 8400 --latency 0.2
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+
+from agents.fake_llm import FakeChatModel
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many concurrent games open many connections at once
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.model = FakeChatModel(seed=seed)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.rng.uniform(0, self.jitter))
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            failed = self.rng.random() < self.error_rate
+            self.errors += failed
+            return failed
+
+
+def _to_messages(raw: list[dict]) -> list[BaseMessage]:
+    messages: list[BaseMessage] = []
+    for m in raw:
+        content = m.get("content") or ""
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content)
+        if m.get("role") == "tool":
+            messages.append(
+                ToolMessage(content=content, tool_call_id=m["tool_call_id"])
+            )
+        else:
+            messages.append(HumanMessage(content=content))
+    return messages
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK and every call gains ~40 ms
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+        time.sleep(self.server.delay())
+        if self.server.should_fail():
+            self._send(503, {"error": {"message": "injected failure"}})
+            return
+
+        tools = [t["function"]["name"] for t in body.get("tools", [])]
+        model = self.server.model.model_copy(update={"tool_names": tools})
+        model._rng, model._lock = self.server.rng, self.server.lock
+        messages = _to_messages(body.get("messages", []))
+        reply = model.invoke(messages)
+        usage = reply.usage_metadata or {}
+        message: dict = {"role": "assistant", "content": reply.content}
+        if reply.tool_calls:
+            message["tool_calls"] = [
+                {
+                    "id": call["id"] or uuid.uuid4().hex,
+                    "type": "function",
+                    "function": {
+                        "name": call["name"],
+                        "arguments": json.dumps(call["args"]),
+                    },
+                }
+                for call in reply.tool_calls
+            ]
+        self._send(
+            200,
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stand-in"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": message,
+                        "finish_reason": (
+                            "tool_calls" if reply.tool_calls else "stop"
+                        ),
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": usage.get("input_tokens", 0),
+                    "completion_tokens": usage.get("output_tokens", 0),
+                    "total_tokens": usage.get("total_tokens", 0),
+                },
+            },
+        )
+
+    def _send(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:
+        return
+
+
+def serve_in_background(
+    host: str = "127.0.0.1", port: int = 0, **kwargs
+) -> StandInServer:
+    """Start a stand-in server on a daemon thread (port 0 picks one)."""
+    server = StandInServer((host, port), **kwargs)
+    threading.Thread(
+        target=server.serve_forever, name="standin-server", daemon=True
+    ).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8400)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    server = StandInServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"Stand-in model API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
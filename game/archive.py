@@ -0,0 +1,496 @@
+"""Compressed, indexed archive of finished games.
+
+Each round of a game is stored as one zlib-compressed chunk of JSON
+lines, one per event. Next to the chunks, SQLite indexes every event
+without its text (round, phase, kind, speaker and their roles, vote
+target) and every seat (role, when and how the player died) along with
+the outcome, so queries such as "all day votes in games where the
+detective was killed on night 1" only read the index:
+
+    archive = GameArchive("results/archive.sqlite")
+    votes = archive.events(
+        kind=EventKind.VOTE, phase="day", died=(Role.DETECTIVE, 1, "night")
+    )
+
+Only the chunks holding the matched events are decompressed, and only
+when their text is asked for.
+
+Games come from ``ArchiveRecorder``, an event sink, or from the JSONL
+transcripts written by ``JsonlSink``. Both work from the events alone:
+the round header carries the roles and the last event the winner.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from game.events import EventKind, GameEvent
+from game.types import Role
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    winner TEXT,
+    finished INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    events INTEGER NOT NULL,
+    raw_bytes INTEGER NOT NULL,
+    archived REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seats (
+    game_id TEXT NOT NULL,
+    player TEXT NOT NULL,
+    role TEXT NOT NULL,
+    died_round INTEGER,
+    died_cause TEXT,
+    PRIMARY KEY (game_id, player)
+);
+CREATE TABLE IF NOT EXISTS events (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    round_no INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    speaker TEXT,
+    speaker_role TEXT,
+    target TEXT,
+    target_role TEXT,
+    public INTEGER NOT NULL,
+    -- Index of the event inside its round's chunk
+    position INTEGER NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    game_id TEXT NOT NULL,
+    round_no INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (game_id, round_no)
+);
+CREATE INDEX IF NOT EXISTS events_kind ON events (kind, phase, round_no);
+CREATE INDEX IF NOT EXISTS events_speaker ON events (speaker, kind);
+CREATE INDEX IF NOT EXISTS seats_death ON seats (role, died_round);
+"""
+
+# Event data keys that name the player an event is about
+TARGET_KEYS = ("target", "victim")
+
+# Games with a death of a role in a round, by a cause (any if NULL)
+DIED = (
+    "(SELECT game_id FROM seats WHERE role = ? AND died_round = ? "
+    "AND coalesce(?, died_cause) = died_cause)"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ArchivedEvent:
+    """An indexed event, with its text when it was asked for.
+
+    Attributes:
+        game_id: Game the event belongs to
+        seq: Position of the event in the game
+        round_no: Round of the event
+        phase: Phase of the event
+        kind: What happened
+        speaker: Player who spoke or voted, if any
+        speaker_role: The speaker's role
+        target: Player voted for, checked or killed, if any
+        target_role: The target's role
+        message: Event text, None unless requested
+    """
+
+    game_id: str
+    seq: int
+    round_no: int
+    phase: str
+    kind: EventKind
+    speaker: str | None
+    speaker_role: Role | None
+    target: str | None
+    target_role: Role | None
+    message: str | None = None
+
+
+# Enum lookups by value; calling the enum is slow over many rows
+ROLES: dict[str | None, Role | None] = {
+    None: None,
+    **{r.value: r for r in Role},
+}
+KINDS = {k.value: k for k in EventKind}
+
+
+def _died_params(died: tuple[Role, int, str | None]) -> list[Any]:
+    role, round_no, cause = died
+    return [role.value, round_no, cause]
+
+
+class GameArchive:
+    """Finished games in one SQLite file: compressed text plus an index."""
+
+    def __init__(self, path: str | Path, level: int = 6) -> None:
+        """Open or create an archive.
+
+        Args:
+            path: SQLite file, created with its directory if missing
+            level: zlib compression level of new chunks
+        """
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            # Planner statistics let filters on outcomes and deaths pick
+            # the games first instead of scanning every event of a kind
+            self._conn.execute("PRAGMA optimize=0x10002")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+
+    def __contains__(self, game_id: object) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM games WHERE game_id = ?", (game_id,)
+            ).fetchone()
+        return row is not None
+
+    def add(self, game_id: str, events: Iterable[dict[str, Any]]) -> None:
+        """Archive one game from its events, as ``GameEvent.to_dict`` gives.
+
+        Roles are read from the round headers and deaths from the death
+        events, so the events must come from an omniscient sink.
+
+        Raises:
+            ValueError: If ``game_id`` is already archived or the events
+                carry no roles
+        """
+        events = list(events)
+        roles: dict[str, Role] = {}
+        for event in events:
+            for role, names in event["data"].get("roles", {}).items():
+                roles.update(dict.fromkeys(names, Role(role)))
+        if not roles:
+            raise ValueError(
+                f"Game {game_id} has no role assignments; archive events "
+                "from a sink that sees every role"
+            )
+
+        deaths: dict[str, tuple[int, str]] = {}
+        winner: str | None = None
+        finished = False
+        rounds: dict[int, list[dict[str, Any]]] = {}
+        rows = []
+        for seq, event in enumerate(events):
+            data = event["data"]
+            chunk = rounds.setdefault(event["round_no"], [])
+            target = next((data[k] for k in TARGET_KEYS if data.get(k)), None)
+            if event["kind"] == EventKind.DEATH.value and target:
+                deaths.setdefault(
+                    target, (event["round_no"], data.get("cause", ""))
+                )
+            if "winner" in data:
+                winner, finished = data["winner"], True
+            speaker = event["speaker"]
+            rows.append(
+                (
+                    game_id,
+                    seq,
+                    event["round_no"],
+                    event["phase"],
+                    event["kind"],
+                    speaker,
+                    roles[speaker].value if speaker in roles else None,
+                    target,
+                    roles[target].value if target in roles else None,
+                    event["audience"] is None,
+                    len(chunk),
+                )
+            )
+            chunk.append(event)
+
+        encoded = {
+            round_no: "\n".join(map(json.dumps, chunk)).encode()
+            for round_no, chunk in rounds.items()
+        }
+        with self._lock, self._conn:
+            try:
+                self._conn.execute(
+                    "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        game_id,
+                        winner,
+                        finished,
+                        max(rounds, default=0),
+                        len(events),
+                        sum(map(len, encoded.values())),
+                        time.time(),
+                    ),
+                )
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Game {game_id} is already archived") from e
+            self._conn.executemany(
+                "INSERT INTO seats VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        game_id,
+                        player,
+                        role.value,
+                        *deaths.get(player, (None,) * 2),
+                    )
+                    for player, role in roles.items()
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?)",
+                [
+                    (game_id, round_no, zlib.compress(raw, self.level))
+                    for round_no, raw in encoded.items()
+                ],
+            )
+
+    def import_jsonl(self, path: str | Path, prefix: str = "") -> list[str]:
+        """Archive every game of a ``JsonlSink`` transcript.
+
+        A file may hold several games appended one after another; each
+        starts at its first round header. Games are named
+        ``<prefix><file stem>/<n>`` and ones already archived are skipped.
+
+        Returns:
+            Ids of the newly archived games
+        """
+        path = Path(path)
+        games: list[list[dict[str, Any]]] = []
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if not games or (
+                    event["round_no"] == 1
+                    and "roles" in event["data"]
+                    and any("roles" in e["data"] for e in games[-1])
+                ):
+                    games.append([])
+                games[-1].append(event)
+        added = []
+        for n, events in enumerate(games):
+            game_id = f"{prefix}{path.stem}/{n}"
+            if game_id not in self:
+                self.add(game_id, events)
+                added.append(game_id)
+        return added
+
+    def events(
+        self,
+        *,
+        kind: EventKind | None = None,
+        phase: str | None = None,
+        round_no: int | None = None,
+        speaker: str | None = None,
+        speaker_role: Role | None = None,
+        target_role: Role | None = None,
+        winner: str | None = None,
+        died: tuple[Role, int, str | None] | None = None,
+        public: bool | None = None,
+        game_id: str | None = None,
+        text: bool = False,
+        limit: int | None = None,
+    ) -> list[ArchivedEvent]:
+        """Find events by their indexed fields; every filter is optional.
+
+        Args:
+            kind: Kind of event
+            phase: Phase it happened in, e.g. "day" or "night"
+            round_no: Round it happened in
+            speaker: Player who spoke or voted
+            speaker_role: Role of the speaker
+            target_role: Role of the player voted for, checked or killed
+            winner: Only games won by "town" or "mafia"
+            died: (role, round, cause) of a death the game must have had,
+                e.g. ``(Role.DETECTIVE, 1, "night")``; a None cause
+                matches either
+            public: Only public (True) or only private (False) events
+            game_id: Only this game
+            text: Also return the event texts, decompressing the chunks
+                they are in
+            limit: Return at most this many events
+
+        Returns:
+            Matching events in game and event order
+        """
+        clauses, params = [], []
+        for column, value in (
+            ("e.kind", kind and EventKind(kind).value),
+            ("e.phase", phase),
+            ("e.round_no", round_no),
+            ("e.speaker", speaker),
+            ("e.speaker_role", speaker_role and speaker_role.value),
+            ("e.target_role", target_role and target_role.value),
+            ("e.game_id", game_id),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if public is not None:
+            clauses.append("e.public = ?")
+            params.append(public)
+        if winner is not None:
+            clauses.append(
+                "e.game_id IN (SELECT game_id FROM games WHERE winner = ?)"
+            )
+            params.append(winner)
+        if died is not None:
+            clauses.append(f"e.game_id IN {DIED}")
+            params += _died_params(died)
+        sql = (
+            "SELECT e.game_id, e.seq, e.round_no, e.phase, e.kind, "
+            "e.speaker, e.speaker_role, e.target, e.target_role, e.position "
+            "FROM events e"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY e.game_id, e.seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        chunks: dict[tuple[str, int], list[bytes]] = {}
+        found = []
+        for row in rows:
+            gid, seq, rnd, ph, kd, spk, spk_role, tgt, tgt_role, pos = row
+            message = None
+            if text:
+                if (gid, rnd) not in chunks:
+                    chunks[gid, rnd] = self._chunk(gid, rnd)
+                message = json.loads(chunks[gid, rnd][pos])["message"]
+            found.append(
+                ArchivedEvent(
+                    game_id=gid,
+                    seq=seq,
+                    round_no=rnd,
+                    phase=ph,
+                    kind=KINDS[kd],
+                    speaker=spk,
+                    speaker_role=ROLES[spk_role],
+                    target=tgt,
+                    target_role=ROLES[tgt_role],
+                    message=message,
+                )
+            )
+        return found
+
+    def games(
+        self,
+        winner: str | None = None,
+        died: tuple[Role, int, str | None] | None = None,
+    ) -> list[str]:
+        """Ids of the games won by ``winner`` and having death ``died``.
+
+        See ``events`` for the filters.
+        """
+        sql = "SELECT game_id FROM games WHERE 1"
+        params: list[Any] = []
+        if winner is not None:
+            sql += " AND winner = ?"
+            params.append(winner)
+        if died is not None:
+            sql += f" AND game_id IN {DIED}"
+            params += _died_params(died)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY game_id", params)
+            return [game_id for (game_id,) in rows.fetchall()]
+
+    def transcript(
+        self, game_id: str, round_no: int | None = None
+    ) -> Iterator[GameEvent]:
+        """Events of a game, or of one of its rounds, decompressed.
+
+        Raises:
+            KeyError: If the game isn't archived
+        """
+        if game_id not in self:
+            raise KeyError(f"Game {game_id} is not archived")
+        sql = "SELECT round_no FROM chunks WHERE game_id = ?"
+        params: list[Any] = [game_id]
+        if round_no is not None:
+            sql += " AND round_no = ?"
+            params.append(round_no)
+        with self._lock:
+            rounds = self._conn.execute(
+                sql + " ORDER BY round_no", params
+            ).fetchall()
+        for (rnd,) in rounds:
+            for line in self._chunk(game_id, rnd):
+                event = json.loads(line)
+                yield GameEvent(
+                    kind=EventKind(event["kind"]),
+                    message=event["message"],
+                    round_no=event["round_no"],
+                    phase=event["phase"],
+                    speaker=event["speaker"],
+                    audience=None
+                    if event["audience"] is None
+                    else frozenset(map(Role, event["audience"])),
+                    data=event["data"],
+                    ts=event["ts"],
+                )
+
+    def stats(self) -> dict[str, int]:
+        """Games, events and raw vs compressed text size in bytes."""
+        with self._lock:
+            games, events, raw = self._conn.execute(
+                "SELECT COUNT(*), SUM(events), SUM(raw_bytes) FROM games"
+            ).fetchone()
+            (compressed,) = self._conn.execute(
+                "SELECT SUM(length(data)) FROM chunks"
+            ).fetchone()
+        return {
+            "games": games,
+            "events": events or 0,
+            "raw_bytes": raw or 0,
+            "compressed_bytes": compressed or 0,
+        }
+
+    def _chunk(self, game_id: str, round_no: int) -> list[bytes]:
+        """The encoded events of a round, one per line so that only the
+        ones needed are parsed."""
+        with self._lock:
+            (data,) = self._conn.execute(
+                "SELECT data FROM chunks WHERE game_id = ? AND round_no = ?",
+                (game_id, round_no),
+            ).fetchone()
+        return zlib.decompress(data).split(b"\n")
+
+
+class ArchiveRecorder:
+    """Event sink archiving a game once its last event arrives.
+
+    Subscribe it with ``roles=None``: the archive needs the private round
+    headers to know who played which role. Subscribe it with
+    ``block=True`` too, or a full queue drops events from the archive.
+    """
+
+    def __init__(self, archive: GameArchive, game_id: str) -> None:
+        self.archive = archive
+        self.game_id = game_id
+        self._events: list[dict[str, Any]] = []
+
+    def __call__(self, event: GameEvent) -> None:
+        self._events.append(event.to_dict())
+        if "winner" in event.data:
+            self.archive.add(self.game_id, self._events)
+            self._events = []
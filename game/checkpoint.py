@@ -0,0 +1,103 @@
+"""Snapshots of a game in progress, taken between steps of a round.
+
+A round is played as the steps in ``ROUND_STEPS``. After each one the
+game hands a ``Checkpoint`` to its checkpoint sink; a game started again
+from it skips the finished steps and carries on with the next one, so a
+game lost with its process only replays the step that was running.
+
+Checkpoints are plain JSON (``to_dict``/``from_dict``) so they can be
+kept next to the job that plays the game.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from game.types import Role
+
+# Resumable steps of a round, in order. Night results are kept until the
+# day step, which also votes and ends the round.
+ROUND_STEPS = ("mafia", "healer", "detective", "day")
+
+
+@dataclass(frozen=True, slots=True)
+class Checkpoint:
+    """Everything needed to resume a game after ``step`` of ``round_no``.
+
+    Attributes:
+        round_no: Round the step belongs to
+        step: Last finished step, one of ``ROUND_STEPS``
+        seating: Player names in seating order
+        roles: Role dealt to each player
+        alive: Players alive after the step
+        memories: Each player's memory
+        logs: Public log so far
+        night: Night targets chosen so far this round (kill, heal)
+        announcement: Elimination announcement of the last vote that
+            hasn't been logged yet: victim, stamp, prompt and its text if
+            the god had already answered
+        summary: Latest round summary, empty if it wasn't written yet
+        spoken: Turns each player has had under the speaker scheduler
+    """
+
+    round_no: int
+    step: str
+    seating: list[str]
+    roles: dict[str, Role]
+    alive: list[str]
+    memories: dict[str, list[str]]
+    logs: list[str]
+    night: dict[str, str] = field(default_factory=dict)
+    announcement: dict[str, Any] | None = None
+    summary: str = ""
+    spoken: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.step not in ROUND_STEPS:
+            raise ValueError(
+                f"Unknown step {self.step!r}, expected one of {ROUND_STEPS}"
+            )
+
+    @property
+    def next_step(self) -> tuple[int, str]:
+        """Round and step the game resumes at."""
+        i = ROUND_STEPS.index(self.step) + 1
+        if i == len(ROUND_STEPS):
+            return self.round_no + 1, ROUND_STEPS[0]
+        return self.round_no, ROUND_STEPS[i]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "round_no": self.round_no,
+            "step": self.step,
+            "seating": self.seating,
+            "roles": {name: role.value for name, role in self.roles.items()},
+            "alive": self.alive,
+            "memories": self.memories,
+            "logs": self.logs,
+            "night": self.night,
+            "announcement": self.announcement,
+            "summary": self.summary,
+            "spoken": self.spoken,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Checkpoint":
+        """Rebuild a checkpoint from ``to_dict`` output.
+
+        Raises:
+            KeyError: If a field is missing
+            ValueError: If a role or the step is unknown
+        """
+        return cls(
+            round_no=data["round_no"],
+            step=data["step"],
+            seating=list(data["seating"]),
+            roles={name: Role(v) for name, v in data["roles"].items()},
+            alive=list(data["alive"]),
+            memories={k: list(v) for k, v in data["memories"].items()},
+            logs=list(data["logs"]),
+            night=dict(data.get("night") or {}),
+            announcement=data.get("announcement"),
+            summary=data.get("summary", ""),
+            spoken=dict(data.get("spoken") or {}),
+        )
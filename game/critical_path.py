@@ -0,0 +1,417 @@
+"""Find the calls that determine how long a game takes.
+
+Reads span traces written with ``--trace`` (see ``game.trace``) and, per
+game:
+
+- walks the critical path: from the end of the game back to its start,
+  always through the span that finished last, and from a ``wait`` into
+  the background task it waited for. Its segments add up to the game's
+  wall time.
+- rebuilds the dependency graph of ``match_start`` from the phases: the
+  night roles only depend on nightfall, the day on all of them and on
+  the announcement it waited for, tasks of one batch (simultaneous turns,
+  breakout groups) on what came before the batch. Its longest path with
+  the measured durations is the ideal game time, which gives the
+  parallelism the game allowed next to the one it achieved.
+
+Tables rank phases and agents by time on the critical path, model time
+and tokens. ``--folded`` writes the critical path as folded stacks in
+microseconds, for ``flamegraph.pl`` or speedscope.
+
+    python main.py --backend fake --trace traces/game.jsonl
+    python -m game.critical_path traces/game.jsonl --folded game.folded
+"""
+
+import argparse
+import json
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Phases the game plays one after another that only depend on nightfall
+NIGHT_ROLES = frozenset({"mafia", "healer", "detective"})
+BETWEEN_PHASES = "(between phases)"
+
+
+@dataclass(slots=True, eq=False)
+class TraceSpan:
+    id: int
+    parent: int | None
+    name: str
+    kind: str
+    start: float
+    end: float
+    attrs: dict[str, Any]
+    children: list["TraceSpan"] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+    @property
+    def frame(self) -> str:
+        """Frame name of the span in folded stacks."""
+        if self.kind == "task" and self.attrs.get("agent"):
+            label = f"{self.attrs['agent']} {self.name}"
+        elif self.kind == "request":
+            label = f"{self.name} [{self.attrs.get('tier')}]"
+        elif self.kind == "wait":
+            label = f"wait {self.name}"
+        else:
+            label = self.name
+        return label.replace(";", ",")
+
+
+@dataclass(slots=True)
+class Segment:
+    """A stretch of the critical path and the spans it ran in."""
+
+    stack: tuple[TraceSpan, ...]
+    start: float
+    end: float
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+    def innermost(self, kind: str) -> TraceSpan | None:
+        for span in reversed(self.stack):
+            if span.kind == kind:
+                return span
+        return None
+
+
+@dataclass
+class GameTrace:
+    game_id: str
+    root: TraceSpan
+    spans: dict[int, TraceSpan]
+
+
+def load(path: str | Path) -> list[GameTrace]:
+    """Read every finished game of a trace file.
+
+    Spans of games whose ``game`` span never ended (crashed or still
+    running) are skipped.
+    """
+    by_game: dict[str, dict[int, TraceSpan]] = defaultdict(dict)
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            attrs = {
+                k: v
+                for k, v in record.items()
+                if k
+                not in ("game", "id", "parent", "name", "kind", "start", "end")
+            }
+            by_game[record["game"]][record["id"]] = TraceSpan(
+                id=record["id"],
+                parent=record["parent"],
+                name=record["name"],
+                kind=record["kind"],
+                start=record["start"],
+                end=record["end"],
+                attrs=attrs,
+            )
+    games = []
+    for game_id, spans in by_game.items():
+        root = None
+        for span in spans.values():
+            if span.kind == "game":
+                root = span
+            elif span.parent in spans:
+                spans[span.parent].children.append(span)
+        if root is None:
+            continue
+        for span in spans.values():
+            span.children.sort(key=lambda s: (s.start, s.id))
+        games.append(GameTrace(game_id, root, spans))
+    return games
+
+
+def critical_path(game: GameTrace) -> list[Segment]:
+    """Segments of the critical path in time order.
+
+    Each segment is self time of the innermost span of its stack: model
+    time for a request, game loop time for a phase or round.
+    """
+    segments: list[Segment] = []
+
+    def dependencies(span: TraceSpan) -> list[TraceSpan]:
+        if span.kind == "wait":
+            task = game.spans.get(span.attrs.get("waits_on"))
+            return [task] if task is not None else []
+        return span.children
+
+    def walk(
+        span: TraceSpan, lower: float, upper: float, stack: tuple
+    ) -> None:
+        stack = (*stack, span)
+        lower, cursor = max(span.start, lower), min(span.end, upper)
+        candidates = list(dependencies(span))
+        while True:
+            live = [
+                c for c in candidates if lower < c.end and c.start < cursor
+            ]
+            if not live:
+                break
+            # Whatever finished last before the cursor held it up
+            pick = max(live, key=lambda c: (min(c.end, cursor), c.start))
+            candidates.remove(pick)
+            end = min(pick.end, cursor)
+            if end < cursor:
+                segments.append(Segment(stack, end, cursor))
+            walk(pick, lower, end, stack)
+            cursor = max(pick.start, lower)
+        if lower < cursor:
+            segments.append(Segment(stack, lower, cursor))
+
+    walk(game.root, game.root.start, game.root.end, ())
+    segments.sort(key=lambda s: s.start)
+    return segments
+
+
+def _union(intervals: list[tuple[float, float]]) -> float:
+    total, reach = 0.0, float("-inf")
+    for start, end in sorted(intervals):
+        if end > reach:
+            total += end - max(start, reach)
+            reach = end
+    return total
+
+
+def _self_seconds(span: TraceSpan) -> float:
+    """Time ``span`` spent outside its children."""
+    covered = _union(
+        [
+            (max(c.start, span.start), min(c.end, span.end))
+            for c in span.children
+            if c.start < span.end
+        ]
+    )
+    return span.seconds - covered
+
+
+def _ideal_phase(phase: TraceSpan) -> float:
+    """Phase time if tasks of a batch had all overlapped."""
+    total = _self_seconds(phase)
+    batch, longest = None, 0.0
+    for child in phase.children:
+        # Background work is a node of its own, waits are edges
+        if child.kind != "task" or child.end > phase.end:
+            continue
+        key = child.attrs.get("batch")
+        if key is not None and key == batch:
+            longest = max(longest, child.seconds)
+            continue
+        total += longest
+        batch, longest = key, child.seconds
+    return total + longest
+
+
+def ideal_seconds(game: GameTrace) -> float:
+    """Longest path through the game's dependency graph.
+
+    Nodes are the phases, weighted with ``_ideal_phase``, and the
+    background tasks started in them. A phase follows the one before it,
+    except that consecutive night role phases all follow the phase
+    before the first of them.
+    """
+    finish: dict[int, float] = {}
+    ready = 0.0
+    group: list[TraceSpan] = []
+    group_ready = 0.0
+    background: list[TraceSpan] = []
+    for round_span in game.root.children:
+        phases = [c for c in round_span.children if c.kind == "phase"]
+        for phase in phases:
+            if phase.name in NIGHT_ROLES:
+                if not group:
+                    group_ready = ready
+                group.append(phase)
+                finish[phase.id] = group_ready + _ideal_phase(phase)
+                continue
+            if group:
+                ready = max(finish[p.id] for p in group)
+                group = []
+            start = ready
+            for child in phase.children:
+                task = game.spans.get(child.attrs.get("waits_on"))
+                if child.kind == "wait" and task and task.id in finish:
+                    start = max(start, finish[task.id])
+            finish[phase.id] = ready = start + _ideal_phase(phase)
+            for child in phase.children:
+                if child.kind == "task" and child.end > phase.end:
+                    finish[child.id] = ready + child.seconds
+                    background.append(child)
+        if group:
+            ready = max(finish[p.id] for p in group)
+            group = []
+        ready += _self_seconds(round_span)
+    ends = [ready, *(finish[t.id] for t in background)]
+    return max(ends) + _self_seconds(game.root)
+
+
+def _agent(task: TraceSpan | None) -> str | None:
+    if task is None:
+        return None
+    return task.attrs.get("agent") or task.name
+
+
+def _top_tasks(game: GameTrace) -> list[TraceSpan]:
+    return [
+        s
+        for s in game.spans.values()
+        if s.kind == "task"
+        and game.spans.get(s.parent, game.root).kind != "task"
+    ]
+
+
+@dataclass(slots=True)
+class Usage:
+    critical: float = 0.0
+    idle: float = 0.0
+    model: float = 0.0
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+def analyze(
+    games: list[GameTrace],
+) -> tuple[list[dict[str, Any]], dict[str, Usage], dict[str, Usage], Counter]:
+    """Critical path, idle time and parallelism of ``games``.
+
+    Returns:
+        A summary per game, usage per phase and per agent, and critical
+        path microseconds per folded stack
+    """
+    summaries = []
+    phases: dict[str, Usage] = defaultdict(Usage)
+    agents: dict[str, Usage] = defaultdict(Usage)
+    folded: Counter = Counter()
+    for game in games:
+        path = critical_path(game)
+        wall = game.root.seconds
+        ideal = ideal_seconds(game)
+        work = sum(t.seconds for t in _top_tasks(game))
+        requests = [s for s in game.spans.values() if s.kind == "request"]
+        busy = _union([(r.start, r.end) for r in requests])
+        summaries.append(
+            {
+                "game": game.game_id,
+                "rounds": game.root.attrs.get("rounds"),
+                "wall": wall,
+                "ideal": ideal,
+                "model_idle": wall - busy,
+                "achieved": work / wall if wall else 0.0,
+                "possible": work / ideal if ideal else 0.0,
+            }
+        )
+        for segment in path:
+            folded[";".join(s.frame for s in segment.stack)] += round(
+                segment.seconds * 1e6
+            )
+            phase = segment.innermost("phase")
+            on_model = segment.stack[-1].kind == "request"
+            for table, key in (
+                (phases, phase.name if phase else BETWEEN_PHASES),
+                (agents, _agent(segment.innermost("task"))),
+            ):
+                if key is None:
+                    continue
+                table[key].critical += segment.seconds
+                if not on_model:
+                    table[key].idle += segment.seconds
+        for request in requests:
+            task = game.spans.get(request.parent)
+            # Background tasks outlive their phase; file them under it
+            phase = task.attrs.get("phase") if task else None
+            for table, key in (
+                (phases, phase or BETWEEN_PHASES),
+                (agents, _agent(task)),
+            ):
+                if key is None:
+                    continue
+                usage = table[key]
+                usage.model += request.seconds
+                usage.requests += 1
+                usage.input_tokens += request.attrs.get("input_tokens", 0)
+                usage.output_tokens += request.attrs.get("output_tokens", 0)
+    return summaries, phases, agents, folded
+
+
+def usage_table(title: str, rows: dict[str, Usage], top: int) -> str:
+    lines = [
+        title,
+        f"{'':<24}{'critical s':>11}{'idle s':>8}{'model s':>9}"
+        f"{'requests':>9}{'in tok':>9}{'out tok':>9}",
+    ]
+    ranked = sorted(
+        rows.items(), key=lambda kv: (-kv[1].critical, -kv[1].input_tokens)
+    )
+    for key, u in ranked[:top]:
+        lines.append(
+            f"{key[:23]:<24}{u.critical:>11.2f}{u.idle:>8.2f}{u.model:>9.2f}"
+            f"{u.requests:>9}{u.input_tokens:>9}{u.output_tokens:>9}"
+        )
+    return "\n".join(lines)
+
+
+def report(
+    summaries: list[dict[str, Any]],
+    phases: dict[str, Usage],
+    agents: dict[str, Usage],
+    top: int = 10,
+) -> str:
+    lines = [
+        f"{'game':<24}{'rounds':>7}{'wall s':>8}{'ideal s':>9}"
+        f"{'model idle s':>13}{'achieved':>10}{'possible':>10}"
+    ]
+    for s in summaries:
+        lines.append(
+            f"{s['game'][:23]:<24}{s['rounds'] or 0:>7}{s['wall']:>8.2f}"
+            f"{s['ideal']:>9.2f}{s['model_idle']:>13.2f}"
+            f"{s['achieved']:>9.2f}x{s['possible']:>9.2f}x"
+        )
+    return "\n\n".join(
+        [
+            "\n".join(lines),
+            usage_table("Phases", phases, len(phases)),
+            usage_table(f"Top {top} agents", agents, top),
+        ]
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("trace", help="JSONL trace written with --trace")
+    parser.add_argument(
+        "--game", default=None, help="Only this game id, all by default"
+    )
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--folded", default=None, help="Write folded critical path stacks"
+    )
+    args = parser.parse_args(argv)
+
+    games = [g for g in load(args.trace) if args.game in (None, g.game_id)]
+    if not games:
+        parser.error("No finished games in the trace")
+    summaries, phases, agents, folded = analyze(games)
+    print(report(summaries, phases, agents, args.top))
+    if args.folded:
+        Path(args.folded).write_text(
+            "".join(f"{stack} {us}\n" for stack, us in folded.items() if us)
+        )
+        print(f"\nWrote {args.folded}")
+
+
+if __name__ == "__main__":
+    main()
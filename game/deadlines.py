@@ -0,0 +1,91 @@
+"""Phase time limits.
+
+The README gives night roles one minute to agree and the town a five
+minute timer before voting. When a limit expires, calls that haven't
+started are cancelled, calls in flight are abandoned (their replies are
+discarded and they stop retrying) and the phase resolves from whatever
+already arrived:
+
+1. Votes that were cast are tallied as usual.
+2. Without any vote, the player named most often in the phase's
+   discussion is picked.
+3. Without either, the phase takes no action: no kill, heal, check or
+   elimination.
+
+The limits bound how long the game loop waits, not what is spent: an
+abandoned request runs on until the model answers or the backend's
+request timeout gives up on it. Its worker is replaced so later phases
+don't queue behind it.
+"""
+
+import time
+from dataclasses import dataclass
+
+from game.types import Role
+
+
+class PhaseTimeout(Exception):
+    """Raised when a phase's time limit runs out."""
+
+
+@dataclass(frozen=True)
+class TimeLimits:
+    """Seconds allowed per phase; ``None`` disables a limit.
+
+    Attributes:
+        night: Discussion plus vote of each night role
+        day: Day discussion
+        vote: Day vote
+    """
+
+    night: float | None = 60.0
+    day: float | None = 300.0
+    vote: float | None = 120.0
+
+    @classmethod
+    def unlimited(cls) -> "TimeLimits":
+        return cls(night=None, day=None, vote=None)
+
+    def round_bound(self) -> float | None:
+        """Time a round's discussion and voting are allowed.
+
+        The game loop moves on once this has passed, but abandoned
+        requests may still be running and the god's announcement and
+        round summary aren't limited.
+        """
+        if None in (self.night, self.day, self.vote):
+            return None
+        # Mafia, healer and detective phases run one after another
+        return 3 * self.night + self.day + self.vote
+
+    def discussion(self, role: Role) -> float | None:
+        return self.day if role == Role.ALL else self.night
+
+
+class Deadline:
+    """A point in time (monotonic clock) a phase must finish by."""
+
+    __slots__ = ("at", "reported")
+
+    def __init__(self, seconds: float | None) -> None:
+        self.at = None if seconds is None else time.monotonic() + seconds
+        # Set once the expiry has been announced
+        self.reported = False
+
+    @classmethod
+    def never(cls) -> "Deadline":
+        return cls(None)
+
+    def remaining(self) -> float | None:
+        if self.at is None:
+            return None
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
+
+    def check(self) -> None:
+        """Raise ``PhaseTimeout`` if the deadline has passed."""
+        if self.expired:
+            raise PhaseTimeout
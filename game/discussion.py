@@ -0,0 +1,119 @@
+"""Day discussion settings and speaker scheduling for large lobbies."""
+
+import re
+import threading
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agents.player import PlayerAgent
+
+
+@dataclass(frozen=True)
+class DiscussionConfig:
+    """How the day discussion is run.
+
+    Attributes:
+        schedule_threshold: Above this many alive players only scheduled
+            speakers get to talk instead of everyone
+        speaking_slots: Speaking turns per round when scheduling, split
+            evenly across the discussion iterations
+        breakout_groups: When >1 and scheduling, the lobby splits into
+            this many groups that discuss in parallel; their summaries
+            are merged before voting
+        simultaneous_openings: Generate every first-iteration statement
+            concurrently from the state at the start of the phase, then
+            log them in seating order. The second iteration stays
+            sequential.
+        max_parallel: Upper bound on concurrent LLM calls for
+            simultaneous openings
+        batch_size: When >1, votes and simultaneous openings of players
+            who share a role are asked in one request for up to this
+            many players (see ``agents.batch``). Votes are then cast
+            simultaneously instead of one after another.
+    """
+
+    schedule_threshold: int = 15
+    speaking_slots: int = 16
+    breakout_groups: int = 0
+    simultaneous_openings: bool = False
+    max_parallel: int = 8
+    batch_size: int = 0
+
+    def __post_init__(self) -> None:
+        if self.speaking_slots < 1:
+            raise ValueError("speaking_slots must be at least 1")
+        if self.breakout_groups < 0:
+            raise ValueError("breakout_groups can't be negative")
+        if self.max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+        if self.batch_size < 0:
+            raise ValueError("batch_size can't be negative")
+
+    def scheduled(self, alive: int) -> bool:
+        return alive > self.schedule_threshold
+
+
+class MentionCounter:
+    """Counts how often each player is named in discussion messages."""
+
+    def __init__(self, names: Iterable[str]) -> None:
+        # Longest first so "Player 10" wins over "Player 1"
+        ordered = sorted(names, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"(?<!\w)(" + "|".join(map(re.escape, ordered)) + r")(?!\w)"
+        )
+        self.counts: Counter[str] = Counter()
+
+    def add(self, message: str, speaker: str) -> None:
+        # Only the message body counts, not the "[speaker]:" prefix
+        body = message.split("]:", 1)[-1]
+        for name in set(self._pattern.findall(body)):
+            if name != speaker:
+                self.counts[name] += 1
+
+
+class SpeakerScheduler:
+    """Picks who speaks when not everyone can.
+
+    Players who were mentioned (usually accused) in the current round come
+    first so they can answer, then those who have spoken least this game.
+    Ties keep seating order. Breakout groups share one scheduler from
+    their own threads, so the counts are guarded by a lock.
+    """
+
+    def __init__(self) -> None:
+        self.spoken: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def pick(
+        self,
+        candidates: Sequence["PlayerAgent"],
+        slots: int,
+        mentions: Counter[str],
+    ) -> list["PlayerAgent"]:
+        with self._lock:
+            spoken = [self.spoken[p.name] for p in candidates]
+        ranked = sorted(
+            range(len(candidates)),
+            key=lambda i: (-mentions[candidates[i].name], spoken[i], i),
+        )
+        return [candidates[i] for i in ranked[:slots]]
+
+    def record(self, name: str) -> None:
+        with self._lock:
+            self.spoken[name] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spoken.clear()
+
+
+def split_groups(
+    players: Sequence["PlayerAgent"], groups: int
+) -> list[list["PlayerAgent"]]:
+    """Deal players round-robin into ``groups`` non-empty breakout groups."""
+    groups = max(1, min(groups, len(players)))
+    return [list(players[i::groups]) for i in range(groups)]
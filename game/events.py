@@ -0,0 +1,196 @@
+"""In-process event bus that decouples game output from the game loop."""
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any
+
+from game.types import Role
+
+
+class EventKind(str, Enum):
+    PHASE = "phase"
+    SPEECH = "speech"
+    VOTE = "vote"
+    DEATH = "death"
+    REVEAL = "reveal"
+    ANNOUNCEMENT = "announcement"
+    INFO = "info"
+
+
+@dataclass(frozen=True, slots=True)
+class GameEvent:
+    """A single thing that happened in a game.
+
+    ``audience`` is ``None`` for public events. Role-private events (mafia
+    discussion, detective reveals, ...) carry the roles allowed to see them;
+    an empty set means only omniscient sinks (e.g. the host terminal) see it.
+    """
+
+    kind: EventKind
+    message: str
+    round_no: int = 0
+    phase: str = ""
+    speaker: str | None = None
+    audience: frozenset[Role] | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    ts: float = field(default_factory=time.time)
+
+    @property
+    def is_public(self) -> bool:
+        return self.audience is None
+
+    def to_dict(self) -> dict[str, Any]:
+        out = asdict(self)
+        out["kind"] = self.kind.value
+        out["audience"] = (
+            None
+            if self.audience is None
+            else sorted(role.value for role in self.audience)
+        )
+        return out
+
+
+Sink = Callable[[GameEvent], None]
+
+_STOP = object()
+
+
+class Subscriber:
+    """A sink fed from its own bounded queue by a dedicated thread.
+
+    Events that don't fit in the queue are dropped and counted, so a slow
+    sink can never stall the game loop. Sinks that must see every event
+    (the console, the archive) block the publisher instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sink: Sink,
+        maxsize: int = 1024,
+        roles: frozenset[Role] | None = None,
+        block: bool = False,
+    ) -> None:
+        self.name = name
+        self.sink = sink
+        # None -> sees everything, otherwise public events plus events
+        # addressed to one of these roles
+        self.roles = roles
+        self.block = block
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        # Events offered but not yet handed to the sink
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name=f"event-sink-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def accepts(self, event: GameEvent) -> bool:
+        if self.roles is None or event.is_public:
+            return True
+        return bool(event.audience & self.roles)
+
+    def offer(self, event: GameEvent) -> None:
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put(event, block=self.block)
+        except queue.Full:
+            self.dropped += 1
+            self._done()
+
+    def drain(self, timeout: float | None = None) -> None:
+        """Block until every queued event has been handed to the sink."""
+        with self._idle:
+            self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def _done(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            if not self._pending:
+                self._idle.notify_all()
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # Sink is wedged; the daemon thread dies with the process
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                return
+            try:
+                self.sink(event)
+            except Exception as e:
+                print(f"Warning: event sink {self.name} failed: {e}")
+            finally:
+                self._done()
+
+
+class EventBus:
+    """Fan-out of game events to any number of subscribers."""
+
+    def __init__(self) -> None:
+        self.subscribers: list[Subscriber] = []
+
+    def subscribe(
+        self,
+        name: str,
+        sink: Sink,
+        maxsize: int = 1024,
+        roles: frozenset[Role] | None = None,
+        block: bool = False,
+    ) -> Subscriber:
+        """Register a sink.
+
+        Args:
+            name: Label used in warnings and drop statistics
+            sink: Callable invoked with every accepted event
+            maxsize: Queue bound; overflowing events are dropped
+            roles: Roles whose private events this sink may see. ``None``
+                sees everything (omniscient), an empty set sees only
+                public events.
+            block: Wait for room in a full queue instead of dropping the
+                event, for sinks that must not miss any
+
+        Returns:
+            The created subscriber
+        """
+        subscriber = Subscriber(
+            name, sink, maxsize=maxsize, roles=roles, block=block
+        )
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Deliver ``subscriber``'s queued events, then stop it."""
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+        subscriber.close()
+
+    def publish(self, event: GameEvent) -> None:
+        for subscriber in self.subscribers:
+            if subscriber.accepts(event):
+                subscriber.offer(event)
+
+    def drain(self, timeout: float | None = None) -> None:
+        for subscriber in self.subscribers:
+            subscriber.drain(timeout)
+
+    def close(self) -> None:
+        for subscriber in self.subscribers:
+            subscriber.close()
+        self.subscribers = []
+
+    def dropped(self) -> dict[str, int]:
+        return {s.name: s.dropped for s in self.subscribers}
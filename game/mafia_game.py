@@ -1,68 +1,305 @@
 import random
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
 
+from agents import batch
 from agents.god import GodAgent
 from agents.player import PlayerAgent
+from agents.routing import CallKind
+from game import rules
+from game.checkpoint import ROUND_STEPS, Checkpoint
+from game.deadlines import Deadline, PhaseTimeout, TimeLimits
+from game.discussion import (
+    DiscussionConfig,
+    MentionCounter,
+    SpeakerScheduler,
+    split_groups,
+)
+from game.events import EventBus, EventKind, GameEvent, Subscriber
+from game.metrics import PhaseMetrics
+from game.roles import RoleDistribution
+from game.sinks import terminal_sink
+from game.state import GameState
+from game.trace import Span, Tracer, current_span
 from game.types import Role
 from utils.memory import summarize_round
 
+# Audience of host-only output such as the round's role sheet
+GODS_EYE: frozenset[Role] = frozenset()
+# Everyone gets to speak twice per discussion
+NUM_ITERATIONS = 2
+
+
+@dataclass(frozen=True)
+class MatchResult:
+    """How a match ended.
+
+    Attributes:
+        winner: Winning side, None if the round limit stopped the match
+        rounds: Rounds played
+        roles: Role dealt to each player
+        survivors: Players alive at the end
+    """
+
+    winner: rules.Winner | None
+    rounds: int
+    roles: dict[str, Role]
+    survivors: frozenset[str]
+
 
 class MafiaGame:
-    def __init__(self, god: GodAgent, players: list[PlayerAgent]) -> None:
+    def __init__(
+        self,
+        god: GodAgent,
+        players: list[PlayerAgent],
+        events: EventBus | None = None,
+        quiet: bool = False,
+        roles: RoleDistribution | None = None,
+        discussion: DiscussionConfig | None = None,
+        limits: TimeLimits | None = None,
+        checkpoint: Callable[[Checkpoint], None] | None = None,
+        tracer: Tracer | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Create a game.
+
+        Args:
+            god: The narrating god agent
+            players: Players taking part
+            events: Bus to publish game events to. A new one is created
+                when omitted.
+            quiet: Don't attach the terminal sink (batch runs)
+            roles: How roles are dealt. Defaults to the README
+                proportions scaled to the lobby size.
+            discussion: Day discussion settings for large lobbies
+            limits: Phase time limits, the README's by default. See
+                ``game.deadlines`` for how an expired phase resolves.
+            checkpoint: Called with a ``Checkpoint`` after every step of a
+                round that doesn't end the game, e.g. to save it for
+                ``match_start(resume=...)``. An exception it raises ends
+                the game.
+            tracer: Records spans of the game, its phases and model
+                calls, see ``game.trace``
+            rng: Source of the seating and fallback votes. Seeded from
+                the ``random`` module when omitted, so ``random.seed``
+                before creating the game still seeds it.
+
+        Raises:
+            ValueError: If the lobby can't be dealt ``roles``
+        """
         self.god = god
         self.players = players
-        self.alive_players = players[:]
+        self.roles = roles or RoleDistribution.default()
+        # Fail before any LLM call if the lobby doesn't fit the roles
+        self.roles.resolve(len(players))
+        self.state = GameState(players)
+        self.metrics = PhaseMetrics()
+        self.discussion = discussion or DiscussionConfig()
+        self.scheduler = SpeakerScheduler()
+        self.batch_stats = batch.BatchStats()
+        self.limits = limits or TimeLimits()
+        self.deadline = Deadline.never()
+        self.checkpoint = checkpoint
+        self.tracer = tracer
+        self.rng = rng or random.Random(random.getrandbits(64))
+        # Open game, round and phase spans, and background task spans
+        self._spans: dict[str, Span] = {}
+        self._task_spans: dict[Future, Span] = {}
+        self._batches = 0
+        self._pool: ThreadPoolExecutor | None = None
+        # Breakout groups submit and abandon calls from their own threads
+        self._pool_lock = threading.Lock()
+        # Round-end work running in the background and its results
+        self._background: ThreadPoolExecutor | None = None
+        # (future text, victim, stamp, prompt) of the last elimination
+        self._announcement: (
+            tuple[Future[str], str, tuple[int, str], str] | None
+        ) = None
+        self._pending_summary: Future[str] | None = None
+        self._summary = ""
+        # Night targets chosen so far this round
+        self._night: dict[str, str] = {}
         self.round_no = 0
-        self.summary = ""
+        self.phase = ""
         self.logs: list[str] = []
+        self.events = events if events is not None else EventBus()
+        self.quiet = quiet
+        # Subscribed for the length of a match; the console's only sink,
+        # so it waits for room rather than dropping output
+        self._terminal: Subscriber | None = None
 
-    def assign_roles(self) -> None:
-        random.shuffle(self.players)
-        roles = (
-            [Role.MAFIA] * 1
-            + [Role.DETECTIVE] * 1
-            + [Role.HEALER]
-            + [Role.VILLAGER]
-        )
-        for player, role in zip(self.players, roles, strict=False):
-            player.role = role
+    @property
+    def alive_players(self) -> list[PlayerAgent]:
+        """Alive players in seating order (a fresh list)."""
+        return list(self.state.alive())
+
+    def assign_roles(self, roles: Mapping[str, Role] | None = None) -> None:
+        """Seat the players in random order and deal their roles.
+
+        Args:
+            roles: Role per player name, e.g. from a tournament schedule.
+                Dealt at random from the role distribution when omitted.
+
+        Raises:
+            ValueError: If ``roles`` doesn't name exactly the players
+        """
+        self.rng.shuffle(self.players)
+        if roles is None:
+            dealt = self.roles.deal(len(self.players))
+        else:
+            names = {p.name for p in self.players}
+            if set(roles) != names:
+                raise ValueError(
+                    "Roles must be given for exactly the players, got "
+                    f"{sorted(set(roles) ^ names)} extra or missing"
+                )
+            dealt = [roles[p.name] for p in self.players]
+        self._deal(dealt)
+
+    def _deal(self, dealt: list[Role]) -> None:
+        for player, role in zip(self.players, dealt, strict=True):
+            self.state.assign(player, role)
             # Reinitialize agent with role-specific tools
             player._initialize_agent()
+        # Re-seat everyone in the shuffled order
+        self.state.reset()
+
+    @property
+    def player_names(self) -> list[str]:
+        """Names of every player, dead or alive."""
+        return [p.name for p in self.players]
+
+    @property
+    def summary(self) -> str:
+        """Latest round summary, waiting for it if still being written."""
+        if self._pending_summary is not None:
+            self._summary = self._pending_summary.result()
+            self._pending_summary = None
+        return self._summary
 
     def reset_match(self) -> None:
-        self.round_no, self.summary, self.logs, self.alive_players = (
-            0,
-            "",
-            [],
-            self.players[:],
+        if self._background is not None:
+            self._background.shutdown(cancel_futures=True)
+            self._background = None
+        self._announcement, self._pending_summary = None, None
+        self.round_no, self._summary, self.logs = 0, "", []
+        self._night = {}
+        self._spans, self._task_spans = {}, {}
+        self.state.reset()
+        self.scheduler.reset()
+        with self._pool_lock:
+            if self._pool is not None:
+                # Abandoned calls may still be running; don't wait for them
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+        if self._terminal is not None:
+            self.events.unsubscribe(self._terminal)
+            self._terminal = None
+
+    def emit(
+        self,
+        kind: EventKind,
+        message: str,
+        speaker: str | None = None,
+        audience: frozenset[Role] | None = None,
+        stamp: tuple[int, str] | None = None,
+        **data,
+    ) -> None:
+        """Publish an event without touching any player's memory.
+
+        ``stamp`` overrides the (round, phase) the event is filed under,
+        for results of background work that finish in a later phase.
+        """
+        round_no, phase = stamp or (self.round_no, self.phase)
+        self.events.publish(
+            GameEvent(
+                kind=kind,
+                message=message,
+                round_no=round_no,
+                phase=phase,
+                speaker=speaker,
+                audience=audience,
+                data=data,
+            )
         )
 
-    def add_log(self, message: str):
+    def enter_phase(self, phase: str) -> None:
+        """Move to a new phase without announcing it."""
+        self.phase = phase
+        self.metrics.enter(phase)
+        self._open_span("phase", phase, "round", round_no=self.round_no)
+
+    def set_phase(self, phase: str, message: str) -> None:
+        """Move to a new phase and announce it publicly."""
+        self.enter_phase(phase)
+        self.add_log(message, kind=EventKind.PHASE)
+
+    def add_log(
+        self,
+        message: str,
+        kind: EventKind = EventKind.ANNOUNCEMENT,
+        speaker: str | None = None,
+        **data,
+    ):
         """Add public log and sync to all alive players' memories.
 
         Args:
             message: Message to log (can already include [GOD]: or
                 player prefix)
+            kind: Event kind published to the bus
+            speaker: Player the message comes from, if any
+            **data: Structured payload attached to the event
         """
-        # If message doesn't start with a bracket, assume it's from god
         self.logs.append(message)
-        print(message)
+        self.emit(kind, message, speaker=speaker, **data)
         # Sync to all alive players
-        for player in self.alive_players:
+        for player in self.state.alive():
             player.memory.append(message)
 
-    def add_private_log_to_role(self, role: Role, message: str):
-        """Add private log to players with specific role and print.
+    def add_private_log_to_role(
+        self,
+        role: Role,
+        message: str,
+        kind: EventKind = EventKind.SPEECH,
+        speaker: str | None = None,
+        **data,
+    ):
+        """Add private log to players with specific role and publish it.
 
         Args:
             role: The role to add the log to
             message: Message to log (role prefix will be added if not GOD)
+            kind: Event kind published to the bus
+            speaker: Player the message comes from, if any
+            **data: Structured payload attached to the event
         """
-        # Print to terminal
-
+        self.emit(
+            kind, message, speaker=speaker, audience=frozenset({role}), **data
+        )
         # Add to private logs of players with this role
-        for player in self.alive_players:
-            if player.role == role:
-                player.memory.append(message)
+        for player in self.state.with_role(role):
+            player.memory.append(message)
+
+    def log_for(
+        self,
+        role: Role,
+        message: str,
+        kind: EventKind,
+        speaker: str | None = None,
+        **data,
+    ) -> None:
+        """Log publicly for day phases, privately to ``role`` otherwise."""
+        if role == Role.ALL:
+            self.add_log(message, kind=kind, speaker=speaker, **data)
+        else:
+            self.add_private_log_to_role(
+                role, message, kind=kind, speaker=speaker, **data
+            )
 
     def discuss(self, role: Role, players: list[PlayerAgent]) -> str:
         """Handle discussion phase for a specific role.
@@ -77,7 +314,7 @@ class MafiaGame:
         if not players:
             return ""
 
-        alive_player_names = [p.name for p in self.alive_players]
+        alive_player_names = self.state.snapshot().alive
 
         if role == Role.MAFIA:
             proposal_prompt = (
@@ -110,68 +347,514 @@ class MafiaGame:
                 "When you need to defend yourself, you MUST use the defend_self tool. "
                 "Do NOT just describe these actions in text - you must call the appropriate tools. "
                 "These players are still alive: "
-                f"{', '.join([p.name for p in self.alive_players])}"
+                f"{', '.join(alive_player_names)}"
             )
 
-        proposals = []
-        # Everyone gets to speak twice
-        num_iterations = 2
-        for iteration in range(num_iterations):
-            for p in players:
-                # Provide different context for second iteration
-                if iteration == 0:
-                    current_prompt = proposal_prompt
+        proposals: list[str] = []
+        # Night roles get one limit for discussion and vote together
+        self.deadline = Deadline(self.limits.discussion(role))
+        try:
+            if role == Role.ALL and self.discussion.scheduled(len(players)):
+                if self.discussion.breakout_groups > 1:
+                    proposals = self._breakout_discussion(
+                        proposal_prompt, players
+                    )
                 else:
-                    current_prompt = (
-                        f"{proposal_prompt}\n"
-                        "This is your second chance to speak. "
-                        "Consider what others have said and provide additional thoughts or respond to their statements. "
-                        "Do not simply repeat your previous statement."
+                    self._scheduled_discussion(
+                        proposal_prompt,
+                        players,
+                        self.discussion.speaking_slots,
+                        proposals,
+                    )
+            else:
+                # Everyone gets to speak twice
+                for iteration in range(NUM_ITERATIONS):
+                    current_prompt = self._turn_prompt(
+                        proposal_prompt, iteration
                     )
+                    if (
+                        iteration == 0
+                        and self.discussion.simultaneous_openings
+                    ):
+                        self._simultaneous_turns(
+                            role, players, current_prompt, proposals
+                        )
+                        continue
+                    for p in players:
+                        self._take_turn(role, p, current_prompt, proposals)
+        except PhaseTimeout:
+            self._report_timeout(role, "discussion")
 
-                response = p.speak(current_prompt + "\n".join(proposals))
-                # Extract clean response (remove player name prefix if present)
-                clean_response = response
-                if response.startswith(f"[{p.name}]:"):
-                    clean_response = response.split(":", 1)[1].strip()
-
-                # Skip if this is a duplicate of the last message from this player
-                proposal_msg = f"[{p.name}]: {clean_response}"
-                # Check if this is a duplicate of the last proposal from this player
-                is_duplicate = False
-                if proposals:
-                    # Look backwards for the last message from this player
-                    for prev_msg in reversed(proposals):
-                        if prev_msg.startswith(f"[{p.name}]:"):
-                            prev_content = (
-                                prev_msg.split(":", 1)[1].strip()
-                                if ":" in prev_msg
-                                else prev_msg
-                            )
-                            if (
-                                prev_content.strip().lower()
-                                == clean_response.strip().lower()
-                            ):
-                                is_duplicate = True
-                            break
+        if role == Role.ALL:
+            self.deadline = Deadline(self.limits.vote)
+        # Collect votes using round-robin format
+        try:
+            target = self.collect_votes_round_robin(role, players, proposals)
+        finally:
+            self.deadline = Deadline.never()
+        return target.name if target else ""
+
+    def _open_span(
+        self, kind: str, name: str, parent: str | None = None, **attrs
+    ) -> None:
+        """Begin the game, round or phase span, ending the previous one."""
+        if self.tracer is None:
+            return
+        self._close_span(kind)
+        self._spans[kind] = self.tracer.begin(
+            name, kind, self._spans.get(parent) if parent else None, **attrs
+        )
 
-                if not is_duplicate:
-                    proposals.append(proposal_msg)
-                    # Log discussions: private for role-specific,
-                    # public for day discussion
-                    if role == Role.ALL:
-                        self.add_log(proposal_msg)
-                    else:
-                        self.add_private_log_to_role(role, proposal_msg)
-                        print(proposal_msg)
+    def _close_span(self, kind: str, **attrs) -> None:
+        span = self._spans.pop(kind, None)
+        if span is not None:
+            self.tracer.end(span, **attrs)
 
-        # Collect votes using round-robin format
-        target = self.collect_votes_round_robin(role, players, proposals)
-        return target.name
+    def _task(self, fn: Callable, **attrs) -> Span | None:
+        """Span of a call of ``fn`` submitted now, None if not tracing."""
+        if self.tracer is None:
+            return None
+        agent = getattr(getattr(fn, "__self__", None), "name", None)
+        return self.tracer.new(
+            getattr(fn, "__qualname__", type(fn).__name__),
+            "task",
+            current_span(self.tracer) or self._spans.get("phase"),
+            round_no=self.round_no,
+            phase=self.phase,
+            agent=agent,
+            submitted=round(self.tracer.now(), 6),
+            **attrs,
+        )
+
+    def _traced(self, span: Span | None) -> AbstractContextManager:
+        return nullcontext() if span is None else self.tracer.running(span)
+
+    def _submit[T](self, fn: Callable[..., T], *args) -> Future[T]:
+        """Run a player call on the game's pool."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.discussion.max_parallel
+                    * max(1, self.discussion.breakout_groups),
+                    thread_name_prefix="llm-call",
+                )
+            return self._pool.submit(fn, *args)
+
+    def _abandon(self, future: Future) -> None:
+        """Cancel ``future``, or leave it running if it has started.
+
+        A call in flight keeps its worker until the model replies (or its
+        request times out), so the pool is retired and later calls get
+        fresh workers instead of queueing behind it.
+        """
+        if future.cancel():
+            return
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def _call[T](self, fn: Callable[..., T], *args) -> T:
+        """Run an LLM call of the current phase within its deadline.
+
+        Raises:
+            PhaseTimeout: If the deadline passes first. A call that hasn't
+                started is cancelled, one in flight is abandoned.
+        """
+        deadline = self.deadline
+        deadline.check()
+        phase = self.phase
+        span = self._task(fn)
+        with self.metrics.call(phase):
+            if deadline.at is None:
+                with self._traced(span):
+                    return fn(*args)
+            submitted = time.perf_counter()
+
+            def run() -> T:
+                self.metrics.started(phase, submitted)
+                with self._traced(span):
+                    return fn(*args)
+
+            future = self._submit(run)
+            try:
+                return future.result(timeout=deadline.remaining())
+            except FuturesTimeout:
+                self._abandon(future)
+                raise PhaseTimeout from None
+
+    def _in_background[T](self, fn: Callable[..., T], *args) -> Future[T]:
+        """Run round-end work so it overlaps with the next night."""
+        if self._background is None:
+            self._background = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="round-end"
+            )
+
+        submitted = time.perf_counter()
+        span = self._task(fn)
+
+        def run() -> T:
+            self.metrics.started("round_end", submitted)
+            with self.metrics.call("round_end"), self._traced(span):
+                return fn(*args)
+
+        future = self._background.submit(run)
+        if span is not None:
+            self._task_spans[future] = span
+        return future
+
+    def _finish_announcement(self) -> None:
+        """Wait for the last elimination announcement and log it."""
+        if self._announcement is None:
+            return
+        future, victim, stamp, _ = self._announcement
+        self._announcement = None
+        if self.tracer is not None:
+            task = self._task_spans.pop(future, None)
+            wait = self.tracer.begin(
+                "announcement",
+                "wait",
+                self._spans.get("phase"),
+                waits_on=task.id if task else None,
+            )
+            future.result()
+            self.tracer.end(wait)
+        self.add_log(
+            future.result(),
+            kind=EventKind.DEATH,
+            victim=victim,
+            cause="vote",
+            stamp=stamp,
+        )
+
+    def _report_timeout(self, role: Role, stage: str) -> None:
+        if self.deadline.reported:
+            return
+        self.deadline.reported = True
+        self.metrics.timeout(self.phase)
+        self.emit(
+            EventKind.INFO,
+            f"[GOD {self.god}]: Time is up! The {stage} is over.",
+            audience=None if role == Role.ALL else frozenset({role}),
+            timeout=True,
+            stage=stage,
+        )
+
+    def _fallback_target(
+        self, role: Role, proposals: list[str]
+    ) -> PlayerAgent | None:
+        """Pick the most proposed player when no vote arrived in time."""
+        mentions = MentionCounter(self.state.alive_names())
+        for msg in proposals:
+            if msg.startswith("[") and "]:" in msg:
+                mentions.add(msg, msg[1 : msg.index("]:")])
+        ranked = mentions.counts.most_common(1)
+        target = self.state.get(ranked[0][0]) if ranked else None
+        outcome = (
+            f"going with the most proposed, {target.name}"
+            if target
+            else "nothing happens"
+        )
+        self.emit(
+            EventKind.INFO,
+            f"[GOD {self.god}]: No votes arrived in time, {outcome}.",
+            audience=None if role == Role.ALL else frozenset({role}),
+            target=target.name if target else None,
+        )
+        return target
+
+    def _speech_kind(self, role: Role) -> CallKind:
+        """Call kind of a discussion turn, used for model routing."""
+        if role == Role.ALL:
+            return CallKind.SPEECH
+        # A lone role member has nobody to persuade
+        if self.state.count(role) <= 1:
+            return CallKind.NIGHT_ACTION
+        return CallKind.NIGHT_DISCUSSION
+
+    def _turn_prompt(self, proposal_prompt: str, iteration: int) -> str:
+        # Provide different context for second iteration
+        if iteration == 0:
+            return proposal_prompt
+        return (
+            f"{proposal_prompt}\n"
+            "This is your second chance to speak. "
+            "Consider what others have said and provide additional "
+            "thoughts or respond to their statements. "
+            "Do not simply repeat your previous statement."
+        )
+
+    def _take_turn(
+        self,
+        role: Role,
+        p: PlayerAgent,
+        prompt: str,
+        proposals: list[str],
+        pending: list[tuple[str, str]] | None = None,
+    ) -> str | None:
+        """Let ``p`` speak once and record the statement.
+
+        Args:
+            role: The role discussing
+            p: The speaking player
+            prompt: Instruction for this turn
+            proposals: Discussion so far, appended to in place
+            pending: When given, (speaker, message) pairs are collected
+                here instead of being logged right away
+
+        Returns:
+            The recorded message, or None if it repeated the player's
+            previous statement
+        """
+        response = self._call(
+            p.speak,
+            "\n".join([prompt, *proposals]),
+            self._speech_kind(role),
+            self.deadline,
+        )
+        return self._record_turn(role, p, response, proposals, pending)
+
+    def _batched(
+        self,
+        players: list[PlayerAgent],
+        instruction: str,
+        kind: CallKind,
+        tool: str,
+    ) -> dict[str, str]:
+        """Answers of ``players`` from batched requests, if enabled.
+
+        Players no reply covered (and every player once time is up) are
+        left out, to be asked on their own.
+        """
+        answers: dict[str, str] = {}
+        if self.discussion.batch_size < 2:
+            return answers
+        for group in batch.by_role(players, self.discussion.batch_size):
+            try:
+                answers.update(
+                    self._call(
+                        batch.decide,
+                        group,
+                        instruction,
+                        kind,
+                        tool,
+                        self.batch_stats,
+                        self.deadline,
+                    )
+                )
+            except PhaseTimeout:
+                break
+        return answers
+
+    def _simultaneous_turns(
+        self,
+        role: Role,
+        players: list[PlayerAgent],
+        prompt: str,
+        proposals: list[str],
+        pending: list[tuple[str, str]] | None = None,
+    ) -> None:
+        """Have ``players`` speak concurrently from the same transcript.
+
+        Nobody sees the others' statements while writing their own; they
+        are recorded in seating order once all have answered. On timeout
+        the statements that did arrive are still recorded.
+        """
+        deadline = self.deadline
+        deadline.check()
+        shared = "\n".join([prompt, *proposals])
+        kind = self._speech_kind(role)
+
+        answers = self._batched(players, shared, kind, "speak_as_player")
+
+        phase = self.phase
+        submitted = time.perf_counter()
+        self._batches += 1
+
+        def speak(p: PlayerAgent, span: Span | None) -> str:
+            self.metrics.started(phase, submitted)
+            with self.metrics.call(phase), self._traced(span):
+                return p.speak(shared, kind, deadline)
+
+        futures = {
+            p.name: self._submit(
+                speak, p, self._task(p.speak, batch=self._batches)
+            )
+            for p in players
+            if p.name not in answers
+        }
+        done, not_done = wait(futures.values(), timeout=deadline.remaining())
+        for future in not_done:
+            self._abandon(future)
+        timed_out = bool(not_done)
+        for p in players:
+            if p.name in answers:
+                self._record_turn(role, p, answers[p.name], proposals, pending)
+                continue
+            future = futures[p.name]
+            if future not in done:
+                continue
+            error = future.exception()
+            if isinstance(error, PhaseTimeout):
+                timed_out = True
+            elif error is not None:
+                raise error
+            else:
+                self._record_turn(role, p, future.result(), proposals, pending)
+        if timed_out:
+            raise PhaseTimeout
+
+    def _record_turn(
+        self,
+        role: Role,
+        p: PlayerAgent,
+        response: str,
+        proposals: list[str],
+        pending: list[tuple[str, str]] | None = None,
+    ) -> str | None:
+        """Record what ``p`` said; see ``_take_turn``."""
+        # Extract clean response (remove player name prefix if present)
+        clean_response = response
+        if response.startswith(f"[{p.name}]:"):
+            clean_response = response.split(":", 1)[1].strip()
+
+        proposal_msg = f"[{p.name}]: {clean_response}"
+        # Skip if this is a duplicate of the last proposal from this player
+        for prev_msg in reversed(proposals):
+            if prev_msg.startswith(f"[{p.name}]:"):
+                prev_content = prev_msg.split(":", 1)[1].strip()
+                if prev_content.lower() == clean_response.strip().lower():
+                    return None
+                break
+
+        proposals.append(proposal_msg)
+        if pending is not None:
+            pending.append((p.name, proposal_msg))
+        else:
+            # Log discussions: private for role-specific,
+            # public for day discussion
+            self.log_for(role, proposal_msg, EventKind.SPEECH, speaker=p.name)
+        return proposal_msg
+
+    def _scheduled_discussion(
+        self,
+        proposal_prompt: str,
+        players: list[PlayerAgent],
+        slots: int,
+        proposals: list[str],
+        pending: list[tuple[str, str]] | None = None,
+    ) -> None:
+        """Day discussion where only ``slots`` turns are handed out.
+
+        Each turn goes to the player the scheduler ranks first: accused
+        players who haven't answered yet, then whoever has spoken least.
+        Statements are appended to ``proposals``.
+        """
+        mentions = MentionCounter(self.state.alive_names())
+        per_iteration = max(1, slots // NUM_ITERATIONS)
+        for iteration in range(NUM_ITERATIONS):
+            current_prompt = self._turn_prompt(proposal_prompt, iteration)
+            if iteration == 0 and self.discussion.simultaneous_openings:
+                # Openers are picked up front since nobody has spoken yet
+                openers = self.scheduler.pick(
+                    players, per_iteration, mentions.counts
+                )
+                self._simultaneous_turns(
+                    Role.ALL, openers, current_prompt, proposals, pending
+                )
+                for p in openers:
+                    self.scheduler.record(p.name)
+                for msg in proposals:
+                    mentions.add(msg, msg[1 : msg.index("]:")])
+                continue
+            waiting = list(players)
+            for _ in range(min(per_iteration, len(waiting))):
+                p = self.scheduler.pick(waiting, 1, mentions.counts)[0]
+                waiting.remove(p)
+                msg = self._take_turn(
+                    Role.ALL, p, current_prompt, proposals, pending
+                )
+                self.scheduler.record(p.name)
+                # They've had their say on whatever they were accused of
+                mentions.counts.pop(p.name, None)
+                if msg:
+                    mentions.add(msg, p.name)
+
+    def _breakout_discussion(
+        self, proposal_prompt: str, players: list[PlayerAgent]
+    ) -> list[str]:
+        """Run scheduled sub-discussions in parallel and merge summaries.
+
+        Breakout speeches are logged group by group once every group is
+        done; only the per-group summaries are handed to the vote.
+
+        Returns:
+            One summary message per breakout group
+        """
+        groups = split_groups(players, self.discussion.breakout_groups)
+        slots = max(1, self.discussion.speaking_slots // len(groups))
+        self._batches += 1
+        spans = [
+            self.tracer.new(
+                f"breakout {i}",
+                "task",
+                self._spans.get("phase"),
+                round_no=self.round_no,
+                phase=self.phase,
+                batch=self._batches,
+            )
+            if self.tracer is not None
+            else None
+            for i in range(1, len(groups) + 1)
+        ]
+
+        def run(
+            group: list[PlayerAgent], span: Span | None
+        ) -> tuple[list, str]:
+            with self._traced(span):
+                return run_group(group)
+
+        def run_group(group: list[PlayerAgent]) -> tuple[list, str]:
+            pending: list[tuple[str, str]] = []
+            transcript: list[str] = []
+            prompt = (
+                f"{proposal_prompt}\n"
+                "You are in a breakout group with: "
+                f"{', '.join(p.name for p in group)}"
+            )
+            try:
+                self._scheduled_discussion(
+                    prompt, group, slots, transcript, pending
+                )
+                summary = self._call(
+                    summarize_round,
+                    self.god.llm,
+                    transcript,
+                    self.god.router,
+                    self.player_names,
+                )
+            except PhaseTimeout:
+                # Out of time: the vote gets the raw statements instead
+                summary = " ".join(transcript) or "Nothing was said."
+            return pending, summary
+
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            results = list(pool.map(run, groups, spans))
+
+        merged = []
+        for i, (pending, summary) in enumerate(results, start=1):
+            for speaker, msg in pending:
+                self.add_log(
+                    msg, kind=EventKind.SPEECH, speaker=speaker, breakout=i
+                )
+            summary_msg = f"[Breakout {i} summary]: {summary}"
+            self.add_log(summary_msg, breakout=i)
+            merged.append(summary_msg)
+        return merged
 
     def collect_votes_round_robin(
         self, role: Role, players: list[PlayerAgent], proposals: list[str]
-    ) -> PlayerAgent:
+    ) -> PlayerAgent | None:
         """Collect votes in round-robin format matching README.
 
         Args:
@@ -180,11 +863,12 @@ class MafiaGame:
             proposals: Previous proposals/discussion
 
         Returns:
-            Selected player
+            Selected player, or None if time ran out before any vote and
+            nobody was proposed
         """
 
         # Valid targets are all alive players (can vote for anyone alive)
-        all_alive_names = [p.name for p in self.alive_players]
+        all_alive_names = self.state.snapshot().alive
         valid_names = set(all_alive_names)
         # Initialize vote map with all alive players
         vote_mp: dict[str, int] = {name: 0 for name in all_alive_names}
@@ -198,18 +882,34 @@ class MafiaGame:
         else:
             prompt_base = "Who do you vote to eliminate?"
 
+        choices_block = "\n".join(sorted(valid_names))
+        instruction = (
+            f"{prompt_base}\nAmongst: {choices_block}.\n"
+            f"Proposals from discussion:\n{'\n'.join(proposals)}\n"
+            "IMPORTANT: You MUST use the vote_for_player tool to cast your vote. "
+            "Do NOT just say 'I vote for X' in text - you must call the vote_for_player tool. "
+            "Choose exactly ONE name from the list above."
+        )
+        # Batched votes are cast at once, before anyone's vote is logged
+        answers = self._batched(
+            players, instruction, CallKind.VOTE, "vote_as_player"
+        )
+
         # Round-robin voting
         for player in players:
-            choices_block = "\n".join(sorted(valid_names))
-            instruction = (
-                f"{prompt_base}\nAmongst: {choices_block}.\n"
-                f"Proposals from discussion:\n{'\n'.join(proposals)}\n"
-                "IMPORTANT: You MUST use the vote_for_player tool to cast your vote. "
-                "Do NOT just say 'I vote for X' in text - you must call the vote_for_player tool. "
-                "Choose exactly ONE name from the list above."
+            self.emit(
+                EventKind.INFO,
+                f"[GOD {self.god}]: {player.name}, who do you wish to vote?",
+                audience=None if role == Role.ALL else frozenset({role}),
             )
-            print(f"[GOD {self.god}]: {player.name}, who do you wish to vote?")
-            raw_response = player.speak(instruction).strip()
+            try:
+                raw_response = answers.get(player.name) or self._call(
+                    player.speak, instruction, CallKind.VOTE, self.deadline
+                )
+            except PhaseTimeout:
+                self._report_timeout(role, "vote")
+                break
+            raw_response = raw_response.strip()
 
             # Extract player name from response
             # The vote_for_player tool returns "I vote for {player_name}"
@@ -241,171 +941,367 @@ class MafiaGame:
                 vote_msg = f"[{player.name}]: I vote for {matched}"
             else:
                 # Fallback
-                fallback = random.choice(tuple(valid_names))
-                vote_mp[fallback] += 1
-                vote_msg = f"[{player.name}]: I vote for {fallback} (fallback)"
+                matched = self.rng.choice(sorted(valid_names))
+                vote_mp[matched] += 1
+                vote_msg = f"[{player.name}]: I vote for {matched} (fallback)"
 
             # Log votes: private for role-specific, public for day voting
-            if role == Role.ALL:
-                self.add_log(vote_msg)
-            else:
-                self.add_private_log_to_role(role, vote_msg)
-                print(vote_msg)
-
-        # Determine winner or loser however you look at it
-        max_votes = max(vote_mp.values())
-        top_candidates = [
-            name for name, count in vote_mp.items() if count == max_votes
-        ]
-        winner_name = sorted(top_candidates)[0]
-
-        for player in self.alive_players:
-            if player.name == winner_name:
-                return player
+            self.log_for(
+                role,
+                vote_msg,
+                EventKind.VOTE,
+                speaker=player.name,
+                target=matched,
+            )
 
-        raise RuntimeError("Winner could not be resolved from vote map")
+        winner_name = rules.tally(vote_mp)
+        if winner_name is None:
+            return self._fallback_target(role, proposals)
 
-    def match_start(self) -> None:
-        """Start the mafia game match."""
-        self.assign_roles()
+        winner = self.state.get(winner_name)
+        if winner is None:
+            raise RuntimeError("Winner could not be resolved from vote map")
+        return winner
 
-        while True:
-            self.round_no += 1
-            print(f"\n{'*' * 20} ROUND {self.round_no} {'*' * 20}")
+    def restore(self, checkpoint: Checkpoint) -> None:
+        """Put the game back in the state ``checkpoint`` was taken in.
 
-            print(
-                f"Mafias: {', '.join([p.name for p in self.alive_players if p.role == Role.MAFIA])}"
+        Raises:
+            ValueError: If the checkpoint seats other players than this
+                game's
+        """
+        by_name = {p.name: p for p in self.players}
+        if sorted(checkpoint.seating) != sorted(by_name):
+            raise ValueError(
+                "Checkpoint seats other players: "
+                f"{sorted(set(checkpoint.seating) ^ set(by_name))}"
             )
-            print(
-                f"Healers: {', '.join([p.name for p in self.alive_players if p.role == Role.HEALER])}"
+        self.players[:] = [by_name[name] for name in checkpoint.seating]
+        self._deal([checkpoint.roles[p.name] for p in self.players])
+        alive = set(checkpoint.alive)
+        for player in self.players:
+            player.memory[:] = checkpoint.memories.get(player.name, [])
+            if player.name not in alive:
+                self.state.kill(player.name)
+        self.round_no = checkpoint.round_no
+        self.logs = list(checkpoint.logs)
+        self._summary = checkpoint.summary
+        self._night = dict(checkpoint.night)
+        self.scheduler.spoken.update(checkpoint.spoken)
+        if checkpoint.announcement is not None:
+            victim, stamp, prompt, text = (
+                checkpoint.announcement[k]
+                for k in ("victim", "stamp", "prompt", "text")
             )
-            print(
-                f"Detectives: {', '.join([p.name for p in self.alive_players if p.role == Role.DETECTIVE])}"
+            if text is None:
+                # The god hadn't answered yet; ask again
+                future = self._in_background(
+                    self.god.decide, prompt, self.player_names
+                )
+            else:
+                future = Future()
+                future.set_result(text)
+            self._announcement = (future, victim, tuple(stamp), prompt)
+
+    def _take_checkpoint(self, step: str) -> None:
+        """Hand the state after ``step`` to the checkpoint sink."""
+        if self.checkpoint is None:
+            return
+        announcement = None
+        if self._announcement is not None:
+            future, victim, stamp, prompt = self._announcement
+            done = future.done() and future.exception() is None
+            announcement = {
+                "victim": victim,
+                "stamp": list(stamp),
+                "prompt": prompt,
+                "text": future.result() if done else None,
+            }
+        pending = self._pending_summary
+        if pending is not None and pending.done():
+            summary = self.summary
+        else:
+            summary = self._summary
+        self.checkpoint(
+            Checkpoint(
+                round_no=self.round_no,
+                step=step,
+                seating=self.player_names,
+                roles={p.name: p.role for p in self.players},
+                alive=self.state.alive_names(),
+                memories={p.name: list(p.memory) for p in self.players},
+                logs=list(self.logs),
+                night=dict(self._night),
+                announcement=announcement,
+                summary=summary,
+                spoken=dict(self.scheduler.spoken),
             )
-            print(
-                f"Villagers: {', '.join([p.name for p in self.alive_players if p.role == Role.VILLAGER])}"
+        )
+
+    def _begin_round(self) -> None:
+        self.round_no += 1
+        self._night = {}
+        self._close_span("phase")
+        self._open_span(
+            "round", f"round {self.round_no}", "game", round_no=self.round_no
+        )
+        self.enter_phase("setup")
+        header = f"{'*' * 20} ROUND {self.round_no} {'*' * 20}"
+        snapshot = self.state.snapshot()
+        roster = {
+            role: snapshot.with_role(role)
+            for role in (
+                Role.MAFIA,
+                Role.HEALER,
+                Role.DETECTIVE,
+                Role.VILLAGER,
             )
+        }
+        self.emit(
+            EventKind.INFO,
+            "\n".join(
+                [
+                    f"\n{header}",
+                    f"Mafias: {', '.join(roster[Role.MAFIA])}",
+                    f"Healers: {', '.join(roster[Role.HEALER])}",
+                    f"Detectives: {', '.join(roster[Role.DETECTIVE])}",
+                    f"Villagers: {', '.join(roster[Role.VILLAGER])}",
+                    "*" * (40 + len(f" ROUND {self.round_no} ")),
+                ]
+            ),
+            audience=GODS_EYE,
+            roles={role.value: names for role, names in roster.items()},
+        )
 
-            print("*" * (40 + len(f" ROUND {self.round_no} ")))
+        # Night phase
+        self.set_phase("night", f"[GOD {self.god}]: City goes to sleep")
 
-            # Night phase
-            self.add_log(f"[GOD {self.god}]: City goes to sleep")
+    def _mafia_step(self) -> None:
+        self.set_phase(
+            "mafia",
+            f"[GOD {self.god}]: Mafias wake up, who you want to kill?",
+        )
+        self._night["kill"] = self.discuss(
+            role=Role.MAFIA, players=self.state.with_role(Role.MAFIA)
+        )
+        self.add_log(f"[GOD {self.god}]: Mafias go to sleep")
 
-            # Mafia phase
-            self.add_log(
-                f"[GOD {self.god}]: Mafias wake up, who you want to kill?"
-            )
-            mafia_players = [
-                p for p in self.alive_players if p.role == Role.MAFIA
-            ]
-            to_kill = self.discuss(role=Role.MAFIA, players=mafia_players)
-            self.add_log(f"[GOD {self.god}]: Mafias go to sleep")
-
-            # Healer phase
-            self.add_log(
-                f"[GOD {self.god}]: Healers wake up, who you want to heal?"
-            )
-            healer_players = [
-                p for p in self.alive_players if p.role == Role.HEALER
-            ]
-            to_heal = self.discuss(role=Role.HEALER, players=healer_players)
+    def _healer_step(self) -> None:
+        self.set_phase(
+            "healer",
+            f"[GOD {self.god}]: Healers wake up, who you want to heal?",
+        )
+        self._night["heal"] = self.discuss(
+            role=Role.HEALER, players=self.state.with_role(Role.HEALER)
+        )
 
-            self.add_log(f"[GOD {self.god}]: Healers go to sleep")
+        self.add_log(f"[GOD {self.god}]: Healers go to sleep")
 
-            # Detective phase
-            self.add_log(
-                f"[GOD {self.god}]: Detectives wake up, who do you suspect?"
+    def _detective_step(self) -> None:
+        self.set_phase(
+            "detective",
+            f"[GOD {self.god}]: Detectives wake up, who do you suspect?",
+        )
+        to_check_name = self.discuss(
+            role=Role.DETECTIVE,
+            players=self.state.with_role(Role.DETECTIVE),
+        )
+        to_check_player = self.state.get(to_check_name)
+        if to_check_player:
+            is_mafia = rules.reveals_mafia(to_check_player.role)
+            reveal_msg = (
+                f"{to_check_player.name} is "
+                f"{'' if is_mafia else 'not '}a mafia."
             )
-            detective_players = [
-                p for p in self.alive_players if p.role == Role.DETECTIVE
-            ]
-            to_check_name = self.discuss(
-                role=Role.DETECTIVE, players=detective_players
+            # Private reveal to detectives only - use role-based
+            # private log
+            self.add_private_log_to_role(
+                Role.DETECTIVE,
+                f"[GOD {self.god}]: {reveal_msg}",
+                kind=EventKind.REVEAL,
+                target=to_check_player.name,
+                is_mafia=is_mafia,
             )
-            # Find the player object
-            to_check_player = next(
-                (
-                    player
-                    for player in self.alive_players
-                    if player.name == to_check_name
-                ),
-                None,
+
+        self.add_log(f"[GOD {self.god}]: Detectives go to sleep")
+
+    def _day_step(self) -> rules.Winner | None:
+        """Reveal the night, discuss, vote and end the round.
+
+        Returns:
+            The winning side, if the vote decided the game
+        """
+        victim = rules.night_victim(
+            self._night.get("kill", ""), self._night.get("heal", "")
+        )
+        self.enter_phase("day")
+        # Last round's announcement comes before this round's news
+        self._finish_announcement()
+        self.add_log(
+            f"[GOD {self.god}]: City wakes up, finding "
+            f"{victim or 'no one'} dead.",
+            kind=EventKind.DEATH,
+            victim=victim,
+            cause="night",
+        )
+        if victim:
+            self.state.kill(victim)
+
+        # Day discussion
+        to_eliminate_name = self.discuss(
+            role=Role.ALL, players=self.alive_players
+        )
+
+        to_eliminate = self.state.get(to_eliminate_name)
+
+        self.enter_phase("round_end")
+        # The win check only needs the alive set; the announcement and
+        # summary run in the background and are joined when used
+        if to_eliminate:
+            self.state.kill(to_eliminate.name)
+        winner = rules.winner(
+            self.state.count(Role.MAFIA), self.state.town_count()
+        )
+        if to_eliminate:
+            # Ask on this thread, before the next night's output starts;
+            # flush pending output first
+            self.events.drain()
+            instruction = self.god.special_instruction()
+            prompt = (
+                f"The voting has concluded and {to_eliminate.name} "
+                f"has been voted to be eliminated. "
+                f"It is time to make the last announcement of the round "
+                f"related to elimination."
             )
-            if to_check_player:
-                is_mafia = to_check_player.role == Role.MAFIA
-                reveal_msg = (
-                    f"{to_check_player.name} is "
-                    f"{'' if is_mafia else 'not '}a mafia."
+            if instruction:
+                prompt += f"\nSpecial instruction from the user: {instruction}"
+                # It may tell the god to end the game, which has to
+                # happen now rather than after another night
+                future: Future[str] = Future()
+                future.set_result(
+                    self._call(self.god.decide, prompt, self.player_names)
                 )
-                # Private reveal to detectives only - use role-based
-                # private log
-                self.add_private_log_to_role(
-                    Role.DETECTIVE, f"[GOD {self.god}]: {reveal_msg}"
+            else:
+                future = self._in_background(
+                    self.god.decide, prompt, self.player_names
                 )
-                print(f"[GOD {self.god}]: {reveal_msg}")
-
-            self.add_log(f"[GOD {self.god}]: Detectives go to sleep")
-
-            # Day phase
-            death_msg = "no one" if to_kill == to_heal else to_kill
-            self.add_log(
-                f"[GOD {self.god}]: City wakes up, finding {death_msg} dead."
+            self._announcement = (
+                future,
+                to_eliminate.name,
+                (self.round_no, self.phase),
+                prompt,
             )
-            # Remove killed player if not healed
-            if to_kill and to_kill != to_heal:
-                self.alive_players = [
-                    player
-                    for player in self.alive_players
-                    if player.name != to_kill
-                ]
+        self._pending_summary = self._in_background(
+            summarize_round,
+            self.god.llm,
+            list(self.logs),
+            self.god.router,
+            self.player_names,
+        )
+        return winner
 
-            # Day discussion
-            to_eliminate_name = self.discuss(
-                role=Role.ALL, players=self.alive_players
-            )
+    def match_start(
+        self,
+        max_rounds: int | None = None,
+        roles: Mapping[str, Role] | None = None,
+        resume: Checkpoint | None = None,
+    ) -> MatchResult:
+        """Start the mafia game match.
 
-            to_eliminate = next(
-                (
-                    player
-                    for player in self.alive_players
-                    if player.name == to_eliminate_name
-                ),
-                None,
-            )
+        Args:
+            max_rounds: Stop after this many rounds even if nobody has won
+                (benchmarks and smoke runs)
+            roles: Fixed role per player name instead of a random deal
+            resume: Carry on after the step this checkpoint was taken at
+                instead of dealing a new game; ``roles`` is ignored
+
+        Returns:
+            The outcome of the match
 
-            if to_eliminate:
-                prompt = (
-                    f"The voting has concluded and {to_eliminate.name} "
-                    f"has been voted to be eliminated. "
-                    f"Since this is time to make the last announcement "
-                    f"of the round related to elimination, use "
-                    f"get_special_instruction tool to get instruction "
-                    f"from the user about how announcement should be like"
+        Raises:
+            ValueError: If ``resume`` seats other players
+        """
+        self._open_span("game", "game", players=len(self.players))
+        if resume is None:
+            self.assign_roles(roles)
+            start = 0
+        else:
+            self.restore(resume)
+            start = ROUND_STEPS.index(resume.step) + 1
+            if start < len(ROUND_STEPS):
+                self._open_span(
+                    "round",
+                    f"round {self.round_no}",
+                    "game",
+                    round_no=self.round_no,
                 )
-                god_announcement = self.god.decide(prompt)
-                self.add_log(god_announcement)
-                # Remove eliminated player
-                self.alive_players = [
-                    p
-                    for p in self.alive_players
-                    if p.name != to_eliminate.name
-                ]
+        # Only once the lobby checks out: ``reset_match`` unsubscribes it
+        if not self.quiet and self._terminal is None:
+            self._terminal = self.events.subscribe(
+                "terminal", terminal_sink, block=True
+            )
+        if resume is not None:
+            self.emit(
+                EventKind.INFO,
+                f"Resuming round {resume.round_no} after the {resume.step}.",
+                audience=GODS_EYE,
+                resumed=resume.step,
+            )
+        steps = {
+            "mafia": self._mafia_step,
+            "healer": self._healer_step,
+            "detective": self._detective_step,
+        }
 
-            self.summary = summarize_round(self.god.llm, self.logs)
-            print(f"\n{'*' * 20} ROUND {self.round_no} ENDS {'*' * 20}\n")
+        try:
+            while True:
+                if start % len(ROUND_STEPS) == 0:
+                    start = 0
+                    self._begin_round()
+                for step in ROUND_STEPS[start:-1]:
+                    steps[step]()
+                    self._take_checkpoint(step)
+                start = 0
+                winner = self._day_step()
 
-            # Check win conditions
-            mafia_alive = [
-                p for p in self.alive_players if p.role == Role.MAFIA
-            ]
-            town_alive = [
-                p for p in self.alive_players if p.role != Role.MAFIA
-            ]
+                last_round = (
+                    max_rounds is not None and self.round_no >= max_rounds
+                )
+                if winner or last_round:
+                    self._finish_announcement()
+                else:
+                    self._take_checkpoint(ROUND_STEPS[-1])
+                self.emit(
+                    EventKind.INFO,
+                    f"\n{'*' * 20} ROUND {self.round_no} ENDS {'*' * 20}\n",
+                )
 
-            if not mafia_alive:
-                print("Villagers win!")
-                break
-            if len(mafia_alive) >= len(town_alive):
-                print("Mafia wins!")
-                break
-        self.reset_match()
+                if winner == rules.Winner.TOWN:
+                    self.emit(EventKind.INFO, "Villagers win!", winner="town")
+                    break
+                if winner == rules.Winner.MAFIA:
+                    self.emit(EventKind.INFO, "Mafia wins!", winner="mafia")
+                    break
+                if last_round:
+                    self.emit(
+                        EventKind.INFO, "Round limit reached.", winner=None
+                    )
+                    break
+            self.metrics.enter(None)
+            self.events.drain()
+            self._close_span("phase")
+            self._close_span("round")
+            self._close_span(
+                "game",
+                winner=winner.value if winner else None,
+                rounds=self.round_no,
+            )
+            result = MatchResult(
+                winner=winner,
+                rounds=self.round_no,
+                roles={p.name: p.role for p in self.players},
+                survivors=frozenset(self.state.alive_names()),
+            )
+        finally:
+            self.reset_match()
+        return result
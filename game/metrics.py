@@ -0,0 +1,108 @@
+"""Per-phase call counters and timings."""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class PhaseStats:
+    calls: int = 0
+    seconds: float = 0.0
+    wall_seconds: float = 0.0
+    timeouts: int = 0
+    queued: int = 0
+    queue_seconds: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    @property
+    def mean_queue_delay(self) -> float:
+        return self.queue_seconds / self.queued if self.queued else 0.0
+
+
+class PhaseMetrics:
+    """Counts LLM calls and their latency for each game phase.
+
+    ``seconds`` sums call latencies while ``wall_seconds`` is the time the
+    phase took end to end; they differ once calls overlap. Calls handed
+    to a worker thread also record how long they waited for one in
+    ``queue_delays``, the scheduling delay that grows once a process runs
+    more games than it has threads or GIL time for.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, PhaseStats] = {}
+        self.queue_delays: list[float] = []
+        self._lock = threading.Lock()
+        self._current: str | None = None
+        self._entered = 0.0
+
+    def _stats(self, phase: str) -> PhaseStats:
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        return stats
+
+    @contextmanager
+    def call(self, phase: str) -> Iterator[None]:
+        """Time one LLM call made during ``phase``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stats(phase)
+                stats.calls += 1
+                stats.seconds += elapsed
+
+    def started(self, phase: str, submitted: float) -> None:
+        """Record the queue delay of a call of ``phase`` that just started.
+
+        Args:
+            phase: Phase the call belongs to
+            submitted: ``time.perf_counter()`` when it was handed to a pool
+        """
+        delay = time.perf_counter() - submitted
+        with self._lock:
+            stats = self._stats(phase)
+            stats.queued += 1
+            stats.queue_seconds += delay
+            self.queue_delays.append(delay)
+
+    def timeout(self, phase: str) -> None:
+        """Count a time limit that ran out during ``phase``."""
+        with self._lock:
+            self._stats(phase).timeouts += 1
+
+    def enter(self, phase: str | None) -> None:
+        """Close the running phase's wall clock and start ``phase``'s."""
+        now = time.perf_counter()
+        with self._lock:
+            if self._current is not None:
+                self._stats(self._current).wall_seconds += now - self._entered
+            self._current, self._entered = phase, now
+
+    def reset(self) -> None:
+        with self._lock:
+            self.phases = {}
+            self.queue_delays = []
+            self._current = None
+
+    def report(self) -> str:
+        lines = [
+            f"{'phase':<12}{'calls':>8}{'call s':>10}{'mean ms':>10}"
+            f"{'wall s':>10}{'timeouts':>10}{'queue ms':>10}"
+        ]
+        for name, s in self.phases.items():
+            lines.append(
+                f"{name:<12}{s.calls:>8}{s.seconds:>10.2f}"
+                f"{s.mean_latency * 1000:>10.1f}{s.wall_seconds:>10.2f}"
+                f"{s.timeouts:>10}{s.mean_queue_delay * 1000:>10.2f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,229 @@
+"""SQLite store of tournament results and ratings.
+
+Every finished game is written in one transaction together with the
+rating updates it caused, so an interrupted tournament resumes from the
+last finished game with consistent ratings.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from game.types import Role
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    name TEXT PRIMARY KEY,
+    config TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    tournament TEXT NOT NULL REFERENCES tournaments(name),
+    game_no INTEGER NOT NULL,
+    winner TEXT,
+    rounds INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    finished REAL NOT NULL,
+    PRIMARY KEY (tournament, game_no)
+);
+CREATE TABLE IF NOT EXISTS seats (
+    tournament TEXT NOT NULL,
+    game_no INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    role TEXT NOT NULL,
+    survived INTEGER NOT NULL,
+    won INTEGER,
+    PRIMARY KEY (tournament, game_no, player)
+);
+CREATE TABLE IF NOT EXISTS ratings (
+    tournament TEXT NOT NULL,
+    player TEXT NOT NULL,
+    role TEXT NOT NULL,
+    rating REAL NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    PRIMARY KEY (tournament, player, role)
+);
+"""
+
+
+@dataclass(frozen=True)
+class GameRecord:
+    """Result of one tournament game.
+
+    Attributes:
+        game_no: Index of the game in the schedule
+        winner: "town", "mafia", or None if the round limit ended it
+        rounds: Rounds played
+        seconds: Wall time of the game
+        input_tokens: Prompt tokens over every model call
+        output_tokens: Completion tokens over every model call
+        seats: (player, role, survived) per seat
+    """
+
+    game_no: int
+    winner: str | None
+    rounds: int
+    seconds: float
+    input_tokens: int
+    output_tokens: int
+    seats: tuple[tuple[str, Role, bool], ...]
+
+    def won(self, role: Role) -> bool | None:
+        """Whether ``role``'s side won; None for an undecided game."""
+        if self.winner is None:
+            return None
+        return (role == Role.MAFIA) == (self.winner == "mafia")
+
+
+@dataclass(slots=True)
+class Rating:
+    rating: float
+    games: int = 0
+    wins: int = 0
+
+
+class ResultStore:
+    """Results of any number of tournaments in one SQLite file."""
+
+    def __init__(self, path: str | Path) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def open_tournament(self, name: str, config: dict[str, Any]) -> bool:
+        """Create tournament ``name`` or check it can be resumed.
+
+        Returns:
+            True if the tournament already existed
+
+        Raises:
+            ValueError: If it exists with a different config, whose games
+                wouldn't be comparable
+        """
+        encoded = json.dumps(config, sort_keys=True)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT config FROM tournaments WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO tournaments VALUES (?, ?, ?)",
+                    (name, encoded, time.time()),
+                )
+                return False
+        if row[0] != encoded:
+            raise ValueError(
+                f"Tournament {name} exists with a different config: {row[0]}"
+            )
+        return True
+
+    def finished(self, name: str) -> set[int]:
+        """Numbers of the games of ``name`` already recorded."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT game_no FROM games WHERE tournament = ?", (name,)
+            ).fetchall()
+        return {game_no for (game_no,) in rows}
+
+    def ratings(
+        self, name: str, keys: list[tuple[str, Role]] | None = None
+    ) -> dict[tuple[str, Role], Rating]:
+        """Current ratings of ``name``, all of them or just ``keys``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT player, role, rating, games, wins FROM ratings "
+                "WHERE tournament = ?",
+                (name,),
+            ).fetchall()
+        ratings = {
+            (player, Role(role)): Rating(rating, games, wins)
+            for player, role, rating, games, wins in rows
+        }
+        if keys is None:
+            return ratings
+        return {key: ratings[key] for key in keys if key in ratings}
+
+    def record(
+        self,
+        name: str,
+        game: GameRecord,
+        ratings: dict[tuple[str, Role], Rating],
+    ) -> None:
+        """Store a finished game and the ratings it produced, atomically.
+
+        Raises:
+            sqlite3.IntegrityError: If the game was already recorded
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    game.game_no,
+                    game.winner,
+                    game.rounds,
+                    game.seconds,
+                    game.input_tokens,
+                    game.output_tokens,
+                    time.time(),
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO seats VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        name,
+                        game.game_no,
+                        player,
+                        role.value,
+                        survived,
+                        game.won(role),
+                    )
+                    for player, role, survived in game.seats
+                ],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ratings VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (name, player, role.value, r.rating, r.games, r.wins)
+                    for (player, role), r in ratings.items()
+                ],
+            )
+
+    def leaderboard(
+        self, name: str, role: Role | None = None
+    ) -> list[tuple[str, Role, Rating]]:
+        """Ratings of ``name`` from best to worst, optionally of one role."""
+        ordered = sorted(
+            self.ratings(name).items(), key=lambda item: -item[1].rating
+        )
+        return [
+            (player, r, rating)
+            for (player, r), rating in ordered
+            if role is None or r == role
+        ]
+
+    def totals(self, name: str) -> dict[str, float]:
+        """Games, wins per side and token usage of ``name`` so far."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), SUM(winner = 'town'), SUM(winner = 'mafia'),"
+                " SUM(input_tokens), SUM(output_tokens), SUM(seconds) "
+                "FROM games WHERE tournament = ?",
+                (name,),
+            ).fetchone()
+        keys = ("games", "town", "mafia", "input", "output", "seconds")
+        return {key: value or 0 for key, value in zip(keys, row, strict=True)}
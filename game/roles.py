@@ -0,0 +1,116 @@
+"""Role distribution: how many of each role a lobby gets."""
+
+from dataclasses import dataclass, field
+
+from game.types import Role
+
+# Roles that are dealt explicitly; villagers fill the remaining seats
+SPECIAL_ROLES = (Role.MAFIA, Role.DETECTIVE, Role.HEALER)
+
+
+@dataclass(frozen=True)
+class RoleDistribution:
+    """Either explicit role counts or ratios of the lobby size.
+
+    Villagers always take the seats left over. With ratios every special
+    role gets at least ``minimum[role]`` seats, so small lobbies still
+    have one of each.
+    """
+
+    counts: dict[Role, int] = field(default_factory=dict)
+    ratios: dict[Role, float] = field(default_factory=dict)
+    minimum: dict[Role, int] = field(
+        default_factory=lambda: {role: 1 for role in SPECIAL_ROLES}
+    )
+
+    def __post_init__(self) -> None:
+        if self.counts and self.ratios:
+            raise ValueError("Give either role counts or role ratios")
+        for role in [*self.counts, *self.ratios]:
+            if role not in (*SPECIAL_ROLES, Role.VILLAGER):
+                raise ValueError(f"{role.value} can't be dealt")
+        if any(n < 0 for n in self.counts.values()):
+            raise ValueError("Role counts must be non-negative")
+        if any(not 0 <= r < 1 for r in self.ratios.values()):
+            raise ValueError("Role ratios must be in [0, 1)")
+        if Role.VILLAGER in self.ratios:
+            raise ValueError(
+                "Villagers take the seats left over and can't have a ratio"
+            )
+
+    @classmethod
+    def default(cls) -> "RoleDistribution":
+        """README proportions: 10 players -> 2 M, 2 D, 1 H, 5 V."""
+        return cls(
+            ratios={Role.MAFIA: 0.2, Role.DETECTIVE: 0.2, Role.HEALER: 0.1}
+        )
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "RoleDistribution":
+        """Parse ``"mafia=2,detective=1"`` or ``"mafia=0.25,healer=0.1"``.
+
+        Integers are read as counts and fractions as ratios. Villagers
+        can only be given as a count, which must then fill the lobby
+        exactly.
+        """
+        values: dict[Role, float] = {}
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            name, sep, value = part.partition("=")
+            if not sep:
+                raise ValueError(f"Expected role=value, got {part!r}")
+            try:
+                values[Role(name.strip().lower())] = float(value)
+            except ValueError as e:
+                raise ValueError(f"Invalid role spec {part!r}") from e
+        if all(v.is_integer() and v >= 1 or v == 0 for v in values.values()):
+            return cls(counts={role: int(v) for role, v in values.items()})
+        return cls(ratios=values)
+
+    def resolve(self, lobby_size: int) -> dict[Role, int]:
+        """Turn the distribution into counts for ``lobby_size`` players.
+
+        Raises:
+            ValueError: If the lobby can't be dealt a playable game
+        """
+        if self.counts:
+            counts = {role: self.counts.get(role, 0) for role in SPECIAL_ROLES}
+        else:
+            ratios = self.ratios or self.default().ratios
+            counts = {
+                role: max(
+                    self.minimum.get(role, 0),
+                    round(ratios.get(role, 0) * lobby_size),
+                )
+                for role in SPECIAL_ROLES
+            }
+        villagers = lobby_size - sum(counts.values())
+        if Role.VILLAGER in self.counts and self.counts[Role.VILLAGER] != (
+            villagers
+        ):
+            raise ValueError(
+                f"Role counts add up to "
+                f"{sum(counts.values()) + self.counts[Role.VILLAGER]} "
+                f"but the lobby has {lobby_size} players"
+            )
+        if villagers < 0:
+            raise ValueError(
+                f"{lobby_size} players are too few for "
+                f"{sum(counts.values())} special roles"
+            )
+        counts[Role.VILLAGER] = villagers
+        if counts[Role.MAFIA] < 1:
+            raise ValueError("At least one mafia is required")
+        if counts[Role.MAFIA] >= lobby_size - counts[Role.MAFIA]:
+            raise ValueError(
+                f"{counts[Role.MAFIA]} mafia in a lobby of {lobby_size} "
+                "would win before the first night"
+            )
+        return counts
+
+    def deal(self, lobby_size: int) -> list[Role]:
+        """Roles for ``lobby_size`` seats, unshuffled."""
+        return [
+            role
+            for role, n in self.resolve(lobby_size).items()
+            for _ in range(n)
+        ]
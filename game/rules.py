@@ -0,0 +1,54 @@
+"""Rules of the game, free of agents, prompts and I/O.
+
+``MafiaGame`` applies them to what the LLM players decide; the Monte
+Carlo simulator in ``game.simulation`` mirrors them over arrays of games.
+"""
+
+from collections.abc import Mapping
+from enum import Enum
+
+from game.types import Role
+
+
+class Winner(str, Enum):
+    TOWN = "town"
+    MAFIA = "mafia"
+
+
+def night_victim(kill: str | None, heal: str | None) -> str | None:
+    """Who dies overnight: the mafia's target, unless it was healed."""
+    if not kill or kill == heal:
+        return None
+    return kill
+
+
+def reveals_mafia(role: Role | None) -> bool:
+    """What the god tells the detectives about a checked player."""
+    return role == Role.MAFIA
+
+
+def tally(votes: Mapping[str, int]) -> str | None:
+    """Pick the most voted player.
+
+    Ties go to the alphabetically first name.
+
+    Returns:
+        The chosen name, or None if no vote was cast
+    """
+    if not any(votes.values()):
+        return None
+    most = max(votes.values())
+    return min(name for name, count in votes.items() if count == most)
+
+
+def winner(mafia_alive: int, town_alive: int) -> Winner | None:
+    """Decide the game at the end of a round.
+
+    The town wins once every mafia is gone; the mafia win once they are
+    at least as many as everyone else.
+    """
+    if not mafia_alive:
+        return Winner.TOWN
+    if mafia_alive >= town_alive:
+        return Winner.MAFIA
+    return None
@@ -0,0 +1,126 @@
+"""Lobby and model config shared by the command lines.
+
+Used by ``main.py``, ``game.tournament`` and ``game.workqueue``; cheap to
+import, so a setup is checked before any model library is loaded.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from agents.routing import BUILTIN_BACKENDS, parse_config
+from game.roles import RoleDistribution
+from utils.personalities import Personality, PersonalityRegistry
+
+# Votes, lone night actions, summaries and announcements are mechanical,
+# so they go to a faster and cheaper tier than day speeches
+MODEL_TIERS = {
+    "backend": "gemini",
+    "tiers": {
+        "main": {"model": "gemini-2.0-flash", "temperature": 1.0},
+        "fast": {
+            "model": "gemini-2.0-flash-lite",
+            "temperature": 0.3,
+            "max_tokens": 256,
+        },
+    },
+    "routes": {
+        "vote": "fast",
+        "night_action": "fast",
+        "summary": "fast",
+        "announcement": "fast",
+    },
+    "default": "main",
+}
+
+DEFAULT_PLAYERS = (
+    "Joe Rogan",
+    "Elon Musk",
+    "Mahatma Gandhi",
+    "Andrew Tate",
+    "Diogenes",
+    "Chael Sonnen",
+    "Donald Trump",
+    "Tony Stark",
+    "Ultron",
+    "JARVIS",
+    "Lord Voldemort",
+)
+DEFAULT_GOD = "Albus Dumbledore"
+
+
+def model_config(args: argparse.Namespace) -> dict[str, Any]:
+    """The ``--config`` file or the default tiers, with ``--backend``.
+
+    With the fake backend, ``--seed`` seeds every tier.
+    """
+    config = (
+        json.loads(Path(args.config).read_text())
+        if args.config
+        else MODEL_TIERS
+    )
+    if args.backend is None:
+        return config
+    tiers = {}
+    for name, spec in config["tiers"].items():
+        spec = {k: v for k, v in spec.items() if k != "backend"}
+        if args.backend == "fake" and args.seed is not None:
+            spec["seed"] = args.seed
+        tiers[name] = spec
+    return {**config, "backend": args.backend, "tiers": tiers}
+
+
+def without_secrets(config: Any) -> Any:
+    """``config`` without credentials, e.g. to store it with results.
+
+    Drops ``api_key``, ``api_keys`` and backend-specific ``*_api_key``
+    options at any depth. ``api_key_env`` only names a variable and is
+    kept.
+    """
+    if isinstance(config, dict):
+        return {
+            k: without_secrets(v)
+            for k, v in config.items()
+            if not (k == "api_keys" or k.endswith("api_key"))
+        }
+    if isinstance(config, list):
+        return [without_secrets(v) for v in config]
+    return config
+
+
+def check_setup(
+    args: argparse.Namespace,
+) -> tuple[list[Personality], Personality, RoleDistribution, dict]:
+    """Validate the lobby, roles and model config of parsed arguments.
+
+    Reads ``players``, ``god``, ``personalities``, ``roles`` and the
+    arguments of ``model_config``.
+
+    Returns:
+        Player personalities in the given order, the god's personality,
+        the role distribution and the model config
+
+    Raises:
+        ValueError: If anything doesn't check out
+    """
+    registry = PersonalityRegistry.load(args.personalities)
+    players, god = registry.lobby(
+        (n.strip() for n in args.players.split(",") if n.strip()), args.god
+    )
+
+    roles = (
+        RoleDistribution.from_spec(args.roles)
+        if args.roles
+        else RoleDistribution.default()
+    )
+    roles.resolve(len(players))
+    config = model_config(args)
+    tiers, _, _ = parse_config(config)
+    unknown = sorted({t.backend for t in tiers.values()} - {*BUILTIN_BACKENDS})
+    if unknown:
+        raise ValueError(
+            f"Unknown backend {', '.join(map(repr, unknown))}, expected "
+            f"one of: {', '.join(BUILTIN_BACKENDS)}"
+        )
+    return players, god, roles, config
@@ -0,0 +1,298 @@
+"""Monte Carlo games under scripted policies, vectorized with NumPy.
+
+Plays many games at once with the rules in ``game.rules``: every round
+the mafia kill (unless the target was healed), the detectives check
+someone, and the town eliminates the most voted player. The game is
+decided at the end of each round. Players act by a ``Policy`` instead of
+an LLM, so role distributions can be compared before spending tokens
+on them. Small lobbies play hundreds of thousands of games a second, but
+votes cost O(n^2) per round over O(n) rounds: a lobby of 40 plays about
+4% as many games a second as a lobby of 10.
+
+NumPy is an optional dependency: ``pip install 'mafia[sim]'``.
+"""
+
+import time
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "game.simulation needs numpy: pip install 'mafia[sim]'"
+    ) from e
+
+from game.roles import RoleDistribution
+from game.types import Role
+
+# Upper bound on the (seats, games) arrays of a batch
+BATCH_CELLS = 4_000_000
+
+# Codes of the per-game outcome array
+ONGOING, TOWN, MAFIA = 0, 1, 2
+# Codes of what the detectives know about each seat
+UNKNOWN, CLEARED, EXPOSED = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class Policy:
+    """How scripted players choose their targets.
+
+    Mafia never target each other at night and the healer and detectives
+    pick uniformly among who is left; the parameters shape the day vote.
+
+    Attributes:
+        name: Label used in reports
+        trust: Chance that a town voter follows the detectives: vote for
+            a player they exposed, or at least not for one they cleared
+        mafia_bloc: Mafia vote together for one town player by day
+            instead of voting at random
+    """
+
+    name: str
+    trust: float = 0.0
+    mafia_bloc: bool = False
+
+
+POLICIES = {
+    p.name: p
+    for p in (
+        Policy("random"),
+        Policy("detective-trusting", trust=1.0),
+        Policy("mafia-coordinating", mafia_bloc=True),
+        Policy("trusting-vs-coordinating", trust=1.0, mafia_bloc=True),
+    )
+}
+
+
+@dataclass(frozen=True)
+class SimResult:
+    """Outcome of a batch of simulated games.
+
+    Attributes:
+        games: Games played
+        town_wins: Games the town won
+        mafia_wins: Games the mafia won
+        lengths: Number of games per length in rounds (index = rounds)
+        seconds: Wall time of the simulation
+    """
+
+    games: int
+    town_wins: int
+    mafia_wins: int
+    lengths: np.ndarray
+    seconds: float
+
+    @property
+    def town_rate(self) -> float:
+        return self.town_wins / self.games
+
+    @property
+    def mafia_rate(self) -> float:
+        return self.mafia_wins / self.games
+
+    @property
+    def mean_rounds(self) -> float:
+        rounds = np.arange(len(self.lengths))
+        return float((rounds * self.lengths).sum() / self.games)
+
+    def rounds_percentile(self, q: float) -> int:
+        """Game length (rounds) at percentile ``q`` in [0, 100]."""
+        cumulative = np.cumsum(self.lengths)
+        return int(np.searchsorted(cumulative, q / 100 * self.games))
+
+
+def _running_count(mask: np.ndarray) -> np.ndarray:
+    """``mask.cumsum(axis=0)``, row by row.
+
+    NumPy's cumsum along the short axis is an order of magnitude slower
+    than adding the long rows one after another.
+    """
+    count = np.empty(mask.shape, dtype=np.int16)
+    count[0] = mask[0]
+    for seat in range(1, len(mask)):
+        np.add(count[seat - 1], mask[seat], out=count[seat])
+    return count
+
+
+def _pick(rng: np.random.Generator, mask: np.ndarray) -> np.ndarray:
+    """Pick a True seat per game (column) uniformly, -1 if none."""
+    cum = _running_count(mask)
+    size = cum[-1]
+    r = (rng.random(size.shape, dtype=np.float32) * size).astype(np.int16)
+    # Seats before the (r + 1)-th member; float rounding can hit ``size``
+    picked = (cum <= np.minimum(r, size - 1)).sum(axis=0, dtype=np.intp)
+    picked[size == 0] = -1
+    return picked
+
+
+def _vote(rng: np.random.Generator, pool: np.ndarray) -> np.ndarray:
+    """Every seat votes uniformly for another member of ``pool``.
+
+    Returns:
+        Target per voter (row) and game, -1 where there is nobody else
+    """
+    cum = _running_count(pool)
+    size = cum[-1]
+    votes = np.empty(pool.shape, dtype=np.intp)
+    for seat, own in enumerate(pool):
+        choices = size - own
+        r = (rng.random(size.shape, dtype=np.float32) * choices).astype(
+            np.int16
+        )
+        r = np.minimum(r, choices - 1)
+        # Skip the voter's own place among the members
+        r += own & (r >= cum[seat] - 1)
+        votes[seat] = (cum <= r).sum(axis=0, dtype=np.intp)
+        votes[seat, choices <= 0] = -1
+    return votes
+
+
+def _set(matrix: np.ndarray, seats: np.ndarray, value) -> None:
+    """``matrix[seat, game] = value`` for the games with ``seat >= 0``."""
+    games = np.flatnonzero(seats >= 0)
+    matrix[seats[games], games] = value
+
+
+def _play(
+    rng: np.random.Generator, seats: np.ndarray, policy: Policy, games: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Play ``games`` games to the end.
+
+    Arrays are seat-major, (seats, games), so per-game reductions over
+    the few seats are row operations over long contiguous rows. Finished
+    games are dropped from them after every round.
+
+    Returns:
+        The outcome code and length in rounds of every game
+    """
+    n = len(seats)
+    mafia = (seats == 1)[:, None]
+    detective = (seats == 2)[:, None]
+    healer = (seats == 3)[:, None]
+
+    outcome = np.zeros(games, dtype=np.int8)
+    rounds = np.zeros(games, dtype=np.int32)
+    # Original index of the games still being played
+    playing = np.arange(games)
+    alive = np.ones((n, games), dtype=bool)
+    known = np.zeros((n, games), dtype=np.int8)
+
+    # Every round removes at least the voted player, so n rounds suffice
+    for round_no in range(1, n + 1):
+        if not len(playing):
+            break
+        columns = np.arange(len(playing))
+
+        # Night: kill, heal and check are chosen before anyone dies
+        kill = _pick(rng, alive & ~mafia)
+        heal = np.where((alive & healer).any(axis=0), _pick(rng, alive), -1)
+        check = np.where(
+            (alive & detective).any(axis=0),
+            _pick(rng, alive & ~detective & (known == UNKNOWN)),
+            -1,
+        )
+        checked = np.flatnonzero(check >= 0)
+        known[check[checked], checked] = np.where(
+            mafia[check[checked], 0], EXPOSED, CLEARED
+        )
+        _set(alive, np.where(kill != heal, kill, -1), False)
+
+        # Day: every living player votes for another living player
+        votes = _vote(rng, alive)
+        if policy.trust:
+            follow = (
+                rng.random(alive.shape, dtype=np.float32) < policy.trust
+            ) & ~mafia
+            # Findings only reach the town while a detective lives
+            informed = (alive & detective).any(axis=0)
+            trusted = _vote(rng, alive & ~((known == CLEARED) & informed))
+            votes = np.where(follow & (trusted >= 0), trusted, votes)
+            lead = _pick(rng, alive & (known == EXPOSED) & informed)
+            votes = np.where(follow & (lead >= 0), lead, votes)
+        if policy.mafia_bloc:
+            bloc = _pick(rng, alive & ~mafia)
+            votes = np.where(mafia & (bloc >= 0), bloc, votes)
+
+        voting = alive & (votes >= 0)
+        tally = np.bincount(
+            (votes * len(columns) + columns)[voting],
+            minlength=n * len(columns),
+        ).reshape(n, len(columns))
+        # Ties go to a random one of the leaders, as names are random
+        leaders = (tally == tally.max(axis=0)) & (tally > 0)
+        _set(alive, _pick(rng, leaders), False)
+
+        mafia_alive = (alive & mafia).sum(axis=0)
+        town_alive = (alive & ~mafia).sum(axis=0)
+        result = np.where(
+            mafia_alive == 0,
+            TOWN,
+            np.where(mafia_alive >= town_alive, MAFIA, ONGOING),
+        )
+        done = result != ONGOING
+        outcome[playing[done]] = result[done]
+        rounds[playing[done]] = round_no
+        playing, alive, known = (
+            playing[~done],
+            alive[:, ~done],
+            known[:, ~done],
+        )
+    return outcome, rounds
+
+
+def seating(counts: dict[Role, int]) -> np.ndarray:
+    """Seat codes (1 mafia, 2 detective, 3 healer, 0 villager) per seat.
+
+    Where a role sits doesn't matter: policies never look at seats.
+    """
+    return np.repeat(
+        np.array([1, 2, 3, 0], dtype=np.int8),
+        [
+            counts.get(Role.MAFIA, 0),
+            counts.get(Role.DETECTIVE, 0),
+            counts.get(Role.HEALER, 0),
+            counts.get(Role.VILLAGER, 0),
+        ],
+    )
+
+
+def simulate(
+    lobby_size: int,
+    roles: RoleDistribution,
+    policy: Policy,
+    games: int = 100_000,
+    seed: int | None = None,
+) -> SimResult:
+    """Simulate ``games`` games of ``lobby_size`` players.
+
+    Args:
+        lobby_size: Players per game
+        roles: How roles are dealt
+        policy: How the scripted players choose
+        games: Number of games
+        seed: Seed of the random generator
+
+    Returns:
+        Win counts and the distribution of game lengths
+
+    Raises:
+        ValueError: If the lobby can't be dealt a playable game
+    """
+    start = time.perf_counter()
+    seats = seating(roles.resolve(lobby_size))
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_CELLS // lobby_size)
+    outcome_counts = np.zeros(3, dtype=np.int64)
+    lengths = np.zeros(lobby_size + 1, dtype=np.int64)
+    for offset in range(0, games, batch):
+        outcome, rounds = _play(rng, seats, policy, min(batch, games - offset))
+        outcome_counts += np.bincount(outcome, minlength=3)
+        lengths += np.bincount(rounds, minlength=lobby_size + 1)
+    return SimResult(
+        games=games,
+        town_wins=int(outcome_counts[TOWN]),
+        mafia_wins=int(outcome_counts[MAFIA]),
+        lengths=lengths,
+        seconds=time.perf_counter() - start,
+    )
@@ -0,0 +1,121 @@
+"""Event sinks: terminal, JSONL transcript and a local spectator feed."""
+
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from game.events import GameEvent
+
+
+def terminal_sink(event: GameEvent) -> None:
+    print(event.message)
+
+
+class JsonlSink:
+    """Append every event as one JSON object per line."""
+
+    def __init__(self, path: str | Path, flush_every: int = 32) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._flush_every = flush_every
+        self._pending = 0
+
+    def __call__(self, event: GameEvent) -> None:
+        self._file.write(json.dumps(event.to_dict()) + "\n")
+        self._pending += 1
+        if self._pending >= self._flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._pending = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SpectatorFeed:
+    """Server-sent events feed on localhost for live spectators.
+
+    Each connected client gets its own bounded queue; a client that can't
+    keep up loses events instead of holding the others back. Open
+    ``http://<host>:<port>/events`` with any SSE client (e.g. ``curl -N``
+    or the browser ``EventSource``).
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 8765, maxsize: int = 256
+    ) -> None:
+        self._clients: set[queue.Queue] = set()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.server.serve_forever,
+            name="spectator-feed",
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self.server.server_address[:2]
+        return str(host), int(port)
+
+    def __call__(self, event: GameEvent) -> None:
+        payload = json.dumps(event.to_dict())
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait(payload)
+            except queue.Full:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients:
+                try:
+                    client.put_nowait(None)
+                except queue.Full:
+                    pass
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/events":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                client: queue.Queue = queue.Queue(maxsize=feed._maxsize)
+                with feed._lock:
+                    feed._clients.add(client)
+                try:
+                    while True:
+                        payload = client.get()
+                        if payload is None:
+                            return
+                        self.wfile.write(f"data: {payload}\n\n".encode())
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                finally:
+                    with feed._lock:
+                        feed._clients.discard(client)
+
+            def log_message(self, format, *args) -> None:
+                # Keep the terminal for the game itself
+                return
+
+        return Handler
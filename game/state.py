@@ -0,0 +1,120 @@
+"""Indexed game state shared by the game loop and its helpers."""
+
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING, NamedTuple
+
+from game.types import Role
+
+if TYPE_CHECKING:
+    from agents.player import PlayerAgent
+
+
+class GameSnapshot(NamedTuple):
+    """Immutable view of who is alive and with which role."""
+
+    version: int
+    alive: tuple[str, ...]
+    roles: Mapping[str, Role | None]
+
+    def with_role(self, role: Role) -> tuple[str, ...]:
+        return tuple(name for name in self.alive if self.roles[name] == role)
+
+
+class GameState:
+    """Players of one game indexed by name and by role.
+
+    Alive players are kept in insertion-ordered dicts so seating order is
+    preserved while lookups and removals stay O(1).
+    """
+
+    __slots__ = (
+        "players",
+        "version",
+        "_by_name",
+        "_alive",
+        "_by_role",
+        "_snapshot",
+    )
+
+    def __init__(self, players: list["PlayerAgent"]) -> None:
+        self.players = players
+        self.version = 0
+        self._by_name: dict[str, PlayerAgent] = {}
+        self._alive: dict[str, PlayerAgent] = {}
+        self._by_role: dict[Role | None, dict[str, PlayerAgent]] = {}
+        self._snapshot: GameSnapshot | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Bring every player back to life, keeping their roles."""
+        self._by_name = {p.name: p for p in self.players}
+        if len(self._by_name) != len(self.players):
+            raise ValueError("Player names must be unique")
+        self._alive = dict(self._by_name)
+        self._by_role = {}
+        for player in self.players:
+            self._by_role.setdefault(player.role, {})[player.name] = player
+        self._touch()
+
+    def assign(self, player: "PlayerAgent", role: Role) -> None:
+        """Give ``player`` a role and move it to the matching index."""
+        self._by_role.get(player.role, {}).pop(player.name, None)
+        player.role = role
+        if player.name in self._alive:
+            self._by_role.setdefault(role, {})[player.name] = player
+        self._touch()
+
+    def get(self, name: str) -> "PlayerAgent | None":
+        """Return the alive player called ``name``, if any."""
+        return self._alive.get(name)
+
+    def is_alive(self, name: str) -> bool:
+        return name in self._alive
+
+    def alive(self) -> Iterator["PlayerAgent"]:
+        """Iterate alive players in seating order."""
+        return iter(self._alive.values())
+
+    def alive_names(self) -> list[str]:
+        return list(self._alive)
+
+    def with_role(self, role: Role) -> list["PlayerAgent"]:
+        return list(self._by_role.get(role, {}).values())
+
+    def count(self, role: Role) -> int:
+        return len(self._by_role.get(role, ()))
+
+    def town_count(self) -> int:
+        return len(self._alive) - self.count(Role.MAFIA)
+
+    def kill(self, name: str) -> "PlayerAgent | None":
+        """Remove ``name`` from the alive set.
+
+        Returns:
+            The removed player, or None if nobody alive had that name
+        """
+        player = self._alive.pop(name, None)
+        if player is not None:
+            self._by_role[player.role].pop(name, None)
+            self._touch()
+        return player
+
+    def snapshot(self) -> GameSnapshot:
+        """Return an immutable view, reused until the state changes."""
+        if self._snapshot is None:
+            self._snapshot = GameSnapshot(
+                version=self.version,
+                alive=tuple(self._alive),
+                roles=MappingProxyType(
+                    {name: p.role for name, p in self._alive.items()}
+                ),
+            )
+        return self._snapshot
+
+    def __len__(self) -> int:
+        return len(self._alive)
+
+    def _touch(self) -> None:
+        self.version += 1
+        self._snapshot = None
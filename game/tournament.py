@@ -0,0 +1,430 @@
+"""Tournaments: many games with rotated lobbies and roles.
+
+The schedule is derived from the tournament seed alone, so a resumed
+tournament replays the same fixtures and skips the ones already in the
+``ResultStore``. Ratings are Elo per (personality, role): each side's
+strength is the mean rating of its members in the roles they played,
+and every member moves by the same amount after a game.
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any
+
+from agents.cache import ResponseCache
+from game.archive import GameArchive
+from game.results import GameRecord, Rating, ResultStore
+from game.roles import SPECIAL_ROLES, RoleDistribution
+from game.setup import DEFAULT_GOD, model_config, without_secrets
+from game.types import Role
+from utils.personalities import Personality, PersonalityRegistry
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+
+
+@dataclass(frozen=True)
+class Fixture:
+    """One scheduled game.
+
+    Attributes:
+        game_no: Index in the schedule
+        seed: Seed of the game's random choices
+        seats: (player, role) per seat
+    """
+
+    game_no: int
+    seed: int
+    seats: tuple[tuple[str, Role], ...]
+
+    @property
+    def roles(self) -> dict[str, Role]:
+        return dict(self.seats)
+
+
+def schedule(
+    names: list[str],
+    lobby_size: int,
+    games: int,
+    roles: RoleDistribution,
+    seed: int = 0,
+) -> list[Fixture]:
+    """Balanced fixtures for ``games`` games.
+
+    Each lobby is filled with whoever has played least, preferring
+    players who met the lobby least often. Roles go to whoever has played
+    that role least. Ties are broken by the seeded generator.
+
+    Raises:
+        ValueError: If the pool is smaller than a lobby or the lobby can't
+            be dealt
+    """
+    if len(set(names)) < lobby_size:
+        raise ValueError(
+            f"{len(set(names))} personalities can't fill a lobby of "
+            f"{lobby_size}"
+        )
+    counts = roles.resolve(lobby_size)
+    rng = random.Random(seed)
+    played: Counter[str] = Counter()
+    met: Counter[frozenset[str]] = Counter()
+    dealt: Counter[tuple[str, Role]] = Counter()
+
+    fixtures = []
+    for game_no in range(games):
+        pool = sorted(set(names))
+        rng.shuffle(pool)
+        lobby: list[str] = []
+        while len(lobby) < lobby_size:
+            pick = min(
+                (n for n in pool if n not in lobby),
+                key=lambda n: (
+                    played[n],
+                    sum(met[frozenset((n, m))] for m in lobby),
+                ),
+            )
+            lobby.append(pick)
+
+        seats: dict[str, Role] = {}
+        for role in SPECIAL_ROLES:
+            for _ in range(counts[role]):
+                free = [n for n in lobby if n not in seats]
+                rng.shuffle(free)
+                seats[min(free, key=lambda n: dealt[n, role])] = role
+        for name in lobby:
+            seats.setdefault(name, Role.VILLAGER)
+
+        played.update(lobby)
+        met.update(frozenset(pair) for pair in combinations(lobby, 2))
+        dealt.update(seats.items())
+        fixtures.append(
+            Fixture(
+                game_no=game_no,
+                seed=rng.getrandbits(32),
+                seats=tuple((n, seats[n]) for n in lobby),
+            )
+        )
+    return fixtures
+
+
+def rate(
+    game: GameRecord,
+    ratings: dict[tuple[str, Role], Rating],
+    k: float = K_FACTOR,
+) -> dict[tuple[str, Role], Rating]:
+    """Elo update of the ratings of everyone who played ``game``.
+
+    Args:
+        game: The finished game
+        ratings: Current ratings; missing ones start at the initial rating
+        k: Largest possible rating change
+
+    Returns:
+        The new ratings of the game's (player, role) pairs
+    """
+    current = {
+        (player, role): ratings.get((player, role), Rating(INITIAL_RATING))
+        for player, role, _ in game.seats
+    }
+    sides: dict[bool, list[tuple[str, Role]]] = {True: [], False: []}
+    for key in current:
+        sides[key[1] == Role.MAFIA].append(key)
+    strength = {
+        side: sum(current[key].rating for key in keys) / len(keys)
+        for side, keys in sides.items()
+        if keys
+    }
+
+    updated = {}
+    for side, keys in sides.items():
+        expected = 1 / (
+            1 + 10 ** ((strength[not side] - strength[side]) / 400)
+        )
+        won = game.won(Role.MAFIA if side else Role.VILLAGER)
+        score = 0.5 if won is None else float(won)
+        for key in keys:
+            old = current[key]
+            updated[key] = Rating(
+                rating=old.rating + k * (score - expected),
+                games=old.games + 1,
+                wins=old.wins + bool(won),
+            )
+    return updated
+
+
+def play_fixture(
+    fixture: Fixture,
+    registry: dict[str, Personality],
+    god: Personality,
+    config: dict[str, Any],
+    roles: RoleDistribution,
+    max_rounds: int | None = None,
+    archive: tuple[GameArchive, str] | None = None,
+    cache: ResponseCache | None = None,
+) -> GameRecord:
+    """Play one fixture with its own router, so token usage is per game.
+
+    The game's seating and fallback votes are drawn from a generator
+    seeded with the fixture's seed, which the schedule derives from the
+    tournament seed, and so are fake-backend tiers. A replayed fixture
+    on the fake backend without a shared ``cache`` plays the same game;
+    real models answer as they like.
+
+    Args:
+        fixture: The game to play
+        registry: Personality per player name
+        god: The god's personality
+        config: Model config, see ``ModelRouter.from_config``
+        roles: The tournament's role distribution the fixture was dealt
+            from
+        max_rounds: Stop the game after this many rounds
+        archive: Archive and tournament name to archive the game as
+            ``<name>/<game_no>``
+        cache: Response cache shared by the games
+    """
+    from agents.god import GodAgent
+    from agents.player import PlayerAgent
+    from agents.routing import ModelRouter
+    from game.archive import ArchiveRecorder
+    from game.events import EventBus
+    from game.mafia_game import MafiaGame
+
+    backend = config.get("backend")
+    tiers = {
+        name: {"seed": fixture.seed, **spec}
+        if spec.get("backend", backend) == "fake"
+        else spec
+        for name, spec in config["tiers"].items()
+    }
+    router = ModelRouter.from_config({**config, "tiers": tiers}, cache=cache)
+    players = [
+        PlayerAgent(
+            name=name, system_prompt=registry[name].prompt, router=router
+        )
+        for name, _ in fixture.seats
+    ]
+    events = EventBus()
+    if archive is not None:
+        store, name = archive
+        game_id = f"{name}/{fixture.game_no}"
+        # A game interrupted after archiving but before its result was
+        # recorded is played again; keep the first archived copy
+        if game_id not in store:
+            events.subscribe(
+                "archive", ArchiveRecorder(store, game_id), block=True
+            )
+    game = MafiaGame(
+        GodAgent(
+            llm=None, name=god.name, system_prompt=god.prompt, router=router
+        ),
+        players,
+        events=events,
+        quiet=True,
+        roles=roles,
+        rng=random.Random(fixture.seed),
+    )
+    start = time.perf_counter()
+    try:
+        result = game.match_start(max_rounds=max_rounds, roles=fixture.roles)
+    finally:
+        events.close()
+    seconds = time.perf_counter() - start
+    return GameRecord(
+        game_no=fixture.game_no,
+        winner=result.winner.value if result.winner else None,
+        rounds=result.rounds,
+        seconds=seconds,
+        input_tokens=sum(s.input_tokens for s in router.stats.values()),
+        output_tokens=sum(s.output_tokens for s in router.stats.values()),
+        seats=tuple(
+            (name, role, name in result.survivors)
+            for name, role in fixture.seats
+        ),
+    )
+
+
+def run_tournament(
+    store: ResultStore,
+    name: str,
+    fixtures: list[Fixture],
+    play: Callable[[Fixture], GameRecord],
+    parallel: int = 1,
+) -> Iterator[GameRecord]:
+    """Play the fixtures not yet in ``store``, recording each as it ends.
+
+    Ratings are updated in the order games finish. Games already in the
+    store are skipped, so calling this again after an interruption picks
+    up where the last run stopped.
+
+    Args:
+        store: Where results and ratings are kept
+        name: Tournament name in the store
+        fixtures: The full schedule
+        play: Plays one fixture
+        parallel: Games played at the same time
+
+    Yields:
+        Each newly recorded game
+    """
+    done = store.finished(name)
+    pending = [f for f in fixtures if f.game_no not in done]
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        futures = [pool.submit(play, f) for f in pending]
+        try:
+            for future in as_completed(futures):
+                game = future.result()
+                keys = [(player, role) for player, role, _ in game.seats]
+                store.record(name, game, rate(game, store.ratings(name, keys)))
+                yield game
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run or resume a tournament.
+
+    python -m game.tournament --name weekly --lobby 8 --games 40 --parallel 4
+    python -m game.tournament --name weekly --leaderboard
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--name", required=True, help="Tournament name")
+    parser.add_argument("--db", default="results/tournaments.sqlite")
+    parser.add_argument(
+        "--players",
+        default="",
+        help="Comma-separated personality pool, every one but the god "
+        "by default",
+    )
+    parser.add_argument("--god", default=DEFAULT_GOD)
+    parser.add_argument("--personalities", default="data/personalities.json")
+    parser.add_argument("--lobby", type=int, default=8)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--roles", default="")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=None)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--config", default=None)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument(
+        "--archive", default=None, help="SQLite game archive for transcripts"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Share god announcements and summaries across the games",
+    )
+    parser.add_argument("--cache-threshold", type=float, default=0.9)
+    parser.add_argument(
+        "--leaderboard",
+        action="store_true",
+        help="Print the standings without playing",
+    )
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.db)
+    try:
+        if not args.leaderboard:
+            play_all(store, args)
+        print_standings(store, args.name)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        store.close()
+
+
+def play_all(store: ResultStore, args: argparse.Namespace) -> None:
+    registry = PersonalityRegistry.load(args.personalities)
+    names = [n.strip() for n in args.players.split(",") if n.strip()] or [
+        n for n in registry.names if n != args.god
+    ]
+    pool, god = registry.lobby(names, args.god)
+    roles = (
+        RoleDistribution.from_spec(args.roles)
+        if args.roles
+        else RoleDistribution.default()
+    )
+    # Seeds come from the schedule, not the command line
+    models = model_config(argparse.Namespace(**{**vars(args), "seed": None}))
+    fixtures = schedule(
+        [p.name for p in pool], args.lobby, args.games, roles, args.seed
+    )
+    # Fixtures don't depend on how many follow them, so ``--games`` isn't
+    # part of the config and a finished tournament can be extended
+    resumed = store.open_tournament(
+        args.name,
+        {
+            "players": sorted(p.name for p in pool),
+            "god": god.name,
+            "lobby": args.lobby,
+            "roles": args.roles,
+            "seed": args.seed,
+            "rounds": args.rounds,
+            # Keys would end up in the results file
+            "models": without_secrets(models),
+        },
+    )
+    left = len(fixtures) - len(store.finished(args.name))
+    print(
+        f"{'Resuming' if resumed else 'Starting'} {args.name}: "
+        f"{left} of {len(fixtures)} games to play"
+    )
+    by_name = {p.name: p for p in pool}
+    archive = GameArchive(args.archive) if args.archive else None
+    cache = (
+        ResponseCache(threshold=args.cache_threshold) if args.cache else None
+    )
+    try:
+        for game in run_tournament(
+            store,
+            args.name,
+            fixtures,
+            lambda f: play_fixture(
+                f,
+                by_name,
+                god,
+                models,
+                roles,
+                args.rounds,
+                archive and (archive, args.name),
+                cache,
+            ),
+            args.parallel,
+        ):
+            print(
+                f"Game {game.game_no}: {game.winner or 'undecided'} after "
+                f"{game.rounds} rounds in {game.seconds:.1f}s, "
+                f"{game.input_tokens + game.output_tokens} tokens"
+            )
+    finally:
+        if archive is not None:
+            archive.close()
+    if cache is not None:
+        print(cache.report())
+
+
+def print_standings(store: ResultStore, name: str) -> None:
+    totals = store.totals(name)
+    print(
+        f"{name}: {totals['games']} games, town {totals['town']}, "
+        f"mafia {totals['mafia']}, "
+        f"{totals['input'] + totals['output']} tokens"
+    )
+    print(f"{'player':<24}{'role':<11}{'rating':>8}{'games':>7}{'wins':>6}")
+    for player, role, r in store.leaderboard(name):
+        print(
+            f"{player:<24}{role.value:<11}{r.rating:>8.1f}{r.games:>7}"
+            f"{r.wins:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
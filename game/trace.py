@@ -0,0 +1,151 @@
+"""Span traces of a game, one JSON object per line.
+
+A trace is a tree of spans with start and end times relative to the
+start of the trace:
+
+- ``game``: one ``match_start``
+- ``round`` and ``phase``: the game loop's rounds and phases
+- ``task``: a unit of work run for the game loop, e.g. one player's
+  turn with its retries, or a round summary in the background. Tasks
+  handed to a thread pool record when they were ``submitted``; tasks
+  that were started together from the same transcript share a ``batch``.
+- ``request``: one model request made through ``ModelRouter.track``,
+  with its call kind, tier and token usage
+- ``wait``: the game loop blocking on background work, ``waits_on``
+  names the task span it waited for
+
+Spans are written when they end, so children come before their parents.
+``game.critical_path`` analyzes the result.
+"""
+
+import itertools
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+_local = threading.local()
+
+
+@dataclass(slots=True)
+class Span:
+    id: int
+    parent: int | None
+    name: str
+    kind: str
+    start: float | None = None
+    end: float | None = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """Writes the spans of one game to a JSONL file.
+
+    Several tracers may append to the same file; each line carries the
+    tracer's ``game_id``.
+    """
+
+    def __init__(self, path: str | Path, game_id: str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.game_id = game_id
+        self._file = self.path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._origin = time.perf_counter()
+
+    def now(self) -> float:
+        """Seconds since the trace started."""
+        return time.perf_counter() - self._origin
+
+    def new(
+        self, name: str, kind: str, parent: Span | None = None, **attrs: Any
+    ) -> Span:
+        """Create a span that hasn't started yet.
+
+        ``parent`` defaults to the span this thread is running in.
+        """
+        if parent is None:
+            parent = current_span(self)
+        return Span(
+            id=next(self._ids),
+            parent=parent.id if parent else None,
+            name=name,
+            kind=kind,
+            attrs=attrs,
+        )
+
+    def begin(
+        self, name: str, kind: str, parent: Span | None = None, **attrs: Any
+    ) -> Span:
+        """Create and start a span; ``end`` it from any thread."""
+        span = self.new(name, kind, parent, **attrs)
+        span.start = self.now()
+        return span
+
+    def end(self, span: Span, **attrs: Any) -> None:
+        """End ``span`` and write it out."""
+        span.end = self.now()
+        if span.start is None:
+            span.start = span.end
+        span.attrs.update(attrs)
+        line = json.dumps(
+            {
+                "game": self.game_id,
+                "id": span.id,
+                "parent": span.parent,
+                "name": span.name,
+                "kind": span.kind,
+                "start": round(span.start, 6),
+                "end": round(span.end, 6),
+                "thread": threading.current_thread().name,
+                **span.attrs,
+            }
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+
+    @contextmanager
+    def running(self, span: Span) -> Iterator[Span]:
+        """Run ``span`` on this thread: spans begun inside nest under it.
+
+        The span starts now unless it already has.
+        """
+        if span.start is None:
+            span.start = self.now()
+        stack = _stack()
+        stack.append((self, span))
+        try:
+            yield span
+        finally:
+            stack.pop()
+            self.end(span)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _stack() -> list[tuple[Tracer, Span]]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current() -> tuple[Tracer, Span] | None:
+    """The tracer and span this thread is running in, if any."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def current_span(tracer: Tracer) -> Span | None:
+    """The innermost span of ``tracer`` running on this thread."""
+    for owner, span in reversed(getattr(_local, "stack", ())):
+        if owner is tracer:
+            return span
+    return None
@@ -0,0 +1,573 @@
+"""Work queue for playing games on several machines at once.
+
+Game specs (lobby, god, roles, seed and model config) are submitted to a
+jobs table in a shared SQLite file. Workers claim one job at a time
+under a lease that a background thread renews; a worker that crashes or
+loses its network stops renewing, and once the lease expires the next
+worker to ask claims the job again. Every finished step of a round is
+saved with the job as a ``Checkpoint``, so a reclaimed game resumes
+after the last step instead of starting over.
+
+Every write made for a job is fenced by the worker and the attempt it
+claimed, so a worker that was presumed dead and comes back can neither
+overwrite a newer checkpoint nor record a result; it gives the game up
+at its next checkpoint.
+
+    python -m game.workqueue submit --db /shared/queue.sqlite --games 50
+    python -m game.workqueue worker --db /shared/queue.sqlite
+    python -m game.workqueue status --db /shared/queue.sqlite
+
+The file has to live on storage whose POSIX locks work across machines
+(a local disk for workers on one box, NFSv4 or SMB otherwise). The queue
+keeps SQLite's rollback journal since WAL needs shared memory that
+network file systems don't provide. Leases compare wall clocks of
+different machines, so keep them well above the expected clock skew.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from game.checkpoint import Checkpoint
+from game.setup import DEFAULT_GOD, DEFAULT_PLAYERS, check_setup
+
+# Claims of a job before a crash or an error fails it for good
+MAX_ATTEMPTS = 3
+LEASE_SECONDS = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    spec TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    checkpoint TEXT,
+    result TEXT,
+    error TEXT,
+    submitted REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs(status, lease_until);
+"""
+
+
+class LeaseLost(Exception):
+    """The job was claimed by another worker after this one's lease."""
+
+
+@dataclass(frozen=True)
+class Job:
+    """A job claimed by a worker.
+
+    Attributes:
+        id: Job id
+        spec: The game to play, see ``play_job``
+        worker: Worker holding the lease
+        attempt: How many times the job has been claimed, this one
+            included
+        checkpoint: Last checkpoint saved by an earlier attempt
+    """
+
+    id: int
+    spec: dict[str, Any]
+    worker: str
+    attempt: int
+    checkpoint: Checkpoint | None
+
+
+class WorkQueue:
+    """Jobs table in an SQLite file shared by every worker."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        lease: float = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> None:
+        """Open the queue, creating it if needed.
+
+        Args:
+            path: SQLite file
+            lease: Seconds a claim lasts without a heartbeat
+            max_attempts: Claims of a job before it fails for good
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit, so claims can take the write lock up front
+        self._conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self.lease = lease
+        self.max_attempts = max_attempts
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def submit(self, specs: list[dict[str, Any]]) -> list[int]:
+        """Queue one job per game spec.
+
+        Returns:
+            The new job ids
+        """
+        now = time.time()
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for spec in specs:
+                    cursor = self._conn.execute(
+                        "INSERT INTO jobs (spec, submitted) VALUES (?, ?)",
+                        (json.dumps(spec), now),
+                    )
+                    ids.append(cursor.lastrowid)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def claim(self, worker: str) -> Job | None:
+        """Take the oldest queued job, or one whose lease has expired.
+
+        A job whose lease expired ``max_attempts`` times is marked failed
+        instead of being handed out again.
+
+        Returns:
+            The claimed job, None if there's nothing to do
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                job = self._claim(worker, time.time())
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def _claim(self, worker: str, now: float) -> Job | None:
+        while True:
+            row = self._conn.execute(
+                "SELECT id, spec, attempts, checkpoint, worker FROM jobs "
+                "WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, spec, attempts, checkpoint, previous = row
+            if attempts >= self.max_attempts:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, "
+                    "finished = ? WHERE id = ?",
+                    (f"Lease of {previous} expired", now, job_id),
+                )
+                continue
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, "
+                "attempts = ?, lease_until = ? WHERE id = ?",
+                (worker, attempts + 1, now + self.lease, job_id),
+            )
+            return Job(
+                id=job_id,
+                spec=json.loads(spec),
+                worker=worker,
+                attempt=attempts + 1,
+                checkpoint=Checkpoint.from_dict(json.loads(checkpoint))
+                if checkpoint
+                else None,
+            )
+
+    def _update(self, job: Job, assignments: str, *params: Any) -> bool:
+        """Update ``job``'s row if this claim still holds it."""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? "
+                "AND worker = ? AND attempts = ? AND status = 'running'",
+                (*params, job.id, job.worker, job.attempt),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job: Job) -> bool:
+        """Extend the lease on ``job``.
+
+        Returns:
+            False if the job was reclaimed by another worker
+        """
+        return self._update(job, "lease_until = ?", time.time() + self.lease)
+
+    def save_checkpoint(self, job: Job, checkpoint: Checkpoint) -> None:
+        """Save ``job``'s progress, extending its lease.
+
+        Raises:
+            LeaseLost: If the job was reclaimed by another worker
+        """
+        if not self._update(
+            job,
+            "checkpoint = ?, lease_until = ?",
+            json.dumps(checkpoint.to_dict()),
+            time.time() + self.lease,
+        ):
+            raise LeaseLost(f"Job {job.id} was reclaimed")
+
+    def complete(self, job: Job, result: dict[str, Any]) -> None:
+        """Record ``job``'s result.
+
+        Raises:
+            LeaseLost: If the job was reclaimed by another worker
+        """
+        if not self._update(
+            job,
+            "status = 'done', result = ?, finished = ?, lease_until = NULL",
+            json.dumps(result),
+            time.time(),
+        ):
+            raise LeaseLost(f"Job {job.id} was reclaimed")
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Give ``job`` back after an error, keeping its checkpoint.
+
+        Returns:
+            True if the job was queued again, False if it ran out of
+            attempts (or had already been reclaimed)
+        """
+        if job.attempt < self.max_attempts:
+            return self._update(
+                job,
+                "status = 'queued', worker = NULL, lease_until = NULL, "
+                "error = ?",
+                error,
+            )
+        self._update(
+            job,
+            "status = 'failed', error = ?, finished = ?",
+            error,
+            time.time(),
+        )
+        return False
+
+    def unfinished(self) -> int:
+        """Jobs that are queued or running."""
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs "
+                "WHERE status IN ('queued', 'running')"
+            ).fetchone()
+        return count
+
+    def jobs(self) -> list[dict[str, Any]]:
+        """Every job with its status, progress and result."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, status, attempts, worker, lease_until, "
+                "json_extract(checkpoint, '$.round_no'), "
+                "json_extract(checkpoint, '$.step'), result, error "
+                "FROM jobs ORDER BY id"
+            ).fetchall()
+        keys = (
+            "id",
+            "status",
+            "attempts",
+            "worker",
+            "lease_until",
+            "round_no",
+            "step",
+            "result",
+            "error",
+        )
+        jobs = [dict(zip(keys, row, strict=True)) for row in rows]
+        for job in jobs:
+            if job["result"] is not None:
+                job["result"] = json.loads(job["result"])
+        return jobs
+
+
+def play_job(
+    spec: dict[str, Any],
+    resume: Checkpoint | None = None,
+    checkpoint: Callable[[Checkpoint], None] | None = None,
+) -> dict[str, Any]:
+    """Play the game described by a job spec.
+
+    Args:
+        spec: ``players`` (names in seating order), ``god``,
+            ``personalities`` (registry path), ``roles`` (role spec, the
+            default distribution if empty), ``seed``, ``rounds`` (limit
+            or None) and ``models`` (model config). Fake-backend tiers
+            are seeded with ``seed``.
+        resume: Checkpoint of an earlier attempt to carry on from
+        checkpoint: Checkpoint sink, see ``MafiaGame``
+
+    Returns:
+        Winner, rounds, roles, survivors, wall time and token usage
+    """
+    from agents.god import GodAgent
+    from agents.player import PlayerAgent
+    from agents.routing import ModelRouter
+    from game.events import EventBus
+    from game.mafia_game import MafiaGame
+    from game.roles import RoleDistribution
+    from utils.personalities import PersonalityRegistry
+
+    registry = PersonalityRegistry.load(spec["personalities"])
+    personalities, god = registry.lobby(spec["players"], spec["god"])
+    config = spec["models"]
+    backend = config.get("backend")
+    tiers = {
+        name: {"seed": spec["seed"], **tier}
+        if tier.get("backend", backend) == "fake"
+        else tier
+        for name, tier in config["tiers"].items()
+    }
+    router = ModelRouter.from_config({**config, "tiers": tiers})
+    events = EventBus()
+    game = MafiaGame(
+        # Nobody is at a worker's terminal to give the god instructions
+        GodAgent(
+            llm=None,
+            name=god.name,
+            system_prompt=god.prompt,
+            router=router,
+            interactive=False,
+        ),
+        [
+            PlayerAgent(name=p.name, system_prompt=p.prompt, router=router)
+            for p in personalities
+        ],
+        events=events,
+        quiet=True,
+        roles=RoleDistribution.from_spec(spec["roles"])
+        if spec["roles"]
+        else None,
+        checkpoint=checkpoint,
+        rng=random.Random(spec["seed"]),
+    )
+    start = time.perf_counter()
+    try:
+        result = game.match_start(max_rounds=spec["rounds"], resume=resume)
+    finally:
+        events.close()
+    return {
+        "winner": result.winner.value if result.winner else None,
+        "rounds": result.rounds,
+        "roles": {name: role.value for name, role in result.roles.items()},
+        "survivors": sorted(result.survivors),
+        "seconds": time.perf_counter() - start,
+        "input_tokens": sum(s.input_tokens for s in router.stats.values()),
+        "output_tokens": sum(s.output_tokens for s in router.stats.values()),
+        "resumed_after": [resume.round_no, resume.step] if resume else None,
+    }
+
+
+def run_job(queue: WorkQueue, job: Job) -> None:
+    """Play a claimed job, renewing its lease until it's recorded."""
+    stop = threading.Event()
+
+    def renew() -> None:
+        while not stop.wait(queue.lease / 3):
+            if not queue.heartbeat(job):
+                # The next checkpoint raises LeaseLost and ends the game
+                return
+
+    heartbeat = threading.Thread(target=renew, daemon=True)
+    heartbeat.start()
+    try:
+        result = play_job(
+            job.spec,
+            resume=job.checkpoint,
+            checkpoint=lambda c: queue.save_checkpoint(job, c),
+        )
+        queue.complete(job, result)
+    except LeaseLost as e:
+        print(f"Warning: {e}, giving the game up")
+        return
+    except BaseException as e:
+        # SystemExit and KeyboardInterrupt too, or the job would stay
+        # running until its lease expired
+        requeued = queue.fail(job, f"{type(e).__name__}: {e}")
+        print(
+            f"Warning: job {job.id} failed ({e!r}), "
+            f"{'queued again' if requeued else 'giving up'}"
+        )
+        if not isinstance(e, Exception):
+            raise
+        return
+    finally:
+        stop.set()
+        heartbeat.join()
+    print(
+        f"Job {job.id}: {result['winner'] or 'no winner'} after "
+        f"{result['rounds']} rounds in {result['seconds']:.1f}s"
+    )
+
+
+def work(
+    queue: WorkQueue,
+    worker: str,
+    poll: float = 5.0,
+    until_done: bool = False,
+) -> int:
+    """Claim and play jobs one at a time.
+
+    Args:
+        queue: The shared queue
+        worker: Name of this worker, unique across machines
+        poll: Seconds to wait when there is nothing to claim
+        until_done: Stop once no job is queued or running anywhere,
+            instead of waiting for new ones. Jobs running elsewhere keep
+            the worker around so it can take them over if they're lost.
+
+    Returns:
+        Number of jobs claimed
+    """
+    claimed = 0
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            if until_done and queue.unfinished() == 0:
+                return claimed
+            time.sleep(poll)
+            continue
+        claimed += 1
+        where = (
+            f", resuming after the {job.checkpoint.step} of round "
+            f"{job.checkpoint.round_no}"
+            if job.checkpoint
+            else ""
+        )
+        print(f"{worker} claimed job {job.id} (attempt {job.attempt}{where})")
+        run_job(queue, job)
+
+
+def submit(queue: WorkQueue, args: argparse.Namespace) -> list[int]:
+    """Queue ``args.games`` games with consecutive seeds."""
+    # Seeds are per game, not per tier
+    players, god, _, models = check_setup(
+        argparse.Namespace(**{**vars(args), "seed": None})
+    )
+    specs = [
+        {
+            "players": [p.name for p in players],
+            "god": god.name,
+            "personalities": str(Path(args.personalities).resolve()),
+            "roles": args.roles,
+            "seed": args.seed + i,
+            "rounds": args.rounds,
+            "models": models,
+        }
+        for i in range(args.games)
+    ]
+    return queue.submit(specs)
+
+
+def print_status(queue: WorkQueue) -> None:
+    jobs = queue.jobs()
+    now = time.time()
+    counts = Counter(job["status"] for job in jobs)
+    print(", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    for job in jobs:
+        if job["status"] != "running":
+            continue
+        left = job["lease_until"] - now
+        lease = f"lease {left:.0f}s" if left > 0 else "lease expired"
+        progress = (
+            f"after the {job['step']} of round {job['round_no']}"
+            if job["step"]
+            else "starting"
+        )
+        print(
+            f"  job {job['id']}: {job['worker']}, attempt "
+            f"{job['attempts']}, {progress}, {lease}"
+        )
+    winners = Counter(
+        job["result"]["winner"] or "none"
+        for job in jobs
+        if job["status"] == "done"
+    )
+    if winners:
+        print(
+            "Winners: "
+            + ", ".join(f"{w} {n}" for w, n in winners.most_common())
+        )
+    for job in jobs:
+        if job["status"] == "failed":
+            print(f"  job {job['id']} failed: {job['error']}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--db", default="results/queue.sqlite")
+    parser.add_argument(
+        "--lease", type=float, default=LEASE_SECONDS, help="Seconds"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="Queue games")
+    submit_parser.add_argument("--players", default=",".join(DEFAULT_PLAYERS))
+    submit_parser.add_argument("--god", default=DEFAULT_GOD)
+    submit_parser.add_argument(
+        "--personalities", default="data/personalities.json"
+    )
+    submit_parser.add_argument("--roles", default="")
+    submit_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the first game"
+    )
+    submit_parser.add_argument("--games", type=int, default=1)
+    submit_parser.add_argument("--rounds", type=int, default=None)
+    submit_parser.add_argument("--backend", default=None)
+    submit_parser.add_argument("--config", default=None)
+
+    worker_parser = commands.add_parser("worker", help="Play queued games")
+    worker_parser.add_argument(
+        "--name",
+        default=f"{socket.gethostname()}:{os.getpid()}",
+        help="Worker name, unique across machines",
+    )
+    worker_parser.add_argument("--poll", type=float, default=5.0)
+    worker_parser.add_argument(
+        "--until-done",
+        action="store_true",
+        help="Exit once no game is queued or running",
+    )
+
+    commands.add_parser("status", help="Show the queue")
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(args.db, lease=args.lease)
+    try:
+        if args.command == "submit":
+            try:
+                ids = submit(queue, args)
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(2)
+            print(f"Queued jobs {ids[0]}-{ids[-1]}" if ids else "Nothing")
+        elif args.command == "worker":
+            work(queue, args.name, poll=args.poll, until_done=args.until_done)
+        else:
+            print_status(queue)
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
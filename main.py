@@ -1,63 +1,223 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-
-from agents.god import GodAgent
-from agents.player import PlayerAgent
-from game.mafia_game import MafiaGame
-from utils.json_loader import load_personalities
-
-
-def main():
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        temperature=1.0,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-        # other params...
-    )
-    personalities = load_personalities("data/personalities.json")
-
-    # Enter players who want to play here
-    active_players = [
-        "Joe Rogan",
-        "Elon Musk",
-        "Mahatma Gandhi",
-        "Andrew Tate",
-        "Diogenes",
-        "Chael Sonnen",
-        "Donald Trump",
-        "Tony Stark",
-        "Ultron",
-        "JARVIS",
-        "Lord Voldemort",
+"""Run a game of mafia between LLM personalities.
+
+    python main.py --god "Albus Dumbledore" --players "Diogenes,JARVIS,..."
+    python main.py --backend fake --seed 1 --rounds 2
+    python main.py --dry-run
+
+The config is validated before any model library is imported, and agents
+are only built for the chosen personalities.
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from typing import Any
+
+from agents.routing import parse_config
+from game.roles import RoleDistribution
+from game.setup import DEFAULT_GOD, DEFAULT_PLAYERS, check_setup
+from utils.personalities import Personality, PersonalityRegistry
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    lobby = parser.add_argument_group("lobby")
+    lobby.add_argument(
+        "--players",
+        default=",".join(DEFAULT_PLAYERS),
+        help="Comma-separated personality names",
+    )
+    lobby.add_argument("--god", default=DEFAULT_GOD)
+    lobby.add_argument("--personalities", default="data/personalities.json")
+    lobby.add_argument(
+        "--roles", default="", help='e.g. "mafia=2,healer=1,detective=1"'
+    )
+    lobby.add_argument("--seed", type=int, default=None)
+
+    models = parser.add_argument_group("models")
+    models.add_argument(
+        "--backend",
+        default=None,
+        help="Backend for every tier, e.g. gemini, openai or fake",
+    )
+    models.add_argument(
+        "--config", default=None, help="JSON file with model tiers"
+    )
+    models.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse god announcements of similar prompts and summaries "
+        "of identical rounds",
+    )
+    models.add_argument(
+        "--cache-threshold",
+        type=float,
+        default=0.9,
+        help="Lowest prompt similarity of a cache hit, 1.0 for exact",
+    )
+
+    mode = parser.add_argument_group("mode")
+    mode.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate the setup and print it without playing",
+    )
+    mode.add_argument(
+        "--list", action="store_true", help="List the personalities"
+    )
+    mode.add_argument(
+        "--rounds", type=int, default=None, help="Stop after this many"
+    )
+    mode.add_argument(
+        "--quiet", action="store_true", help="Don't print the game"
+    )
+    mode.add_argument("--events", default=None, help="Append events here")
+    mode.add_argument(
+        "--archive",
+        default=None,
+        help="SQLite game archive to add the finished game to",
+    )
+    mode.add_argument(
+        "--trace",
+        default=None,
+        help="Append span traces here, see python -m game.critical_path",
+    )
+    mode.add_argument(
+        "--spectate",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Serve the public event feed over SSE on this port",
+    )
+    return parser.parse_args(argv)
+
+
+def describe(
+    players: list[Personality],
+    god: Personality,
+    roles: RoleDistribution,
+    config: dict[str, Any],
+) -> str:
+    tiers, routes, default = parse_config(config)
+    counts = roles.resolve(len(players))
+    lines = [
+        f"God: {god.name}",
+        f"Players ({len(players)}): " + ", ".join(p.name for p in players),
+        "Roles: "
+        + ", ".join(f"{role.value}={n}" for role, n in counts.items()),
     ]
-    players = [
-        PlayerAgent(
-            name=p["name"],
-            system_prompt=p["prompt"],
-            llm=llm,
+    for name, tier in tiers.items():
+        kinds = [k.value for k, t in routes.items() if t == name]
+        if name == (default or next(iter(tiers))):
+            kinds.append("default")
+        lines.append(
+            f"Tier {name}: {tier.backend}/{tier.model} ({', '.join(kinds)})"
         )
-        for p in personalities
-        if p["name"] in active_players
-    ]
+    return "\n".join(lines)
 
-    # Enter your god here
-    whos_god = "Albus Dumbledore"
-    god_personality = next(
-        (p for p in personalities if p["name"] == whos_god), None
-    )
-    if not god_personality:
-        print("Oops! Got not found.")
-        exit(1)
 
+def play(
+    args: argparse.Namespace,
+    players: list[Personality],
+    god_personality: Personality,
+    roles: RoleDistribution,
+    config: dict[str, Any],
+) -> None:
+    # The model libraries take seconds to import, so only load them here
+    from agents.cache import ResponseCache
+    from agents.god import GodAgent
+    from agents.player import PlayerAgent
+    from agents.routing import ModelRouter
+    from game.archive import ArchiveRecorder, GameArchive
+    from game.events import EventBus
+    from game.mafia_game import MafiaGame
+    from game.sinks import JsonlSink, SpectatorFeed
+    from game.trace import Tracer
+
+    cache = (
+        ResponseCache(threshold=args.cache_threshold) if args.cache else None
+    )
+    router = ModelRouter.from_config(config, cache=cache)
     god = GodAgent(
-        llm=llm,
-        name=god_personality["name"],
-        system_prompt=god_personality["prompt"],
+        llm=None,
+        name=god_personality.name,
+        system_prompt=god_personality.prompt,
+        router=router,
+        interactive=True,
+    )
+    agents = [
+        PlayerAgent(name=p.name, system_prompt=p.prompt, router=router)
+        for p in players
+    ]
+
+    events = EventBus()
+    sinks: list[JsonlSink | SpectatorFeed] = []
+    if args.events:
+        sinks.append(JsonlSink(args.events))
+        events.subscribe("jsonl", sinks[-1])
+    # Not from ``random``: seeded runs would reuse the same ids
+    game_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    archive = GameArchive(args.archive) if args.archive else None
+    if archive is not None:
+        events.subscribe(
+            "archive", ArchiveRecorder(archive, game_id), block=True
+        )
+        print(f"Archiving as {game_id}")
+    tracer = Tracer(args.trace, game_id) if args.trace else None
+    if args.spectate is not None:
+        sinks.append(SpectatorFeed(port=args.spectate))
+        # Spectators only see what the town sees
+        events.subscribe("spectators", sinks[-1], roles=frozenset())
+        host, port = sinks[-1].address
+        print(f"Spectator feed on http://{host}:{port}/events")
+
+    game = MafiaGame(
+        god,
+        agents,
+        events=events,
+        quiet=args.quiet,
+        roles=roles,
+        tracer=tracer,
     )
+    try:
+        game.match_start(max_rounds=args.rounds)
+    finally:
+        events.close()
+        for sink in sinks:
+            sink.close()
+        if archive is not None:
+            archive.close()
+        if tracer is not None:
+            tracer.close()
+    print(router.report())
+    if cache is not None:
+        print(cache.report())
+
 
-    game = MafiaGame(god, players)
-    game.match_start()
+def main(argv: list[str] | None = None) -> None:
+    start = time.perf_counter()
+    args = parse_args(argv)
+    if args.list:
+        for p in PersonalityRegistry.load(args.personalities):
+            print(f"{p.fingerprint[:12]}  {p.name}")
+        return
+    try:
+        players, god, roles, config = check_setup(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    print(describe(players, god, roles, config))
+    if args.dry_run:
+        print(f"Setup OK in {time.perf_counter() - start:.3f}s")
+        return
+    if args.seed is not None:
+        random.seed(args.seed)
+    play(args, players, god, roles, config)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+import pytest
+
+from agents.cache import ResponseCache, normalize
+
+NAMES = ["Alice", "Bob", "Carol"]
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fail() -> str:
+    raise AssertionError("expected a cache hit")
+
+
+def test_normalize_numbers_names_in_order():
+    text, order = normalize("Bob  accused\nAlice, then Bob", NAMES)
+    assert text == "<P0> accused <P1>, then <P0>"
+    assert order == ["Bob", "Alice"]
+
+
+def test_exact_hit_fills_in_the_new_names():
+    cache = ResponseCache()
+    prompt = "{} was voted out by the town"
+    first = cache.get_or_call(
+        "elim", "god", prompt.format("Bob"), NAMES, lambda: "Farewell Bob"
+    )
+    again = cache.get_or_call(
+        "elim", "god", prompt.format("Alice"), NAMES, fail
+    )
+    assert (first, again) == ("Farewell Bob", "Farewell Alice")
+    stats = cache.stats["elim"]
+    assert (stats.hits, stats.fuzzy_hits, stats.misses) == (1, 0, 1)
+
+
+def test_fuzzy_hit_on_a_similar_prompt():
+    cache = ResponseCache(threshold=0.8)
+    cache.get_or_call(
+        "elim", "god", "Bob was voted out by the town", NAMES, lambda: "Bye"
+    )
+    response = cache.get_or_call(
+        "elim", "god", "Carol was voted out by the town!", NAMES, fail
+    )
+    assert response == "Bye"
+    assert cache.stats["elim"].fuzzy_hits == 1
+
+
+@pytest.mark.parametrize(("threshold", "fuzzy"), [(0.8, False), (1.0, True)])
+def test_exact_only_lookups_miss_similar_prompts(threshold, fuzzy):
+    cache = ResponseCache(threshold=threshold)
+    cache.get_or_call(
+        "sum", "god", "Bob was voted out by the town", NAMES, lambda: "A"
+    )
+    response = cache.get_or_call(
+        "sum",
+        "god",
+        "Bob was voted out by the town!",
+        NAMES,
+        lambda: "B",
+        fuzzy=fuzzy,
+    )
+    assert response == "B"
+    assert cache.stats["sum"].misses == 2
+
+
+def test_fuzzy_match_needs_as_many_names():
+    cache = ResponseCache(threshold=0.5)
+    cache.get_or_call(
+        "elim", "god", "Bob was voted out by the town", NAMES, lambda: "A"
+    )
+    response = cache.get_or_call(
+        "elim", "god", "Bob was voted out by Alice", NAMES, lambda: "B"
+    )
+    assert response == "B"
+
+
+def test_scopes_are_kept_apart():
+    cache = ResponseCache()
+    cache.get_or_call("elim", "calm", "Bob is out", NAMES, lambda: "A")
+    response = cache.get_or_call(
+        "elim", "grim", "Bob is out", NAMES, lambda: "B"
+    )
+    assert response == "B"
+
+
+def test_uncacheable_responses_are_not_stored():
+    cache = ResponseCache()
+    cache.get_or_call("elim", "god", "Bob is out", NAMES, lambda: "")
+    assert len(cache) == 0
+    cache.get_or_call(
+        "elim",
+        "god",
+        "Bob is out",
+        NAMES,
+        lambda: "X",
+        cacheable=lambda r: False,
+    )
+    assert len(cache) == 0
+
+
+def test_entries_expire():
+    clock = Clock()
+    cache = ResponseCache(ttl=10.0, clock=clock)
+    cache.get_or_call("elim", "god", "Bob is out", NAMES, lambda: "A")
+    clock.now = 9.0
+    assert cache.get_or_call("elim", "god", "Bob is out", NAMES, fail) == "A"
+    clock.now = 10.0
+    response = cache.get_or_call(
+        "elim", "god", "Bob is out", NAMES, lambda: "B"
+    )
+    assert response == "B"
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResponseCache(max_entries=2, threshold=1.0)
+    for prompt in ("one", "two"):
+        cache.get_or_call("k", "s", prompt, NAMES, lambda p=prompt: p)
+    # Touch "one" so "two" is the least recently used
+    cache.get_or_call("k", "s", "one", NAMES, fail)
+    cache.get_or_call("k", "s", "three", NAMES, lambda: "three")
+    assert len(cache) == 2
+    assert cache.get_or_call("k", "s", "one", NAMES, fail) == "one"
+    assert cache.get_or_call("k", "s", "two", NAMES, lambda: "new") == "new"
+
+
+def test_threshold_is_validated():
+    with pytest.raises(ValueError):
+        ResponseCache(threshold=1.5)
@@ -0,0 +1,152 @@
+import json
+import random
+from argparse import Namespace
+
+import pytest
+
+from agents.god import GodAgent
+from agents.player import PlayerAgent
+from agents.routing import ModelRouter
+from game.checkpoint import Checkpoint
+from game.mafia_game import MafiaGame
+from game.setup import DEFAULT_GOD, DEFAULT_PLAYERS, model_config
+from game.types import Role
+from utils.personalities import PersonalityRegistry
+
+LOBBY = list(DEFAULT_PLAYERS[:6])
+
+
+def make_game(players=LOBBY, checkpoints=None) -> MafiaGame:
+    personalities, god = PersonalityRegistry.load().lobby(players, DEFAULT_GOD)
+    router = ModelRouter.from_config(
+        model_config(Namespace(config=None, backend="fake", seed=7))
+    )
+    return MafiaGame(
+        GodAgent(
+            llm=None,
+            name=god.name,
+            system_prompt=god.prompt,
+            router=router,
+        ),
+        [
+            PlayerAgent(name=p.name, system_prompt=p.prompt, router=router)
+            for p in personalities
+        ],
+        quiet=True,
+        checkpoint=None if checkpoints is None else checkpoints.append,
+    )
+
+
+def snapshot(game: MafiaGame, step: str) -> Checkpoint:
+    taken = []
+    game.checkpoint = taken.append
+    game._take_checkpoint(step)
+    return taken[0]
+
+
+@pytest.fixture(scope="module")
+def played() -> list[Checkpoint]:
+    random.seed(3)
+    checkpoints: list[Checkpoint] = []
+    game = make_game(checkpoints=checkpoints)
+    game.match_start(max_rounds=2)
+    game.reset_match()
+    return checkpoints
+
+
+def sample() -> Checkpoint:
+    return Checkpoint(
+        round_no=2,
+        step="healer",
+        seating=["Ada", "Bo", "Cy"],
+        roles={"Ada": Role.MAFIA, "Bo": Role.HEALER, "Cy": Role.VILLAGER},
+        alive=["Ada", "Bo"],
+        memories={"Ada": ["[Bo]: hi"], "Bo": [], "Cy": []},
+        logs=["Cy was eliminated"],
+        night={"kill": "Bo", "heal": "Bo"},
+        announcement={
+            "victim": "Cy",
+            "stamp": [1, "day"],
+            "prompt": "Announce Cy",
+            "text": None,
+        },
+        summary="Round 1: Cy went out",
+        spoken={"Ada": 2, "Bo": 1},
+    )
+
+
+def test_json_round_trip():
+    checkpoint = sample()
+    data = json.loads(json.dumps(checkpoint.to_dict()))
+    assert Checkpoint.from_dict(data) == checkpoint
+
+
+@pytest.mark.parametrize(
+    ("step", "expected"),
+    [
+        ("mafia", (2, "healer")),
+        ("detective", (2, "day")),
+        ("day", (3, "mafia")),
+    ],
+)
+def test_next_step(step, expected):
+    data = {**sample().to_dict(), "step": step}
+    assert Checkpoint.from_dict(data).next_step == expected
+
+
+def test_unknown_step_is_rejected():
+    with pytest.raises(ValueError, match="Unknown step"):
+        Checkpoint.from_dict({**sample().to_dict(), "step": "dusk"})
+
+
+STEPS = [
+    (1, "mafia"),
+    (1, "healer"),
+    (1, "detective"),
+    (1, "day"),
+    (2, "mafia"),
+    (2, "healer"),
+    (2, "detective"),
+]
+
+
+def test_every_step_but_the_last_is_checkpointed(played):
+    steps = [(c.round_no, c.step) for c in played]
+    # The game may be won in the first day
+    assert len(steps) >= 3
+    assert steps == STEPS[: len(steps)]
+
+
+def test_restore_reproduces_the_checkpoint(played):
+    for checkpoint in played:
+        announcement = checkpoint.announcement
+        if announcement is not None and announcement["text"] is None:
+            # Restoring asks the god again, so the text may differ
+            continue
+        game = make_game(players=list(reversed(LOBBY)))
+        game.restore(checkpoint)
+        assert snapshot(game, checkpoint.step) == checkpoint
+        game.reset_match()
+
+
+def test_resume_plays_on_from_the_checkpoint(played):
+    checkpoint = played[-1]
+    checkpoints: list[Checkpoint] = []
+    game = make_game(checkpoints=checkpoints)
+    result = game.match_start(max_rounds=2, resume=checkpoint)
+    game.reset_match()
+
+    assert result.roles == checkpoint.roles
+    assert result.survivors <= set(checkpoint.alive)
+    after = STEPS[STEPS.index((checkpoint.round_no, checkpoint.step)) + 1 :]
+    assert [(c.round_no, c.step) for c in checkpoints] == after[
+        : len(checkpoints)
+    ]
+    for resumed in checkpoints:
+        assert resumed.logs[: len(checkpoint.logs)] == checkpoint.logs
+
+
+def test_restore_into_another_lobby_is_rejected(played):
+    game = make_game(players=list(DEFAULT_PLAYERS[1:7]))
+    with pytest.raises(ValueError, match="other players"):
+        game.restore(played[0])
@@ -0,0 +1,120 @@
+import json
+from collections import defaultdict
+
+import pytest
+
+from game.critical_path import analyze, critical_path, ideal_seconds, load
+
+# One round of a game lasting 10s. The night roles run one after another,
+# the day's two simultaneous turns overlap, and the announcement started
+# at the round's end is waited for by the next phase.
+SPANS = [
+    (1, None, "game", "game", 0.0, 10.0, {"rounds": 1}),
+    (2, 1, "round 1", "round", 0.0, 10.0, {}),
+    (3, 2, "mafia", "phase", 0.0, 3.0, {}),
+    (4, 3, "discuss", "task", 0.0, 3.0, {"agent": "Ada"}),
+    (5, 4, "main", "request", 0.5, 3.0, {"tier": "main"}),
+    (6, 2, "healer", "phase", 3.0, 4.0, {}),
+    (7, 6, "heal", "task", 3.0, 4.0, {"agent": "Bo"}),
+    (8, 2, "detective", "phase", 4.0, 5.0, {}),
+    (9, 8, "check", "task", 4.0, 5.0, {"agent": "Cy"}),
+    (10, 2, "day", "phase", 5.0, 8.0, {}),
+    (11, 10, "speak", "task", 5.0, 7.0, {"agent": "Ada", "batch": 1}),
+    (12, 10, "speak", "task", 5.0, 8.0, {"agent": "Bo", "batch": 1}),
+    (13, 2, "round_end", "phase", 8.0, 8.5, {}),
+    (14, 13, "announce", "task", 8.2, 9.5, {"phase": "round_end"}),
+    (15, 2, "final", "phase", 8.5, 10.0, {}),
+    (16, 15, "announcement", "wait", 8.5, 9.5, {"waits_on": 14}),
+]
+
+
+@pytest.fixture
+def game(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    records = [
+        {
+            "game": "g1",
+            "id": id_,
+            "parent": parent,
+            "name": name,
+            "kind": kind,
+            "start": start,
+            "end": end,
+            **attrs,
+        }
+        for id_, parent, name, kind, start, end, attrs in SPANS
+    ]
+    # A game that never ended is left out
+    records.append(
+        {
+            "game": "g2",
+            "id": 1,
+            "parent": None,
+            "name": "round 1",
+            "kind": "round",
+            "start": 0.0,
+            "end": 1.0,
+        }
+    )
+    path.write_text("\n".join(map(json.dumps, records)) + "\n\n")
+    (game,) = load(path)
+    return game
+
+
+def test_load_builds_the_span_tree(game):
+    assert game.game_id == "g1"
+    assert game.root.attrs == {"rounds": 1}
+    (round_span,) = game.root.children
+    assert [p.name for p in round_span.children] == [
+        "mafia",
+        "healer",
+        "detective",
+        "day",
+        "round_end",
+        "final",
+    ]
+
+
+def test_critical_path_covers_the_wall_time(game):
+    path = critical_path(game)
+    assert path[0].start == 0.0
+    assert path[-1].end == 10.0
+    for before, after in zip(path, path[1:], strict=False):
+        assert before.end == pytest.approx(after.start)
+
+    by_span: dict[int, float] = defaultdict(float)
+    for segment in path:
+        by_span[segment.stack[-1].id] += segment.seconds
+    assert by_span == pytest.approx(
+        {
+            4: 0.5,
+            5: 2.5,
+            7: 1.0,
+            9: 1.0,
+            # The longer of the simultaneous turns
+            12: 3.0,
+            13: 0.2,
+            # Reached through the wait as well as through its phase
+            14: 1.3,
+            15: 0.5,
+        }
+    )
+
+
+def test_ideal_seconds_overlaps_night_roles_and_batches(game):
+    # Night 3s (longest role), day 3s (longest turn), round end 0.2s,
+    # then the wait ends with the announcement 1.3s after the round end,
+    # and the final phase has 0.5s of its own
+    assert ideal_seconds(game) == pytest.approx(8.0)
+
+
+def test_analyze_summarizes_the_game(game):
+    summaries, phases, agents, folded = analyze([game])
+    (summary,) = summaries
+    assert summary["wall"] == 10.0
+    assert summary["ideal"] == pytest.approx(8.0)
+    assert summary["model_idle"] == pytest.approx(7.5)
+    assert phases["day"].critical == pytest.approx(3.0)
+    assert agents["Bo"].critical == pytest.approx(4.0)
+    assert agents["Ada"].model == pytest.approx(2.5)
+    assert sum(folded.values()) == 10_000_000
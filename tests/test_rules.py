@@ -0,0 +1,47 @@
+from collections import Counter
+
+import pytest
+
+from game.rules import Winner, night_victim, reveals_mafia, tally, winner
+from game.types import Role
+
+
+def test_tally_picks_most_voted():
+    assert tally(Counter({"Ada": 1, "Bo": 3, "Cy": 2})) == "Bo"
+
+
+def test_tally_breaks_ties_alphabetically():
+    assert tally({"Cy": 2, "Ada": 2, "Bo": 1}) == "Ada"
+
+
+@pytest.mark.parametrize("votes", [{}, {"Ada": 0, "Bo": 0}])
+def test_tally_without_votes(votes):
+    assert tally(votes) is None
+
+
+@pytest.mark.parametrize(
+    ("mafia", "town", "expected"),
+    [
+        (0, 5, Winner.TOWN),
+        (0, 0, Winner.TOWN),
+        (2, 2, Winner.MAFIA),
+        (3, 1, Winner.MAFIA),
+        (1, 2, None),
+    ],
+)
+def test_winner(mafia, town, expected):
+    assert winner(mafia, town) is expected
+
+
+@pytest.mark.parametrize(
+    ("kill", "heal", "expected"),
+    [("Ada", "Bo", "Ada"), ("Ada", "Ada", None), (None, "Ada", None)],
+)
+def test_night_victim(kill, heal, expected):
+    assert night_victim(kill, heal) == expected
+
+
+def test_only_mafia_is_revealed():
+    assert reveals_mafia(Role.MAFIA)
+    assert not reveals_mafia(Role.VILLAGER)
+    assert not reveals_mafia(None)
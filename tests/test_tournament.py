@@ -0,0 +1,52 @@
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from game.roles import RoleDistribution
+from game.setup import DEFAULT_GOD, model_config, without_secrets
+from game.tournament import play_fixture, schedule
+from utils.personalities import PersonalityRegistry
+
+
+def test_fixtures_replay_the_same_game():
+    registry = PersonalityRegistry.load()
+    names = [n for n in registry.names if n != DEFAULT_GOD]
+    roles = RoleDistribution.default()
+    fixtures = schedule(names, 6, 2, roles, seed=11)
+    config = model_config(Namespace(config=None, backend="fake", seed=None))
+    by_name = {n: registry.get(n) for n in names}
+    god = registry.get(DEFAULT_GOD)
+
+    def play(fixture):
+        record = play_fixture(fixture, by_name, god, config, roles, 3)
+        return replace(record, seconds=0.0)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first, second, *again = pool.map(play, fixtures + fixtures)
+    assert again == [first, second]
+
+
+def test_without_secrets():
+    config = {
+        "backend": "openai",
+        "tiers": {
+            "main": {
+                "model": "gpt",
+                "api_key": "sk-1",
+                "api_key_env": "OPENAI_KEY",
+                "endpoints": [{"api_key": "sk-2", "base_url": "http://a"}],
+            },
+            "fast": {"model": "gemini", "google_api_key": "g", "api_keys": []},
+        },
+    }
+    assert without_secrets(config) == {
+        "backend": "openai",
+        "tiers": {
+            "main": {
+                "model": "gpt",
+                "api_key_env": "OPENAI_KEY",
+                "endpoints": [{"base_url": "http://a"}],
+            },
+            "fast": {"model": "gemini"},
+        },
+    }
@@ -0,0 +1,133 @@
+import time
+from argparse import Namespace
+
+import pytest
+
+from game.checkpoint import Checkpoint
+from game.setup import DEFAULT_GOD, DEFAULT_PLAYERS, model_config
+from game.types import Role
+from game.workqueue import LeaseLost, WorkQueue, work
+from utils.personalities import DEFAULT_PATH
+
+SPEC = {
+    "players": list(DEFAULT_PLAYERS[:6]),
+    "god": DEFAULT_GOD,
+    "personalities": str(DEFAULT_PATH),
+    "roles": "",
+    "seed": 5,
+    "rounds": 1,
+    "models": model_config(Namespace(config=None, backend="fake", seed=None)),
+}
+
+
+def checkpoint(step: str = "mafia") -> Checkpoint:
+    return Checkpoint(
+        round_no=1,
+        step=step,
+        seating=["Ada", "Bo"],
+        roles={"Ada": Role.MAFIA, "Bo": Role.VILLAGER},
+        alive=["Ada", "Bo"],
+        memories={"Ada": [], "Bo": []},
+        logs=[],
+    )
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.sqlite", lease=0.2, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_jobs_are_claimed_once_in_order(queue):
+    first, second = queue.submit([{"n": 1}, {"n": 2}])
+    a = queue.claim("a")
+    b = queue.claim("b")
+    assert (a.id, a.spec, a.attempt, a.checkpoint) == (
+        first,
+        {"n": 1},
+        1,
+        None,
+    )
+    assert (b.id, b.worker) == (second, "b")
+    assert queue.claim("c") is None
+    assert queue.unfinished() == 2
+
+
+def test_expired_lease_is_reclaimed_with_its_checkpoint(queue):
+    queue.submit([{"n": 1}])
+    job = queue.claim("a")
+    queue.save_checkpoint(job, checkpoint("healer"))
+    assert queue.claim("b") is None
+
+    time.sleep(0.3)
+    again = queue.claim("b")
+    assert (again.id, again.worker, again.attempt) == (job.id, "b", 2)
+    assert again.checkpoint == checkpoint("healer")
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    queue.submit([{"n": 1}])
+    job = queue.claim("a")
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.heartbeat(job)
+    assert queue.claim("b") is None
+
+
+def test_reclaimed_job_fences_out_the_old_worker(queue):
+    queue.submit([{"n": 1}])
+    stale = queue.claim("a")
+    time.sleep(0.3)
+    current = queue.claim("b")
+
+    assert not queue.heartbeat(stale)
+    with pytest.raises(LeaseLost):
+        queue.save_checkpoint(stale, checkpoint("day"))
+    with pytest.raises(LeaseLost):
+        queue.complete(stale, {"winner": "mafia"})
+    assert not queue.fail(stale, "late")
+
+    queue.complete(current, {"winner": "town"})
+    (row,) = queue.jobs()
+    assert (row["status"], row["worker"], row["result"]) == (
+        "done",
+        "b",
+        {"winner": "town"},
+    )
+    assert row["step"] is None
+
+
+def test_failed_job_is_retried_until_out_of_attempts(queue):
+    queue.submit([{"n": 1}])
+    assert queue.fail(queue.claim("a"), "boom")
+    job = queue.claim("b")
+    assert job.attempt == 2
+    assert not queue.fail(job, "boom again")
+    assert queue.claim("c") is None
+    (row,) = queue.jobs()
+    assert (row["status"], row["error"]) == ("failed", "boom again")
+
+
+def test_lease_expiring_on_the_last_attempt_fails_the_job(queue):
+    queue.submit([{"n": 1}])
+    queue.claim("a")
+    time.sleep(0.3)
+    queue.claim("b")
+    time.sleep(0.3)
+    assert queue.claim("c") is None
+    (row,) = queue.jobs()
+    assert (row["status"], row["error"]) == ("failed", "Lease of b expired")
+
+
+def test_worker_plays_queued_games(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.sqlite")
+    try:
+        queue.submit([SPEC])
+        assert work(queue, "a", poll=0.01, until_done=True) == 1
+        (row,) = queue.jobs()
+    finally:
+        queue.close()
+    assert row["status"] == "done"
+    assert row["result"]["rounds"] == 1
+    assert row["result"]["resumed_after"] is None
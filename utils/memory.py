@@ -1,13 +1,56 @@
+from collections.abc import Iterable
+
 from langchain.messages import HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from agents.routing import CallKind, ModelRouter
+
+SUMMARY_PROMPT = "Summarize the Mafia round concisely."
 
 
 def summarize_round(
-    llm: ChatGoogleGenerativeAI,
+    llm: BaseChatModel,
     round_logs: list[str],
+    router: ModelRouter | None = None,
+    names: Iterable[str] = (),
 ) -> str:
+    """Summarize a round's logs.
+
+    Args:
+        llm: Model used when no router is given
+        round_logs: Log lines to summarize
+        router: Routes the call to the summary tier and records usage
+        names: Player names the logs may mention, so a cached summary of
+            the same logs about other players can be reused
+
+    Returns:
+        The summary text
+    """
+    logs = "\n".join(round_logs)
     messages = [
-        SystemMessage(content="Summarize the Mafia round concisely."),
-        HumanMessage(content="\n".join(round_logs)),
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(content=logs),
     ]
-    return str(llm.invoke(messages).content)
+    if router is None:
+        return str(llm.invoke(messages).content)
+
+    def call() -> str:
+        with router.track(CallKind.SUMMARY) as config:
+            return str(
+                router.llm_for(CallKind.SUMMARY)
+                .invoke(messages, config)
+                .content
+            )
+
+    if router.cache is None:
+        return call()
+    return router.cache.get_or_call(
+        CallKind.SUMMARY.value,
+        router.tier_for(CallKind.SUMMARY),
+        logs,
+        names,
+        call,
+        # A similar round's summary would describe events that didn't
+        # happen in this one
+        fuzzy=False,
+    )
@@ -0,0 +1,145 @@
+"""Personalities indexed by name, loaded once per process.
+
+Every personality carries a fingerprint: the sha256 of its prompt. Caches
+of compiled agents, model responses or prompt prefixes should key on it,
+so that editing a prompt invalidates them while renaming the file or
+reordering entries doesn't.
+"""
+
+import difflib
+import hashlib
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.json_loader import load_personalities
+
+DEFAULT_PATH = "data/personalities.json"
+
+# Registries by (resolved path, mtime, size); a changed file is reloaded
+_CACHE: dict[tuple[str, int, int], "PersonalityRegistry"] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Stable content hash of a prompt."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class Personality:
+    name: str
+    prompt: str
+    fingerprint: str
+
+    @classmethod
+    def from_dict(cls, data: dict[str, str]) -> "Personality":
+        return cls(
+            name=data["name"],
+            prompt=data["prompt"],
+            fingerprint=prompt_fingerprint(data["prompt"]),
+        )
+
+
+class PersonalityRegistry:
+    """Read-only index of personalities by name."""
+
+    def __init__(self, personalities: Iterable[Personality]) -> None:
+        """Index ``personalities``.
+
+        Raises:
+            ValueError: If two personalities share a name
+        """
+        self._by_name: dict[str, Personality] = {}
+        for p in personalities:
+            if p.name in self._by_name:
+                raise ValueError(f"Personality {p.name} is defined twice")
+            self._by_name[p.name] = p
+
+    @classmethod
+    def load(cls, path: str | Path = DEFAULT_PATH) -> "PersonalityRegistry":
+        """Load ``path``, reusing the registry while the file is unchanged.
+
+        Safe to call from several threads; the file is parsed once.
+        """
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+        key = (str(resolved), stat.st_mtime_ns, stat.st_size)
+        with _CACHE_LOCK:
+            registry = _CACHE.get(key)
+            if registry is None:
+                registry = cls(
+                    Personality.from_dict(p)
+                    for p in load_personalities(str(resolved))
+                )
+                # Drop registries of older versions of the file
+                for old in [k for k in _CACHE if k[0] == key[0]]:
+                    del _CACHE[old]
+                _CACHE[key] = registry
+            return registry
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __iter__(self) -> Iterator[Personality]:
+        return iter(self._by_name.values())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._by_name)
+
+    def get(self, name: str) -> Personality:
+        """Return the personality called ``name``.
+
+        Raises:
+            KeyError: If there is none, with the closest names as a hint
+        """
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise KeyError(self._unknown([name])) from None
+
+    def fingerprint(self, name: str) -> str:
+        return self.get(name).fingerprint
+
+    def lobby(
+        self, players: Iterable[str], god: str
+    ) -> tuple[list[Personality], Personality]:
+        """Look up a lobby, checking it can be seated.
+
+        Args:
+            players: Player names in seating order
+            god: Name of the god
+
+        Returns:
+            The players' personalities in the given order and the god's
+
+        Raises:
+            ValueError: If a name is unknown or listed twice, or the god
+                is missing or also a player
+        """
+        names = list(players)
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ValueError(f"Players listed twice: {', '.join(duplicates)}")
+        if not god:
+            raise ValueError("The lobby needs a god")
+        unknown = [n for n in [*names, god] if n not in self]
+        if unknown:
+            raise ValueError(self._unknown(unknown))
+        if god in names:
+            raise ValueError(f"{god} can't be god and a player")
+        return [self._by_name[n] for n in names], self._by_name[god]
+
+    def _unknown(self, names: list[str]) -> str:
+        parts = []
+        for name in names:
+            close = difflib.get_close_matches(name, self._by_name, n=1)
+            parts.append(
+                f"{name} (did you mean {close[0]}?)" if close else name
+            )
+        return f"Unknown personalities: {', '.join(parts)}"